@@ -2,6 +2,7 @@
 
 
 if __name__ == "__main__":
+    from argparse import ArgumentParser
     from os import environ
     from pathlib import Path
     from sys import base_prefix
@@ -11,7 +12,11 @@ if __name__ == "__main__":
 
     print(environ["TCL_LIBRARY"])
     print(environ["TK_LIBRARY"])
-    from src.gui.windows.main_window import MainWindow
+    from src.cli import add_profile_arguments, run_gui
 
-    app = MainWindow()
-    app.mainloop()
+    parser = ArgumentParser()
+    parser.add_argument("--db", default="flc.db")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    run_gui(args.db, args.profile, args.pstats)
@@ -0,0 +1,417 @@
+"""Командная строка FreeLance Compass
+
+Запуск: python -m src.cli <команда> [параметры]
+"""
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from src.utils.reminders import DeadlineRow, Reminder
+
+
+def run_gui(
+    db_path: str, profile_dir: Optional[str] = None, pstats: bool = False
+) -> None:
+    """Запуск графического интерфейса (с профилированием по запросу)"""
+    profiler = None
+    if profile_dir:
+        from src.utils.profiling import enable_profiling
+
+        profiler = enable_profiling(profile_dir, pstats)
+
+    from src.gui.windows.main_window import MainWindow
+
+    app = MainWindow(db_path)
+    try:
+        app.mainloop()
+    finally:
+        if profiler:
+            print(f"Трасса сохранена: {profiler.write()}")
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Параметры режима профилирования"""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile",
+        metavar="DIR",
+        help="записать трассу Chrome trace в каталог (по умолчанию ./profile)",
+    )
+    parser.add_argument(
+        "--pstats",
+        action="store_true",
+        help="дополнительно сохранять .pstats для медленных действий",
+    )
+
+
+def cmd_gui(args: argparse.Namespace) -> int:
+    run_gui(args.db, args.profile, args.pstats)
+    return 0
+
+
+def cmd_statements(args: argparse.Namespace) -> int:
+    from src.db.crud import ReportManager
+    from src.db.models import init_db
+    from src.utils.statements import generate_statements, month_period
+
+    period_start, period_end = month_period(args.month)
+    paths = generate_statements(
+        ReportManager(init_db(args.db), args.currency),
+        period_start,
+        period_end,
+        args.out,
+        args.format,
+        args.workers,
+    )
+    print(f"Сформировано файлов: {len(paths)} в {args.out}")
+    return 0
+
+
+def reminder_hook(command: Optional[str]) -> Callable[[Reminder], None]:
+    """Обработчик напоминаний: вывод в консоль или запуск внешней команды
+
+    Команда получает текст напоминания последним аргументом, а поля
+    напоминания — в переменных окружения FLC_REMINDER_*.
+    """
+
+    def notify(reminder: Reminder) -> None:
+        print(f"[{datetime.now():%d.%m.%Y %H:%M}] {reminder.message}", flush=True)
+        if command:
+            env = dict(
+                os.environ,
+                FLC_REMINDER_KIND=reminder.kind,
+                FLC_REMINDER_ID=str(reminder.item_id),
+                FLC_REMINDER_PROJECT_ID=str(reminder.project_id),
+                FLC_REMINDER_DEADLINE=reminder.deadline.isoformat(),
+                FLC_REMINDER_DUE="1" if reminder.due else "0",
+            )
+            subprocess.run([*shlex.split(command), reminder.message], env=env)
+
+    return notify
+
+
+def cmd_reminders(args: argparse.Namespace) -> int:
+    from src.db.crud import ProjectManager
+    from src.db.models import init_db
+    from src.utils.reminders import ReminderScheduler, run_headless
+
+    project_manager = ProjectManager(init_db(args.db))
+    scheduler = ReminderScheduler(lead=timedelta(hours=args.lead_hours))
+    notify = reminder_hook(args.hook)
+
+    def load_rows() -> List[DeadlineRow]:
+        # Сессия не должна возвращать закэшированные объекты между перечитываниями
+        project_manager.session.expire_all()
+        return project_manager.get_open_deadlines(datetime.now())
+
+    if not args.watch:
+        scheduler.load(load_rows())
+        for reminder in scheduler.pop_due():
+            notify(reminder)
+        return 0
+
+    try:
+        run_headless(
+            load_rows, notify, timedelta(minutes=args.refresh_minutes), scheduler
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    from src.db import sync
+    from src.db.models import create_db_engine
+
+    if args.sync_command == "clone":
+        sync.clone_database(args.db, args.target)
+        print(f"Копия для синхронизации создана: {args.target}")
+        return 0
+
+    engine = create_db_engine(args.db)
+    if args.sync_command == "export":
+        stats = sync.export_changes(engine, args.file, args.since, args.full)
+        size = os.path.getsize(args.file)
+        print(f"Выгружено записей: {stats['entries']} ({size} байт) в {args.file}")
+    else:
+        for path in args.files:
+            stats = sync.import_changes(engine, path)
+            print(
+                f"{path}: применено {stats['applied']}, "
+                f"конфликтов {stats['conflicts']}, пропущено {stats['skipped']}, "
+                f"без родителя {stats['orphans']}"
+            )
+    return 0
+
+
+def cmd_maintenance(args: argparse.Namespace) -> int:
+    from src.db.maintenance import format_report, run_maintenance
+    from src.db.models import create_db_engine
+
+    result = run_maintenance(create_db_engine(args.db), convert=args.convert)
+    print(format_report(result))
+    return 0
+
+
+def cmd_workspaces(args: argparse.Namespace) -> int:
+    from src.db.workspaces import WorkspaceManager
+
+    workspaces = WorkspaceManager(max_open=max(1, len(args.databases)))
+    report = workspaces.get_combined_totals(args.databases, args.workers)
+    rows = list(report["workspaces"].items()) + [("Итого", report["combined"])]
+    print(f"{'База':30}{'Проектов':>10}{'Стоимость':>16}{'Оплачено':>16}{'Долг':>16}")
+    for path, totals in rows:
+        print(
+            f"{os.path.basename(path):30}{totals['projects']:>10}"
+            f"{totals['total_cost']:>16,.2f}{totals['total_paid']:>16,.2f}"
+            f"{totals['outstanding']:>16,.2f}"
+        )
+    workspaces.dispose()
+    return 0
+
+
+def cmd_rates(args: argparse.Namespace) -> int:
+    from src.db.currency import import_rates
+    from src.db.models import create_db_engine
+
+    count = import_rates(create_db_engine(args.db), args.file, args.delimiter)
+    print(f"Загружено курсов: {count}")
+    return 0
+
+
+def cmd_reconcile(args: argparse.Namespace) -> int:
+    from src.db.models import init_db
+    from src.db.reconcile import apply_matches, load_pending, read_statement, reconcile
+
+    session = init_db(args.db)
+    result = reconcile(
+        read_statement(args.file, args.delimiter),
+        load_pending(session),
+        timedelta(days=args.window),
+    )
+    for transaction, payment in result.matched:
+        print(f"Строка {transaction.line}: {payment.title}")
+    for transaction, candidates in result.ambiguous:
+        print(f"Строка {transaction.line}: вариантов {len(candidates)}, на проверку")
+    print(
+        f"Однозначно: {len(result.matched)}, на проверку: {len(result.ambiguous)}, "
+        f"без пары: {len(result.unmatched)}"
+    )
+    if args.apply:
+        apply_matches(session, result.matched)
+        print(f"Отмечено выполненными: {len(result.matched)}")
+    return 0
+
+
+def cmd_schedules(args: argparse.Namespace) -> int:
+    from src.db.crud import ScheduleManager
+    from src.db.models import init_db
+
+    session = init_db(args.db)
+    if args.schedules_command == "materialize":
+        projects = ScheduleManager(session).materialize()
+        print(f"Созданы платежи графиков, проектов: {len(projects)}")
+        return 0
+
+    until = datetime.now() + timedelta(days=31 * args.months)
+    for month, amount in ScheduleManager(session, args.currency).get_forecast(until):
+        print(f"{month}: {amount:,.2f} {args.currency}")
+    return 0
+
+
+def cmd_snapshot(args: argparse.Namespace) -> int:
+    from src.db.models import create_db_engine
+    from src.db.snapshot import Snapshot, build_snapshot
+    from src.utils.analytics import yearly_summary
+
+    directory = args.out or f"{os.path.splitext(args.db)[0]}.snapshot"
+    manifest = build_snapshot(create_db_engine(args.db), directory, full=args.full)
+    rows = ", ".join(
+        f"{table}: {state['rows']}" for table, state in manifest["tables"].items()
+    )
+    print(f"Снимок {directory} ({rows})")
+
+    for year, values in yearly_summary(Snapshot(directory), args.currency).items():
+        print(
+            f"{year}: поступления {values['revenue']:,.2f} {args.currency} "
+            f"({values['payments']:.0f} платежей), "
+            f"доработки {values['modifications_cost']:,.2f} "
+            f"({values['modifications']:.0f}), "
+            f"оплаты доработок {values['modification_payments']:,.2f}"
+        )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from src.db.models import BASE_CURRENCY, CURRENCIES
+
+    parser = argparse.ArgumentParser(prog="flc", description="FreeLance Compass")
+    parser.add_argument("--db", default="flc.db", help="путь к файлу базы данных")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gui = subparsers.add_parser("gui", help="запустить графический интерфейс")
+    add_profile_arguments(gui)
+    gui.set_defaults(handler=cmd_gui)
+
+    statements = subparsers.add_parser(
+        "statements", help="сформировать выписки клиентам за месяц"
+    )
+    statements.add_argument(
+        "--month",
+        default=datetime.now().strftime("%Y-%m"),
+        help="месяц в формате ГГГГ-ММ (по умолчанию текущий)",
+    )
+    statements.add_argument("--out", default="statements", help="каталог для файлов")
+    statements.add_argument(
+        "--format",
+        nargs="+",
+        choices=["html", "pdf"],
+        default=["html", "pdf"],
+        help="форматы выписок",
+    )
+    statements.add_argument(
+        "--workers", type=int, help="число процессов (по умолчанию по числу ядер)"
+    )
+    statements.add_argument(
+        "--currency",
+        choices=CURRENCIES,
+        default=BASE_CURRENCY,
+        help="валюта сумм в выписках",
+    )
+    statements.set_defaults(handler=cmd_statements)
+
+    reminders = subparsers.add_parser(
+        "reminders", help="напоминания о дедлайнах без интерфейса"
+    )
+    reminders.add_argument(
+        "--lead-hours",
+        type=float,
+        default=24,
+        help="за сколько часов до дедлайна напоминать",
+    )
+    reminders.add_argument(
+        "--watch", action="store_true", help="работать постоянно, ожидая дедлайнов"
+    )
+    reminders.add_argument(
+        "--refresh-minutes",
+        type=float,
+        default=60,
+        help="как часто перечитывать дедлайны в режиме --watch",
+    )
+    reminders.add_argument("--hook", help="команда, вызываемая для каждого напоминания")
+    reminders.set_defaults(handler=cmd_reminders)
+
+    sync_parser = subparsers.add_parser(
+        "sync", help="обмен изменениями с другой копией базы"
+    )
+    sync_commands = sync_parser.add_subparsers(dest="sync_command", required=True)
+    export = sync_commands.add_parser("export", help="выгрузить изменения в файл")
+    export.add_argument("file", help="файл изменений (.jsonl.gz)")
+    export.add_argument(
+        "--since",
+        type=int,
+        help="номер изменения, после которого выгружать "
+        "(по умолчанию — с прошлой выгрузки)",
+    )
+    export.add_argument("--full", action="store_true", help="выгрузить все строки")
+    import_ = sync_commands.add_parser("import", help="применить файлы изменений")
+    import_.add_argument("files", nargs="+", help="файлы изменений")
+    clone = sync_commands.add_parser(
+        "clone", help="создать копию базы для второго компьютера"
+    )
+    clone.add_argument("target", help="путь к новой копии")
+    sync_parser.set_defaults(handler=cmd_sync)
+
+    maintenance = subparsers.add_parser(
+        "maintenance", help="ANALYZE, возврат свободного места и отчет о базе"
+    )
+    maintenance.add_argument(
+        "--convert",
+        action="store_true",
+        help="перевести базу в режим auto_vacuum=INCREMENTAL (полный VACUUM)",
+    )
+    maintenance.set_defaults(handler=cmd_maintenance)
+
+    workspaces = subparsers.add_parser(
+        "workspaces", help="сводные итоги по нескольким базам"
+    )
+    workspaces.add_argument("databases", nargs="+", help="файлы баз")
+    workspaces.add_argument("--workers", type=int, help="число потоков")
+    workspaces.set_defaults(handler=cmd_workspaces)
+
+    rates = subparsers.add_parser("rates", help="курсы валют")
+    rates_commands = rates.add_subparsers(dest="rates_command", required=True)
+    rates_import = rates_commands.add_parser(
+        "import", help="загрузить курсы из CSV (date,currency,rate)"
+    )
+    rates_import.add_argument("file", help="файл CSV с курсами")
+    rates_import.add_argument("--delimiter", default=",", help="разделитель полей")
+    rates.set_defaults(handler=cmd_rates)
+
+    reconcile = subparsers.add_parser(
+        "reconcile", help="сверка ожидающих платежей с выпиской банка"
+    )
+    reconcile.add_argument(
+        "file", help="CSV выписки (date,amount,currency,description)"
+    )
+    reconcile.add_argument(
+        "--delimiter", help="разделитель полей (по умолчанию по заголовку)"
+    )
+    reconcile.add_argument(
+        "--window", type=int, default=7, help="допустимая разница дат, дней"
+    )
+    reconcile.add_argument(
+        "--apply",
+        action="store_true",
+        help="отметить однозначные совпадения выполненными",
+    )
+    reconcile.set_defaults(handler=cmd_reconcile)
+
+    schedules = subparsers.add_parser("schedules", help="графики платежей")
+    schedules_commands = schedules.add_subparsers(
+        dest="schedules_command", required=True
+    )
+    schedules_commands.add_parser(
+        "materialize", help="создать ожидаемые платежи графиков до горизонта"
+    )
+    forecast = schedules_commands.add_parser(
+        "forecast", help="ожидаемые поступления по месяцам"
+    )
+    forecast.add_argument("--months", type=int, default=12, help="на сколько месяцев")
+    forecast.add_argument(
+        "--currency", default=BASE_CURRENCY, choices=CURRENCIES, help="валюта прогноза"
+    )
+    schedules.set_defaults(handler=cmd_schedules)
+
+    snapshot = subparsers.add_parser(
+        "snapshot", help="колоночный снимок платежей для аналитики"
+    )
+    snapshot.add_argument("--out", help="каталог снимка (по умолчанию рядом с базой)")
+    snapshot.add_argument(
+        "--full", action="store_true", help="пересоздать снимок целиком"
+    )
+    snapshot.add_argument(
+        "--currency",
+        default=BASE_CURRENCY,
+        choices=CURRENCIES,
+        help="валюта итогов",
+    )
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    handler: Callable[[argparse.Namespace], int] = args.handler
+    return handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Клиенты проектов, выделенные из текста контактов
+
+Источником остается Project.client_contacts: при сохранении проекта,
+загрузке изменений и миграции проект привязывается к клиенту с тем же
+адресом почты, а без почты — с тем же именем (первая строка контактов).
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+
+from src.utils.text_utils import client_email, client_name
+
+# Сколько проектов привязывать за один проход при заполнении
+FILL_BATCH_SIZE = 500
+
+
+def _find_client(
+    connection: Connection, name: str, email: Optional[str]
+) -> Optional[Tuple[int, Optional[str]]]:
+    """Клиент (id, email) по адресу почты, иначе по имени"""
+    if email:
+        row = connection.exec_driver_sql(
+            "SELECT id, email FROM clients WHERE email = ? ORDER BY id LIMIT 1",
+            (email,),
+        ).first()
+        if row:
+            return tuple(row)
+    # С тем же именем, если почты у одного из них нет
+    row = connection.exec_driver_sql(
+        "SELECT id, email FROM clients WHERE name = ? "
+        "AND (email IS NULL OR ? IS NULL) ORDER BY id LIMIT 1",
+        (name, email),
+    ).first()
+    return tuple(row) if row else None
+
+
+def resolve_client(connection: Connection, contacts: Optional[str]) -> Optional[int]:
+    """id клиента для контактов (новый клиент создается при необходимости)"""
+    email = client_email(contacts)
+    # Клиент без имени называется по адресу почты
+    name = " ".join(client_name(contacts).split()) or email
+    if not contacts or not name:
+        return None
+
+    found = _find_client(connection, name, email)
+    if found is None:
+        client_id: int = connection.exec_driver_sql(
+            "INSERT INTO clients (name, email, contacts, created_at) "
+            "VALUES (?, ?, ?, datetime('now'))",
+            (name, email, contacts.strip()),
+        ).lastrowid
+        return client_id
+
+    client_id, known_email = found
+    if email and not known_email:
+        connection.exec_driver_sql(
+            "UPDATE clients SET email = ? WHERE id = ?", (email, client_id)
+        )
+    return client_id
+
+
+def assign_clients(
+    connection: Connection, projects: Iterable[Tuple[int, Optional[str]]]
+) -> None:
+    """Привязка проектов (id, client_contacts) к клиентам"""
+    # Одинаковые контакты разбираются один раз
+    resolved: Dict[str, Optional[int]] = {}
+    updates = []
+    for project_id, contacts in projects:
+        key = (contacts or "").strip()
+        if key not in resolved:
+            resolved[key] = resolve_client(connection, key)
+        updates.append((resolved[key], project_id))
+    if updates:
+        connection.exec_driver_sql(
+            "UPDATE projects SET client_id = ? WHERE id = ? AND client_id IS NOT ?",
+            [(client_id, project_id, client_id) for client_id, project_id in updates],
+        )
+
+
+def fill_clients(connection: Connection) -> None:
+    """Создание клиентов из контактов всех проектов (миграция)"""
+    last_id = 0
+    while True:
+        rows = connection.exec_driver_sql(
+            "SELECT id, client_contacts FROM projects WHERE id > ? "
+            "ORDER BY id LIMIT ?",
+            (last_id, FILL_BATCH_SIZE),
+        ).all()
+        if not rows:
+            return
+        assign_clients(connection, [tuple(row) for row in rows])
+        last_id = rows[-1][0]
@@ -1,7 +1,103 @@
-from datetime import datetime
-from typing import List, Optional, Dict
-from sqlalchemy.orm import Session
-from .models import Project, Payment, Modification, ModificationPayment
+import heapq
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Iterator, List, Optional, Dict, Sequence, Tuple
+import numpy as np
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    case,
+    delete,
+    func,
+    insert,
+    or_,
+    Subquery,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
+from src.utils.recurrence import CADENCES, occurrences
+from src.utils.text_utils import client_email, parse_tech_stack
+from .clients import assign_clients
+from .currency import RateTable, convert_expr, latest_rates, reporting_rate
+from .tags import refresh_project_tags
+from .models import (
+    BASE_CURRENCY,
+    Client,
+    Project,
+    Payment,
+    PaymentSchedule,
+    Modification,
+    ModificationPayment,
+    ProjectRollup,
+    ProjectTag,
+    Tag,
+    TimeEntry,
+)
+
+
+# Поля сортировки списка проектов
+PROJECT_SORTS = ["id", "deadline", "balance", "total_cost", "last_payment"]
+
+
+@dataclass(frozen=True)
+class ProjectQuery:
+    """Фильтры и сортировка списка проектов (выполняются в SQL)
+
+    Баланс сравнивается и сортируется в базовой валюте по текущему курсу,
+    отрицательный баланс — долг клиента. Границы дат включаются.
+    """
+
+    text: str = ""
+    statuses: Tuple[str, ...] = ()
+    tags: Tuple[str, ...] = ()
+    match_all: bool = True
+    started_after: Optional[datetime] = None
+    started_before: Optional[datetime] = None
+    deadline_after: Optional[datetime] = None
+    deadline_before: Optional[datetime] = None
+    min_balance: Optional[float] = None
+    max_balance: Optional[float] = None
+    sort: str = "id"
+    descending: bool = False
+
+    def __post_init__(self) -> None:
+        if self.sort not in PROJECT_SORTS:
+            raise ValueError(f"Неизвестная сортировка: {self.sort}")
+
+    @classmethod
+    def simple(
+        cls,
+        text: str = "",
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all: bool = True,
+    ) -> "ProjectQuery":
+        """Фильтр по тексту, одному статусу и тегам"""
+        return cls(
+            text=text,
+            statuses=(status,) if status else (),
+            tags=tuple(tags or ()),
+            match_all=match_all,
+        )
+
+
+def make_balance(project: Project, rollup: Optional[ProjectRollup]) -> Dict[str, float]:
+    """Баланс проекта по предрассчитанным суммам"""
+    total_paid = rollup.total_paid if rollup else 0.0
+    mods_cost = rollup.mods_cost if rollup else 0.0
+    total_cost = project.total_cost + mods_cost
+    return {
+        "total_cost": total_cost,
+        "total_paid": total_paid,
+        "balance": total_paid - total_cost,
+        "mods_cost": mods_cost,
+        "original_cost": project.total_cost,
+    }
 
 
 class ProjectManager:
@@ -25,12 +121,15 @@ class ProjectManager:
             **kwargs,
         )
         self.session.add(project)
+        self.session.flush()
+        self._refresh_tags(project)
+        self._assign_client(project)
         self.session.commit()
         return project
 
     def get_project(self, project_id: int) -> Optional[Project]:
         """Получение проекта по ID"""
-        return self.session.query(Project).get(project_id)
+        return self.session.get(Project, project_id)
 
     def update_project(self, project_id: int, **kwargs) -> Optional[Project]:
         """Обновление данных проекта"""
@@ -39,9 +138,28 @@ class ProjectManager:
             for key, value in kwargs.items():
                 setattr(project, key, value)
             project.updated_at = datetime.utcnow()
+            self.session.flush()
+            if "tech_stack" in kwargs:
+                self._refresh_tags(project)
+            if "client_contacts" in kwargs:
+                self._assign_client(project)
             self.session.commit()
         return project
 
+    def _assign_client(self, project: Project) -> None:
+        """Привязка проекта к клиенту по его контактам"""
+        assign_clients(
+            self.session.connection(), [(project.id, project.client_contacts)]
+        )
+        self.session.expire(project, ["client_id", "client"])
+
+    def _refresh_tags(self, project: Project) -> None:
+        """Пересборка тегов проекта из его стека"""
+        refresh_project_tags(
+            self.session.connection(), [(project.id, project.tech_stack)]
+        )
+        self.session.expire(project, ["tags"])
+
     def delete_project(self, project_id: int) -> bool:
         """Удаление проекта"""
         project = self.get_project(project_id)
@@ -51,12 +169,15 @@ class ProjectManager:
             return True
         return False
 
-    def get_project_balance(self, project_id: int) -> Dict:
-        """Получение баланса проекта"""
+    def get_project_balance(self, project_id: int) -> Dict[str, float]:
+        """Получение баланса проекта по предрассчитанным суммам"""
         project = self.get_project(project_id)
-        if project:
-            return project.calculate_balance()
-        return {}
+        if not project:
+            return {}
+
+        # Суммы поддерживаются триггерами в project_rollups
+        rollup = self.session.get(ProjectRollup, project_id, populate_existing=True)
+        return make_balance(project, rollup)
 
     def get_all_projects(self, status: Optional[str] = None) -> List[Project]:
         """Получение списка всех проектов"""
@@ -65,6 +186,306 @@ class ProjectManager:
             query = query.filter(Project.status == status)
         return query.all()
 
+    def _tagged_ids_query(
+        self, tags: List[str], match_all: bool = True
+    ) -> Select[Tuple[int]]:
+        """Подзапрос id проектов с тегами: со всеми (И) или с любым (ИЛИ)"""
+        names = parse_tech_stack(",".join(tags))
+        query = (
+            select(ProjectTag.project_id)
+            .join(Tag, Tag.id == ProjectTag.tag_id)
+            .where(Tag.name.in_(names))
+        )
+        if match_all and len(names) > 1:
+            query = query.group_by(ProjectTag.project_id).having(
+                func.count() == len(names)
+            )
+        return query
+
+    def get_projects_by_tags(
+        self, tags: List[str], match_all: bool = True
+    ) -> List[Project]:
+        """Проекты со всеми (match_all) или хотя бы одним из тегов"""
+        return list(
+            self.session.scalars(
+                select(Project)
+                .where(Project.id.in_(self._tagged_ids_query(tags, match_all)))
+                .order_by(Project.id)
+            )
+        )
+
+    def get_tag_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Теги и число проектов с ними (по убыванию) одним запросом"""
+        count = func.count().label("projects")
+        return [
+            tuple(row)
+            for row in self.session.execute(
+                select(Tag.name, count)
+                .join(ProjectTag, ProjectTag.tag_id == Tag.id)
+                .group_by(Tag.id)
+                .order_by(count.desc(), Tag.name)
+                .limit(limit)
+            )
+        ]
+
+    def _filtered_query(
+        self, query: ProjectQuery, with_balance: bool = False, with_rates: bool = False
+    ) -> Tuple[
+        Select[Any], Optional[ColumnElement[float]], Optional[ColumnElement[float]]
+    ]:
+        """Запрос проектов с условиями фильтра (без сортировки)
+
+        Возвращает запрос, множитель пересчета в базовую валюту и баланс в
+        базовой валюте. Курсы соединяются один раз, если нужны фильтру
+        баланса, with_balance или with_rates; иначе множитель None.
+        Баланс None, если он не нужен ни фильтру, ни with_balance.
+        """
+        statement = select(Project)
+        if query.statuses:
+            statement = statement.where(Project.status.in_(query.statuses))
+        if query.tags:
+            statement = statement.where(
+                Project.id.in_(
+                    self._tagged_ids_query(list(query.tags), query.match_all)
+                )
+            )
+        if query.text:
+            text = query.text.lower()
+            statement = statement.where(
+                or_(
+                    func.lower(Project.name).contains(text, autoescape=True),
+                    func.lower(Project.description).contains(text, autoescape=True),
+                )
+            )
+        for column, low, high in [
+            (Project.start_date, query.started_after, query.started_before),
+            (Project.deadline, query.deadline_after, query.deadline_before),
+        ]:
+            if low is not None:
+                statement = statement.where(column >= low)
+            if high is not None:
+                statement = statement.where(column <= high)
+
+        filter_balance = query.min_balance is not None or query.max_balance is not None
+        factor = balance = None
+        if with_rates or with_balance or filter_balance:
+            statement, factor = self._with_rates(statement)
+        if factor is not None and (with_balance or filter_balance):
+            statement, balance = self._with_balance(statement, factor)
+            if query.min_balance is not None:
+                statement = statement.where(balance >= query.min_balance)
+            if query.max_balance is not None:
+                statement = statement.where(balance <= query.max_balance)
+        return statement, factor, balance
+
+    def _with_rates(
+        self, statement: Select[Any]
+    ) -> Tuple[Select[Any], ColumnElement[float]]:
+        """Соединение с текущими курсами; множитель пересчета в базовую валюту"""
+        rates = latest_rates(date.today())
+        statement = statement.outerjoin(rates, rates.c.currency == Project.currency)
+        return statement, func.coalesce(rates.c.rate, 1.0)
+
+    def _with_balance(
+        self, statement: Select[Any], factor: ColumnElement[float]
+    ) -> Tuple[Select[Any], ColumnElement[float]]:
+        """Соединение с суммами проекта; баланс в базовой валюте по множителю"""
+        rollup = aliased(ProjectRollup)
+        statement = statement.outerjoin(rollup, rollup.project_id == Project.id)
+        balance = (
+            func.coalesce(rollup.total_paid, 0.0)
+            - Project.total_cost
+            - func.coalesce(rollup.mods_cost, 0.0)
+        ) * factor
+        return statement, balance
+
+    def _ordered_ids_query(self, query: ProjectQuery) -> Select[Tuple[int]]:
+        """Запрос id проектов в порядке сортировки"""
+        statement, factor, balance = self._filtered_query(
+            query,
+            with_balance=query.sort == "balance",
+            with_rates=query.sort == "total_cost",
+        )
+        statement = statement.with_only_columns(Project.id)
+        key: Any
+        if query.sort == "balance":
+            key = balance
+        elif query.sort == "total_cost":
+            key = Project.total_cost * factor
+        elif query.sort == "last_payment":
+            key = (
+                select(func.max(Payment.payment_date))
+                .where(Payment.project_id == Project.id, Payment.status == "completed")
+                .scalar_subquery()
+            )
+            # Проекты без платежей — в конце при любом направлении
+            statement = statement.order_by(key.is_(None))
+        else:
+            key = getattr(Project, query.sort)
+        if query.descending:
+            return statement.order_by(key.desc(), Project.id.desc())
+        return statement.order_by(key, Project.id)
+
+    def matches_query(self, query: ProjectQuery, project_id: int) -> bool:
+        """Подходит ли проект под фильтры запроса (поиск по первичному ключу)"""
+        statement, _, _ = self._filtered_query(query)
+        return (
+            self.session.scalar(
+                statement.with_only_columns(Project.id).where(Project.id == project_id)
+            )
+            is not None
+        )
+
+    def _with_rollups(self, statement: Select[Any]) -> Select[Any]:
+        return statement.add_columns(ProjectRollup).outerjoin(
+            ProjectRollup, ProjectRollup.project_id == Project.id
+        )
+
+    def search_projects(
+        self,
+        text: str = "",
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all: bool = True,
+    ) -> List[Project]:
+        """Поиск проектов по названию и описанию с учетом статуса и тегов"""
+        query = ProjectQuery.simple(text, status, tags, match_all)
+        statement, _, _ = self._filtered_query(query)
+        return list(self.session.scalars(statement.order_by(Project.id)))
+
+    def iter_projects(
+        self,
+        text: str = "",
+        status: Optional[str] = None,
+        chunk_size: int = 50,
+        tags: Optional[List[str]] = None,
+        match_all: bool = True,
+    ) -> Iterator[List[Tuple[Project, Dict[str, float]]]]:
+        """Потоковая выборка проектов с балансами порциями по chunk_size"""
+        return self.query_projects(
+            ProjectQuery.simple(text, status, tags, match_all), chunk_size
+        )
+
+    def query_projects(
+        self, query: ProjectQuery, chunk_size: int = 50
+    ) -> Iterator[List[Tuple[Project, Dict[str, float]]]]:
+        """Проекты по фильтрам и сортировке порциями по chunk_size
+
+        В порядке id каждая порция запрашивается по ключу (id > последнего).
+        При другой сортировке сначала одним запросом выбираются id в нужном
+        порядке, затем проекты загружаются порциями по этим id. В обоих
+        случаях между порциями можно безопасно выполнять commit.
+        """
+        if query.sort == "id":
+            yield from self._iter_by_id(query, chunk_size)
+            return
+
+        ids = list(self.session.scalars(self._ordered_ids_query(query)))
+        statement = self._with_rollups(select(Project))
+        for start in range(0, len(ids), chunk_size):
+            batch = ids[start : start + chunk_size]
+            rows = {
+                project.id: (project, rollup)
+                for project, rollup in self.session.execute(
+                    statement.where(Project.id.in_(batch))
+                )
+            }
+            # Проекты, удаленные между порциями, пропускаются
+            yield [
+                (rows[project_id][0], make_balance(*rows[project_id]))
+                for project_id in batch
+                if project_id in rows
+            ]
+
+    def _iter_by_id(
+        self, query: ProjectQuery, chunk_size: int
+    ) -> Iterator[List[Tuple[Project, Dict[str, float]]]]:
+        """Порции проектов в порядке id с выборкой по ключу"""
+        statement, _, _ = self._filtered_query(query)
+        statement = self._with_rollups(statement).limit(chunk_size)
+        if query.descending:
+            statement = statement.order_by(Project.id.desc())
+        else:
+            statement = statement.order_by(Project.id)
+        last_id = None
+        while True:
+            page = statement
+            if last_id is not None:
+                page = page.where(
+                    Project.id < last_id if query.descending else Project.id > last_id
+                )
+            rows = self.session.execute(page).all()
+            if not rows:
+                return
+            yield [(project, make_balance(project, rollup)) for project, rollup in rows]
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0].id
+
+    def get_open_deadlines(
+        self, since: datetime, project_id: Optional[int] = None
+    ) -> List[Tuple[str, int, int, str, datetime]]:
+        """Незавершенные проекты и доработки с дедлайном не раньше since
+
+        Возвращает кортежи (вид, id, id проекта, название, дедлайн),
+        вид — "project" или "modification".
+        """
+        projects = select(Project.id, Project.id, Project.name, Project.deadline).where(
+            Project.deadline >= since, Project.status != "completed"
+        )
+        modifications = (
+            select(
+                Modification.id,
+                Modification.project_id,
+                Project.name + ": " + Modification.description,
+                Modification.deadline,
+            )
+            .join(Project, Project.id == Modification.project_id)
+            .where(
+                Modification.deadline >= since,
+                Modification.status.not_in(["completed", "cancelled"]),
+            )
+        )
+        if project_id is not None:
+            projects = projects.where(Project.id == project_id)
+            modifications = modifications.where(Modification.project_id == project_id)
+
+        return [("project", *row) for row in self.session.execute(projects)] + [
+            ("modification", *row) for row in self.session.execute(modifications)
+        ]
+
+    def get_timeline_spans(
+        self, start: datetime, end: datetime
+    ) -> List[Tuple[str, int, int, str, datetime, datetime, str]]:
+        """Проекты и доработки, идущие в периоде [start, end]
+
+        Возвращает кортежи (вид, id, id проекта, название, начало, дедлайн,
+        статус). Отбор идет по индексу дедлайна (дедлайн не раньше start).
+        """
+        projects = select(
+            Project.id,
+            Project.id,
+            Project.name,
+            Project.start_date,
+            Project.deadline,
+            Project.status,
+        ).where(Project.deadline >= start, Project.start_date <= end)
+        modifications = (
+            select(
+                Modification.id,
+                Modification.project_id,
+                Project.name + ": " + Modification.description,
+                Modification.start_date,
+                Modification.deadline,
+                Modification.status,
+            )
+            .join(Project, Project.id == Modification.project_id)
+            .where(Modification.deadline >= start, Modification.start_date <= end)
+        )
+        return [("project", *row) for row in self.session.execute(projects)] + [
+            ("modification", *row) for row in self.session.execute(modifications)
+        ]
+
 
 class PaymentManager:
     def __init__(self, session: Session):
@@ -73,7 +494,11 @@ class PaymentManager:
     def add_payment(
         self, project_id: int, amount: float, payment_date: datetime, **kwargs
     ) -> Optional[Payment]:
-        """Добавление нового платежа"""
+        """Добавление нового платежа (по умолчанию в валюте проекта)"""
+        if "currency" not in kwargs:
+            kwargs["currency"] = self.session.scalar(
+                select(Project.currency).where(Project.id == project_id)
+            )
         payment = Payment(
             project_id=project_id, amount=amount, payment_date=payment_date, **kwargs
         )
@@ -81,20 +506,46 @@ class PaymentManager:
         self.session.commit()
         return payment
 
-    def get_project_payments(self, project_id: int) -> List[Payment]:
-        """Получение всех платежей проекта"""
+    def get_project_payments(
+        self, project_id: int, offset: int = 0, limit: Optional[int] = None
+    ) -> List[Payment]:
+        """Получение платежей проекта (постранично при заданном limit)"""
         return (
             self.session.query(Payment)
             .filter(Payment.project_id == project_id)
-            .order_by(Payment.payment_date)
+            .order_by(Payment.payment_date, Payment.id)
+            .offset(offset)
+            .limit(limit)
             .all()
         )
 
+    def get_payment_series(self, project_id: int) -> List[Tuple[datetime, float]]:
+        """Даты и суммы выполненных платежей проекта (в его валюте) для графика"""
+        amount = convert_expr(
+            Payment.amount, Payment.currency, Project.currency, Payment.payment_date
+        )
+        return [
+            tuple(row)
+            for row in self.session.execute(
+                select(Payment.payment_date, amount)
+                .join(Project, Project.id == Payment.project_id)
+                .where(Payment.project_id == project_id, Payment.status == "completed")
+                .order_by(Payment.payment_date)
+            )
+        ]
+
 
 class ModificationManager:
     def __init__(self, session: Session):
         self.session = session
 
+    def modification_exists(self, modification_id: int) -> bool:
+        """Есть ли доработка в базе (запрос в обход кэша сессии)"""
+        found = self.session.scalar(
+            select(Modification.id).where(Modification.id == modification_id)
+        )
+        return found is not None
+
     def add_modification(
         self,
         project_id: int,
@@ -105,7 +556,11 @@ class ModificationManager:
         is_paid: bool = True,
         **kwargs,
     ) -> Modification:
-        """Добавление новой доработки"""
+        """Добавление новой доработки (по умолчанию в валюте проекта)"""
+        if "currency" not in kwargs:
+            kwargs["currency"] = self.session.scalar(
+                select(Project.currency).where(Project.id == project_id)
+            )
         modification = Modification(
             project_id=project_id,
             description=description,
@@ -133,11 +588,629 @@ class ModificationManager:
         self.session.commit()
         return payment
 
-    def get_project_modifications(self, project_id: int) -> List[Modification]:
-        """Получение всех доработок проекта"""
+    def get_project_modifications(
+        self, project_id: int, offset: int = 0, limit: Optional[int] = None
+    ) -> List[Modification]:
+        """Получение доработок проекта (постранично при заданном limit)"""
         return (
             self.session.query(Modification)
             .filter(Modification.project_id == project_id)
-            .order_by(Modification.start_date)
+            .order_by(Modification.start_date, Modification.id)
+            .offset(offset)
+            .limit(limit)
             .all()
         )
+
+    def get_modification_series(
+        self, project_id: int
+    ) -> List[Tuple[datetime, float, str]]:
+        """Даты, стоимости (с оплатой времени, в валюте проекта) и описания
+        платных доработок"""
+        # Записи времени только доработок этого проекта (поиск по индексу)
+        time_amounts = (
+            self._time_totals_query()
+            .where(
+                TimeEntry.modification_id.in_(
+                    select(Modification.id).where(Modification.project_id == project_id)
+                )
+            )
+            .subquery()
+        )
+        cost = convert_expr(
+            Modification.cost + func.coalesce(time_amounts.c.amount, 0.0),
+            Modification.currency,
+            Project.currency,
+            Modification.start_date,
+        )
+        return [
+            tuple(row)
+            for row in self.session.execute(
+                select(Modification.start_date, cost, Modification.description)
+                .join(Project, Project.id == Modification.project_id)
+                .outerjoin(
+                    time_amounts,
+                    time_amounts.c.modification_id == Modification.id,
+                )
+                .where(Modification.project_id == project_id, Modification.is_paid)
+                .order_by(Modification.start_date)
+            )
+        ]
+
+    def _time_totals_query(self) -> Select[Any]:
+        """Минуты и сумма по записям времени каждой доработки"""
+        return select(
+            TimeEntry.modification_id,
+            func.sum(TimeEntry.minutes).label("minutes"),
+            func.sum(TimeEntry.minutes * TimeEntry.rate / 60.0).label("amount"),
+        ).group_by(TimeEntry.modification_id)
+
+    def get_time_totals(
+        self, modification_ids: List[int]
+    ) -> Dict[int, Tuple[float, float]]:
+        """Минуты и сумма затраченного времени по доработкам"""
+        if not modification_ids:
+            return {}
+        rows = self.session.execute(
+            self._time_totals_query().where(
+                TimeEntry.modification_id.in_(modification_ids)
+            )
+        )
+        return {row.modification_id: (row.minutes, row.amount) for row in rows}
+
+    def get_last_rate(self, modification_id: int) -> Optional[float]:
+        """Ставка последней записи времени доработки"""
+        return self.session.scalar(
+            select(TimeEntry.rate)
+            .where(TimeEntry.modification_id == modification_id)
+            .order_by(TimeEntry.start_time.desc())
+            .limit(1)
+        )
+
+    def add_time_entry(
+        self,
+        modification_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        rate: float,
+    ) -> TimeEntry:
+        """Добавление записи затраченного времени"""
+        entry = TimeEntry(
+            modification_id=modification_id,
+            start_time=start_time,
+            end_time=end_time,
+            minutes=(end_time - start_time).total_seconds() / 60,
+            rate=rate,
+        )
+        self.session.add(entry)
+        self.session.commit()
+        return entry
+
+
+class ReportManager:
+    def __init__(self, session: Session, currency: str = BASE_CURRENCY):
+        self.session = session
+        # Валюта, в которую пересчитываются суммы отчетов
+        self.currency = currency
+
+    def _to_report_currency(self) -> Tuple[Subquery, ColumnElement[float]]:
+        """Курсы валют проектов и множитель пересчета в валюту отчета
+
+        Суммы проектов пересчитываются по текущему курсу.
+        """
+        rates = latest_rates(date.today())
+        target_rate = reporting_rate(self.session, self.currency)
+        factor = case(
+            (Project.currency == self.currency, 1.0),
+            else_=func.coalesce(rates.c.rate, 1.0) / target_rate,
+        )
+        return rates, factor
+
+    def _project_balances(self) -> Subquery:
+        """Подзапрос: стоимость, оплата и остаток по каждому проекту
+        в валюте отчета"""
+        rates, factor = self._to_report_currency()
+        total_cost = (Project.total_cost + ProjectRollup.mods_cost) * factor
+        total_paid = ProjectRollup.total_paid * factor
+        return (
+            select(
+                Project.id.label("project_id"),
+                Project.status,
+                Project.deadline,
+                Project.client_id,
+                total_cost.label("total_cost"),
+                total_paid.label("total_paid"),
+                (total_cost - total_paid).label("outstanding"),
+            )
+            .join(ProjectRollup, ProjectRollup.project_id == Project.id)
+            .outerjoin(rates, rates.c.currency == Project.currency)
+            .subquery()
+        )
+
+    def get_totals(self) -> Dict[str, Any]:
+        """Итоги по всем проектам"""
+        balances = self._project_balances()
+        row = self.session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(balances.c.total_cost), 0.0),
+                func.coalesce(func.sum(balances.c.total_paid), 0.0),
+                func.coalesce(
+                    func.sum(balances.c.outstanding).filter(balances.c.outstanding > 0),
+                    0.0,
+                ),
+            )
+        ).one()
+        active = self.session.scalar(
+            select(func.count()).where(Project.status == "active")
+        )
+        return {
+            "projects": row[0],
+            "active_projects": active,
+            "total_cost": row[1],
+            "total_paid": row[2],
+            "outstanding": row[3],
+        }
+
+    def get_receivables_aging(
+        self, today: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Дебиторская задолженность по срокам просрочки"""
+        balances = self._project_balances()
+        days_overdue = func.julianday(today or datetime.now()) - func.julianday(
+            balances.c.deadline
+        )
+        buckets = [
+            (days_overdue <= 0, "Срок не наступил"),
+            (days_overdue <= 30, "1–30 дней"),
+            (days_overdue <= 60, "31–60 дней"),
+            (days_overdue <= 90, "61–90 дней"),
+        ]
+        bucket = case(*buckets, else_="Более 90 дней").label("bucket")
+        rows = self.session.execute(
+            select(bucket, func.count(), func.sum(balances.c.outstanding))
+            .where(balances.c.outstanding > 0)
+            .group_by(bucket)
+        ).all()
+
+        # Порядок корзин фиксирован, пустые корзины тоже показываем
+        found = {name: (count, amount) for name, count, amount in rows}
+        return [
+            {
+                "bucket": name,
+                "projects": found.get(name, (0, 0.0))[0],
+                "amount": found.get(name, (0, 0.0))[1],
+            }
+            for name in [name for _, name in buckets] + ["Более 90 дней"]
+        ]
+
+    def get_revenue_by_month(
+        self, since: Optional[datetime] = None
+    ) -> List[Tuple[str, float]]:
+        """Поступления по месяцам в валюте отчета
+
+        База суммирует платежи по дням и валютам, пересчет по курсам
+        на каждый день выполняется пачкой в NumPy.
+        """
+        day = func.date(Payment.payment_date).label("day")
+        query = (
+            select(day, Payment.currency, func.sum(Payment.amount))
+            .where(Payment.status == "completed")
+            .group_by(day, Payment.currency)
+        )
+        if since:
+            query = query.where(Payment.payment_date >= since)
+        rows = self.session.execute(query).all()
+        if not rows:
+            return []
+
+        days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+        currencies = np.array([row[1] for row in rows], dtype=object)
+        amounts = np.array([row[2] for row in rows], dtype=np.float64)
+        converted = RateTable.load(self.session).convert(
+            amounts, currencies, days, self.currency
+        )
+
+        months, index = np.unique(days.astype("datetime64[M]"), return_inverse=True)
+        totals = np.bincount(index, weights=converted, minlength=len(months))
+        return [(str(month), float(total)) for month, total in zip(months, totals)]
+
+    def get_top_clients(self, limit: int = 5) -> List[Tuple[str, float, int]]:
+        """Клиенты с наибольшей суммой оплат"""
+        return [
+            (row["name"], row["lifetime_value"], row["projects"])
+            for row in ClientManager(self.session, self.currency).get_client_summaries(
+                limit=limit
+            )
+        ]
+
+    def get_top_technologies(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Самые частые технологии в проектах"""
+        return ProjectManager(self.session).get_tag_counts(limit)
+
+    def get_statement_rows(
+        self, period_start: datetime, period_end: datetime
+    ) -> Sequence[Row[Any]]:
+        """Данные для выписок клиентам за период одним агрегирующим запросом
+
+        В выборку попадают проекты с контактами клиента, которые активны
+        или имели оплаты/доработки в периоде.
+        """
+        period_payments = (
+            select(
+                Payment.project_id,
+                func.sum(
+                    convert_expr(
+                        Payment.amount,
+                        Payment.currency,
+                        self.currency,
+                        Payment.payment_date,
+                    )
+                ).label("paid"),
+                func.count().label("payments"),
+            )
+            .where(
+                Payment.status == "completed",
+                Payment.payment_date >= period_start,
+                Payment.payment_date < period_end,
+            )
+            .group_by(Payment.project_id)
+            .subquery()
+        )
+        # Доработки как в project_rollups: фиксированная стоимость по дате
+        # начала и оплата времени по дате записи
+        fixed_costs = select(
+            Modification.project_id,
+            Modification.id.label("modification_id"),
+            convert_expr(
+                Modification.cost,
+                Modification.currency,
+                self.currency,
+                Modification.start_date,
+            ).label("cost"),
+        ).where(
+            Modification.is_paid.is_(True),
+            Modification.start_date >= period_start,
+            Modification.start_date < period_end,
+        )
+        time_costs = (
+            select(
+                Modification.project_id,
+                Modification.id.label("modification_id"),
+                convert_expr(
+                    TimeEntry.minutes * TimeEntry.rate / 60.0,
+                    Modification.currency,
+                    self.currency,
+                    TimeEntry.start_time,
+                ).label("cost"),
+            )
+            .select_from(TimeEntry)
+            .join(Modification, Modification.id == TimeEntry.modification_id)
+            .where(
+                Modification.is_paid.is_(True),
+                TimeEntry.start_time >= period_start,
+                TimeEntry.start_time < period_end,
+            )
+        )
+        billed = union_all(fixed_costs, time_costs).subquery()
+        period_mods = (
+            select(
+                billed.c.project_id,
+                func.sum(billed.c.cost).label("cost"),
+                func.count(billed.c.modification_id.distinct()).label("modifications"),
+            )
+            .group_by(billed.c.project_id)
+            .subquery()
+        )
+        rates, factor = self._to_report_currency()
+        total_cost = (Project.total_cost + ProjectRollup.mods_cost) * factor
+        paid = func.coalesce(period_payments.c.paid, 0.0)
+        mods = func.coalesce(period_mods.c.cost, 0.0)
+        return self.session.execute(
+            select(
+                Project.id.label("project_id"),
+                Project.name,
+                Project.status,
+                Project.deadline,
+                Client.id.label("client_id"),
+                Client.name.label("client_name"),
+                total_cost.label("total_cost"),
+                (ProjectRollup.total_paid * factor).label("total_paid"),
+                paid.label("period_paid"),
+                func.coalesce(period_payments.c.payments, 0).label("period_payments"),
+                mods.label("period_mods_cost"),
+                func.coalesce(period_mods.c.modifications, 0).label(
+                    "period_modifications"
+                ),
+            )
+            .join(Client, Client.id == Project.client_id)
+            .join(ProjectRollup, ProjectRollup.project_id == Project.id)
+            .outerjoin(rates, rates.c.currency == Project.currency)
+            .outerjoin(period_payments, period_payments.c.project_id == Project.id)
+            .outerjoin(period_mods, period_mods.c.project_id == Project.id)
+            .where(
+                or_(
+                    Project.status == "active",
+                    period_payments.c.paid.is_not(None),
+                    period_mods.c.cost.is_not(None),
+                ),
+            )
+            .order_by(Client.name, Client.id, Project.id)
+        ).all()
+
+
+class ClientManager:
+    def __init__(self, session: Session, currency: str = BASE_CURRENCY):
+        self.session = session
+        # Валюта сумм в сводках по клиентам
+        self.currency = currency
+
+    def get_client(self, client_id: int) -> Optional[Client]:
+        """Получение клиента по ID"""
+        return self.session.get(Client, client_id)
+
+    def find_clients(self, text: str, limit: int = 20) -> List[Client]:
+        """Поиск клиентов по адресу почты или началу имени"""
+        text = text.strip()
+        email = client_email(text)
+        if email:
+            condition = Client.email == email
+        else:
+            condition = Client.name.startswith(text, autoescape=True)
+        return list(
+            self.session.scalars(
+                select(Client).where(condition).order_by(Client.name).limit(limit)
+            )
+        )
+
+    def get_client_projects(self, client_id: int) -> List[Project]:
+        """Проекты клиента"""
+        return list(
+            self.session.scalars(
+                select(Project)
+                .where(Project.client_id == client_id)
+                .order_by(Project.start_date, Project.id)
+            )
+        )
+
+    def _summaries_query(self) -> Select[Any]:
+        """Сводка по клиентам: проекты, оплачено за все время, долг"""
+        balances = ReportManager(self.session, self.currency)._project_balances()
+        lifetime_value = func.sum(balances.c.total_paid).label("lifetime_value")
+        return (
+            select(
+                Client.id,
+                Client.name,
+                Client.email,
+                func.count().label("projects"),
+                func.count()
+                .filter(balances.c.status == "active")
+                .label("active_projects"),
+                func.sum(balances.c.total_cost).label("billed"),
+                lifetime_value,
+                func.coalesce(
+                    func.sum(balances.c.outstanding).filter(balances.c.outstanding > 0),
+                    0.0,
+                ).label("outstanding"),
+            )
+            .join(balances, balances.c.client_id == Client.id)
+            .group_by(Client.id)
+        )
+
+    def get_client_summaries(
+        self, order_by: str = "lifetime_value", limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Сводки по всем клиентам одним групповым запросом
+
+        order_by — поле сводки для сортировки по убыванию.
+        """
+        query = self._summaries_query()
+        order = query.selected_columns[order_by]
+        rows = self.session.execute(
+            query.order_by(order.desc(), Client.name).limit(limit)
+        )
+        return [dict(row._mapping) for row in rows]
+
+    def get_client_summary(self, client_id: int) -> Optional[Dict[str, Any]]:
+        """Сводка по одному клиенту"""
+        row = self.session.execute(
+            self._summaries_query().where(Client.id == client_id)
+        ).first()
+        return dict(row._mapping) if row else None
+
+
+# Насколько вперед платежи графиков создаются в базе
+SCHEDULE_HORIZON = timedelta(days=90)
+
+
+def _schedule_end(
+    schedule: PaymentSchedule, until: Optional[datetime]
+) -> Optional[datetime]:
+    """Последняя дата, до которой нужны платежи графика"""
+    ends = [moment for moment in (schedule.end_date, until) if moment is not None]
+    return min(ends) if ends else None
+
+
+def _expected_stream(
+    schedule: PaymentSchedule, until: Optional[datetime]
+) -> Iterator[Tuple[datetime, int, PaymentSchedule]]:
+    """Еще не созданные платежи графика (id — для сравнения одинаковых дат)"""
+    for moment in occurrences(
+        schedule.start_date,
+        schedule.cadence,
+        _schedule_end(schedule, until),
+        schedule.materialized_until,
+    ):
+        yield moment, schedule.id, schedule
+
+
+class ScheduleManager:
+    """Графики повторяющихся платежей
+
+    В базе создаются только платежи до горизонта SCHEDULE_HORIZON;
+    более поздние вычисляются лениво для просмотра и прогноза.
+    """
+
+    def __init__(self, session: Session, currency: str = BASE_CURRENCY):
+        self.session = session
+        # Валюта прогноза поступлений
+        self.currency = currency
+
+    def create_schedule(
+        self,
+        project_id: int,
+        amount: float,
+        cadence: str,
+        start_date: datetime,
+        end_date: Optional[datetime] = None,
+        **kwargs: Any,
+    ) -> PaymentSchedule:
+        """Создание графика вместе с платежами до горизонта"""
+        if cadence not in CADENCES:
+            raise ValueError(f"Неизвестная периодичность: {cadence}")
+        if end_date is not None and end_date < start_date:
+            raise ValueError("Дата окончания графика раньше даты начала")
+        if "currency" not in kwargs:
+            kwargs["currency"] = self.session.scalar(
+                select(Project.currency).where(Project.id == project_id)
+            )
+        schedule = PaymentSchedule(
+            project_id=project_id,
+            amount=amount,
+            cadence=cadence,
+            start_date=start_date,
+            end_date=end_date,
+            **kwargs,
+        )
+        self.session.add(schedule)
+        self.session.flush()
+        self._materialize([schedule], datetime.now() + SCHEDULE_HORIZON)
+        self.session.commit()
+        return schedule
+
+    def get_project_schedules(self, project_id: int) -> List[PaymentSchedule]:
+        """Графики платежей проекта"""
+        return list(
+            self.session.scalars(
+                select(PaymentSchedule)
+                .where(PaymentSchedule.project_id == project_id)
+                .order_by(PaymentSchedule.start_date, PaymentSchedule.id)
+            )
+        )
+
+    def delete_schedule(self, schedule_id: int) -> bool:
+        """Удаление графика и его ожидаемых платежей, еще не наступивших"""
+        schedule = self.session.get(PaymentSchedule, schedule_id)
+        if schedule is None:
+            return False
+        self.session.execute(
+            delete(Payment).where(
+                Payment.schedule_id == schedule_id,
+                Payment.status == "pending",
+                Payment.payment_date > datetime.now(),
+            )
+        )
+        # Прошедшие платежи остаются обычными платежами проекта
+        self.session.execute(
+            update(Payment)
+            .where(Payment.schedule_id == schedule_id)
+            .values(schedule_id=None)
+        )
+        self.session.delete(schedule)
+        self.session.commit()
+        return True
+
+    def _materialize(
+        self, schedules: Sequence[PaymentSchedule], until: datetime
+    ) -> List[int]:
+        """Вставка платежей графиков до until одним пакетом; id проектов"""
+        rows = []
+        projects = set()
+        for schedule in schedules:
+            # При заданном until конец графика всегда известен
+            end = _schedule_end(schedule, until) or until
+            for moment in occurrences(
+                schedule.start_date, schedule.cadence, end, schedule.materialized_until
+            ):
+                rows.append(
+                    {
+                        "project_id": schedule.project_id,
+                        "schedule_id": schedule.id,
+                        "amount": schedule.amount,
+                        "currency": schedule.currency,
+                        "payment_date": moment,
+                        "payment_type": schedule.payment_type,
+                        "description": schedule.description,
+                        "status": "pending",
+                    }
+                )
+                projects.add(schedule.project_id)
+            if schedule.materialized_until is None or schedule.materialized_until < end:
+                schedule.materialized_until = end
+        if rows:
+            self.session.execute(insert(Payment), rows)
+        return sorted(projects)
+
+    def materialize(self, until: Optional[datetime] = None) -> List[int]:
+        """Создание платежей всех графиков до горизонта
+
+        Возвращает id проектов, у которых появились платежи: пакетная
+        вставка минует события сессии.
+        """
+        until = until or datetime.now() + SCHEDULE_HORIZON
+        schedules = self.session.scalars(
+            select(PaymentSchedule).where(
+                or_(
+                    PaymentSchedule.materialized_until.is_(None),
+                    PaymentSchedule.materialized_until < until,
+                ),
+                or_(
+                    PaymentSchedule.end_date.is_(None),
+                    PaymentSchedule.materialized_until.is_(None),
+                    PaymentSchedule.materialized_until < PaymentSchedule.end_date,
+                ),
+            )
+        ).all()
+        projects = self._materialize(schedules, until)
+        self.session.commit()
+        return projects
+
+    def iter_expected_payments(
+        self, until: Optional[datetime] = None, project_id: Optional[int] = None
+    ) -> Iterator[Tuple[datetime, PaymentSchedule]]:
+        """Еще не созданные платежи графиков по порядку дат (лениво)
+
+        Без until и даты окончания график бесконечен: берите нужное
+        количество, например через itertools.islice.
+        """
+        query = select(PaymentSchedule)
+        if project_id is not None:
+            query = query.where(PaymentSchedule.project_id == project_id)
+        streams = [
+            _expected_stream(schedule, until)
+            for schedule in self.session.scalars(query)
+        ]
+        for moment, _, schedule in heapq.merge(*streams):
+            yield moment, schedule
+
+    def get_forecast(self, until: datetime) -> List[Tuple[str, float]]:
+        """Ожидаемые поступления по месяцам до until в валюте отчета
+
+        Учитываются созданные ожидаемые платежи и будущие платежи графиков.
+        """
+        rates = RateTable.load(self.session)
+        totals: Dict[str, float] = defaultdict(float)
+        pending = self.session.execute(
+            select(Payment.payment_date, Payment.amount, Payment.currency).where(
+                Payment.status == "pending",
+                Payment.payment_date.between(datetime.now(), until),
+            )
+        )
+        expected = (
+            (moment, schedule.amount, schedule.currency)
+            for moment, schedule in self.iter_expected_payments(until)
+        )
+        for moment, amount, currency in itertools.chain(pending, expected):
+            totals[moment.strftime("%Y-%m")] += rates.convert_amount(
+                amount, currency, self.currency, moment
+            )
+        return sorted(totals.items())
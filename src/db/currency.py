@@ -0,0 +1,193 @@
+"""Курсы валют и пересчет сумм в валюту отчета
+
+Курс хранится как стоимость единицы валюты в базовой валюте на дату.
+Для даты берется последний известный курс, до первого курса — самый ранний.
+Пересчет выполняется в SQL (соединение с таблицей курсов) или пачкой в NumPy
+через RateTable, а не построчно в Python.
+"""
+
+import csv
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import ColumnElement, SQLColumnExpression, Subquery, case, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, aliased
+
+from .migrations import RECALC_ALL_ROLLUPS
+from .models import BASE_CURRENCY, ExchangeRate
+
+DateLike = Union[date, datetime, np.datetime64]
+
+# Размер кэша курсов на дату в RateTable
+RATE_CACHE_SIZE = 4096
+
+
+def rate_expr(
+    currency: Union[str, SQLColumnExpression[str]],
+    on: Union[date, SQLColumnExpression[Any]],
+) -> ColumnElement[float]:
+    """SQL-выражение курса валюты на дату (столбец или значение)"""
+    latest = (
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.currency == currency, ExchangeRate.rate_date <= on)
+        .order_by(ExchangeRate.rate_date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    earliest = (
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.currency == currency)
+        .order_by(ExchangeRate.rate_date)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return func.coalesce(latest, earliest, 1.0)
+
+
+def convert_expr(
+    amount: SQLColumnExpression[float],
+    currency: SQLColumnExpression[str],
+    target: Union[str, SQLColumnExpression[str]],
+    on: SQLColumnExpression[Any],
+) -> ColumnElement[float]:
+    """SQL-выражение пересчета суммы в валюту target по курсу на дату"""
+    return case(
+        (currency == target, amount),
+        else_=amount
+        * rate_expr(currency, func.date(on))
+        / rate_expr(target, func.date(on)),
+    )
+
+
+def latest_rates(on: date) -> Subquery:
+    """Подзапрос (currency, rate): курс каждой валюты на дату для соединения"""
+    inner = aliased(ExchangeRate)
+    best_date = func.coalesce(
+        select(func.max(inner.rate_date))
+        .where(inner.currency == ExchangeRate.currency, inner.rate_date <= on)
+        .scalar_subquery(),
+        select(func.min(inner.rate_date))
+        .where(inner.currency == ExchangeRate.currency)
+        .scalar_subquery(),
+    )
+    return (
+        select(ExchangeRate.currency, ExchangeRate.rate)
+        .where(ExchangeRate.rate_date == best_date)
+        .subquery("rates")
+    )
+
+
+class RateTable:
+    """Курсы валют в памяти: массивы дат и курсов по каждой валюте
+
+    Курс на дату запоминается, пересчет массива сумм выполняется
+    одним searchsorted на валюту.
+    """
+
+    def __init__(
+        self, rates: Mapping[str, Tuple[Sequence[DateLike], Sequence[float]]]
+    ) -> None:
+        self._dates: Dict[str, np.ndarray] = {}
+        self._rates: Dict[str, np.ndarray] = {}
+        for currency, (dates, values) in rates.items():
+            days = np.asarray(dates, dtype="datetime64[D]")
+            order = np.argsort(days, kind="stable")
+            self._dates[currency] = days[order]
+            self._rates[currency] = np.asarray(values, dtype=np.float64)[order]
+        self.rate_on = lru_cache(maxsize=RATE_CACHE_SIZE)(self._rate_on)
+
+    @classmethod
+    def load(cls, session: Session) -> "RateTable":
+        """Загрузка всех курсов из базы"""
+        grouped: Dict[str, Tuple[List[date], List[float]]] = {}
+        for currency, rate_date, rate in session.execute(
+            select(
+                ExchangeRate.currency, ExchangeRate.rate_date, ExchangeRate.rate
+            ).order_by(ExchangeRate.currency, ExchangeRate.rate_date)
+        ):
+            dates, values = grouped.setdefault(currency, ([], []))
+            dates.append(rate_date)
+            values.append(rate)
+        return cls(grouped)
+
+    @property
+    def currencies(self) -> List[str]:
+        """Валюты, для которых есть курсы"""
+        return sorted(self._dates)
+
+    def _rates_on(self, currency: str, days: np.ndarray) -> np.ndarray:
+        """Курсы валюты на массив дат"""
+        dates = self._dates.get(currency)
+        if dates is None or currency == BASE_CURRENCY:
+            return np.ones(len(days))
+        index = np.searchsorted(dates, days, side="right") - 1
+        return self._rates[currency][np.maximum(index, 0)]
+
+    def _rate_on(self, currency: str, on: DateLike) -> float:
+        days = np.array([on], dtype="datetime64[D]")
+        return float(self._rates_on(currency, days)[0])
+
+    def convert_amount(
+        self, amount: float, currency: str, target: str, on: DateLike
+    ) -> float:
+        """Пересчет одной суммы в валюту target"""
+        if currency == target:
+            return amount
+        return amount * self.rate_on(currency, on) / self.rate_on(target, on)
+
+    def convert(
+        self,
+        amounts: np.ndarray,
+        currencies: np.ndarray,
+        dates: np.ndarray,
+        target: str,
+    ) -> np.ndarray:
+        """Пересчет массива сумм в валюту target по курсам на их даты"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        currencies = np.asarray(currencies, dtype=object)
+        days = np.asarray(dates, dtype="datetime64[D]")
+        factors = np.ones(len(amounts))
+        for currency in set(currencies.tolist()):
+            mask = currencies == currency
+            factors[mask] = self._rates_on(currency, days[mask])
+        if target != BASE_CURRENCY:
+            factors /= self._rates_on(target, days)
+        return amounts * factors
+
+
+def import_rates(engine: Engine, csv_path: str, delimiter: str = ",") -> int:
+    """Загрузка курсов из CSV (date,currency,rate) и пересчет сумм проектов
+
+    Повторная загрузка курса на ту же дату заменяет прежний.
+    """
+    with open(csv_path, newline="", encoding="utf-8-sig") as file:
+        rows = [
+            (
+                datetime.strptime(row["date"].strip(), "%Y-%m-%d").date().isoformat(),
+                row["currency"].strip().upper(),
+                float(row["rate"].replace(",", ".")),
+            )
+            for row in csv.DictReader(file, delimiter=delimiter)
+            if row.get("date")
+        ]
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT OR REPLACE INTO exchange_rates (rate_date, currency, rate) "
+            "VALUES (?, ?, ?)",
+            rows,
+        )
+        if rows:
+            connection.exec_driver_sql(RECALC_ALL_ROLLUPS)
+    return len(rows)
+
+
+def reporting_rate(session: Session, currency: str, on: Optional[date] = None) -> float:
+    """Курс валюты отчета на дату (по умолчанию — сегодня)"""
+    if currency == BASE_CURRENCY:
+        return 1.0
+    rate = session.execute(select(rate_expr(currency, on or date.today())))
+    return float(rate.scalar_one())
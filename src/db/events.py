@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Set, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, UOWTransaction
+
+from src.utils.event_bus import EventBus
+from .models import Project, Payment, Modification, ModificationPayment, TimeEntry
+
+# Темы изменений
+PROJECT = "project"
+PAYMENTS = "payments"
+MODIFICATIONS = "modifications"
+TIME_ENTRIES = "time_entries"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """Сообщение вида «у проекта 42 изменились платежи»"""
+
+    project_id: int
+    topic: str
+    deleted: bool = False
+
+
+def bind_change_events(session: Session, bus: EventBus) -> None:
+    """Публикация изменений сессии в шину после каждого commit
+
+    Обработчики вызываются внутри commit, поэтому обращаться к БД
+    они должны отложенно (например, через after_idle в Tk).
+    """
+    pending: Set[ChangeEvent] = set()
+
+    def _project_id_of(
+        sess: Session, obj: Union[Modification, ModificationPayment, TimeEntry]
+    ) -> Optional[int]:
+        if isinstance(obj, Modification):
+            return obj.project_id
+        modification: Optional[Modification] = obj.__dict__.get("modification")
+        if modification is not None:
+            return modification.project_id
+        # Доработка не загружена: берем project_id напрямую из таблицы
+        project_id: Optional[int] = sess.connection().scalar(
+            select(Modification.project_id).where(
+                Modification.id == obj.modification_id
+            )
+        )
+        return project_id
+
+    def _collect(sess: Session, obj: Any, deleted: bool) -> None:
+        if isinstance(obj, Project):
+            pending.add(ChangeEvent(obj.id, PROJECT, deleted))
+        elif isinstance(obj, Payment):
+            pending.add(ChangeEvent(obj.project_id, PAYMENTS))
+        elif isinstance(obj, (Modification, ModificationPayment)):
+            project_id = _project_id_of(sess, obj)
+            if project_id is not None:
+                pending.add(ChangeEvent(project_id, MODIFICATIONS))
+        elif isinstance(obj, TimeEntry):
+            project_id = _project_id_of(sess, obj)
+            if project_id is not None:
+                pending.add(ChangeEvent(project_id, TIME_ENTRIES))
+
+    @event.listens_for(session, "after_flush")
+    def _after_flush(sess: Session, flush_context: UOWTransaction) -> None:
+        for obj in sess.new:
+            _collect(sess, obj, deleted=False)
+        for obj in sess.dirty:
+            if sess.is_modified(obj, include_collections=False):
+                _collect(sess, obj, deleted=False)
+        for obj in sess.deleted:
+            _collect(sess, obj, deleted=True)
+
+    @event.listens_for(session, "after_commit")
+    def _after_commit(sess: Session) -> None:
+        events = list(pending)
+        pending.clear()
+        deleted = {e.project_id for e in events if e.topic == PROJECT and e.deleted}
+        for change in events:
+            # Каскадно удаленные платежи и доработки не публикуем отдельно
+            if change.project_id in deleted and not change.deleted:
+                continue
+            bus.publish(change)
+
+    @event.listens_for(session, "after_rollback")
+    def _after_rollback(sess: Session) -> None:
+        pending.clear()
@@ -0,0 +1,132 @@
+"""Обслуживание файла базы: статистика планировщика и возврат свободных страниц"""
+
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import Connection, Engine
+
+from .models import Base
+
+# Значение PRAGMA auto_vacuum для режима INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def prepare_new_database(connection: Connection) -> None:
+    """Включение auto_vacuum=INCREMENTAL до создания первой таблицы
+
+    Для существующей базы режим меняется только через VACUUM
+    (см. convert_to_incremental).
+    """
+    page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+    if page_count == 0:
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+
+
+def collect_stats(engine: Engine) -> Dict[str, Any]:
+    """Размер файла, свободные страницы и число строк по таблицам"""
+    path = engine.url.database
+    if not path:
+        raise ValueError("Статистика собирается только для файла базы")
+    with engine.connect() as connection:
+
+        def pragma(name: str) -> int:
+            return int(connection.exec_driver_sql(f"PRAGMA {name}").scalar_one())
+
+        page_size = pragma("page_size")
+        analyzed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).scalar()
+        return {
+            "file_size": os.path.getsize(path),
+            "page_size": page_size,
+            "page_count": pragma("page_count"),
+            "freelist_pages": pragma("freelist_count"),
+            "free_bytes": pragma("freelist_count") * page_size,
+            "auto_vacuum": pragma("auto_vacuum"),
+            "analyzed": bool(analyzed),
+            "rows": {
+                table: connection.exec_driver_sql(
+                    f"SELECT COUNT(*) FROM {table}"
+                ).scalar()
+                for table in Base.metadata.tables
+            },
+        }
+
+
+def convert_to_incremental(engine: Engine) -> bool:
+    """Перевод существующей базы в режим auto_vacuum=INCREMENTAL
+
+    Требует полного VACUUM (перезаписи файла), поэтому выполняется
+    один раз и не из интерфейса. Возвращает True, если перевод был нужен.
+    """
+    with engine.connect() as connection:
+        mode = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        if mode == AUTO_VACUUM_INCREMENTAL:
+            return False
+        connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+    return True
+
+
+def optimize(engine: Engine) -> None:
+    """Обновление статистики планировщика
+
+    Если статистики еще нет, выполняется полный ANALYZE, иначе PRAGMA optimize
+    пересчитывает ее только для таблиц, где она устарела.
+    """
+    with engine.begin() as connection:
+        analyzed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).scalar()
+        connection.exec_driver_sql("PRAGMA optimize" if analyzed else "ANALYZE")
+
+
+def incremental_vacuum(engine: Engine, pages: Optional[int] = None) -> int:
+    """Возврат свободных страниц файлу; возвращает число оставшихся
+
+    pages ограничивает объем работы за один вызов (None — все страницы).
+    В режиме без auto_vacuum ничего не делает.
+    """
+    with engine.connect() as connection:
+        pragma = "PRAGMA incremental_vacuum"
+        if pages is not None:
+            pragma += f"({int(pages)})"
+        # sqlite3.execute делает один шаг PRAGMA и освобождает одну страницу,
+        # executescript выполняет ее до конца
+        driver_connection: Any = connection.connection.driver_connection
+        driver_connection.executescript(pragma)
+        return int(connection.exec_driver_sql("PRAGMA freelist_count").scalar_one())
+
+
+def run_maintenance(engine: Engine, convert: bool = False) -> Dict[str, Any]:
+    """Полное обслуживание: статистика и возврат свободного места"""
+    before = collect_stats(engine)
+    converted = convert_to_incremental(engine) if convert else False
+    optimize(engine)
+    incremental_vacuum(engine)
+    return {"before": before, "after": collect_stats(engine), "converted": converted}
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """Отчет о состоянии базы до и после обслуживания"""
+    before, after = result["before"], result["after"]
+    modes = {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}
+    lines = [
+        f"{'':24}{'до':>14}{'после':>14}",
+        f"{'Размер файла, байт':24}{before['file_size']:>14,}{after['file_size']:>14,}",
+        f"{'Свободных страниц':24}"
+        f"{before['freelist_pages']:>14,}{after['freelist_pages']:>14,}",
+        f"{'auto_vacuum':24}"
+        f"{modes[before['auto_vacuum']]:>14}{modes[after['auto_vacuum']]:>14}",
+        f"{'Статистика (ANALYZE)':24}"
+        f"{'есть' if before['analyzed'] else 'нет':>14}"
+        f"{'есть' if after['analyzed'] else 'нет':>14}",
+        "",
+        "Строк в таблицах:",
+    ]
+    for table, count in after["rows"].items():
+        lines.append(f"  {table:22}{before['rows'].get(table, 0):>14,}{count:>14,}")
+    if result["converted"]:
+        lines.append("")
+        lines.append("База переведена в режим auto_vacuum=INCREMENTAL")
+    return "\n".join(lines)
@@ -0,0 +1,316 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .models import BASE_CURRENCY, Base
+from .clients import fill_clients
+from .tags import fill_project_tags
+
+# Курс валюты (в базовой валюте) на дату: последний известный на эту дату,
+# до первого курса — самый ранний; для базовой валюты курсов нет, и он равен 1
+_RATE = """COALESCE(
+    (SELECT rate FROM exchange_rates WHERE currency = {currency}
+     AND rate_date <= date({on}) ORDER BY rate_date DESC LIMIT 1),
+    (SELECT rate FROM exchange_rates WHERE currency = {currency}
+     ORDER BY rate_date LIMIT 1),
+    1.0)"""
+
+
+def convert_sql(amount: str, currency: str, target: str, on: str) -> str:
+    """SQL-выражение пересчета суммы из валюты currency в target по курсу на дату"""
+    return (
+        f"(CASE WHEN {currency} = {target} THEN {amount} ELSE {amount} * "
+        f"{_RATE.format(currency=currency, on=on)} / "
+        f"{_RATE.format(currency=target, on=on)} END)"
+    )
+
+
+# Суммы проекта в project_rollups хранятся в валюте проекта
+_PAID = f"""
+    (SELECT COALESCE(SUM({
+        convert_sql("pay.amount", "pay.currency", "p.currency", "pay.payment_date")
+    }), 0)
+     FROM payments AS pay JOIN projects AS p ON p.id = pay.project_id
+     WHERE pay.project_id = {{project_id}} AND pay.status = 'completed')
+"""
+# Стоимость доработок: фиксированная часть и оплата затраченного времени
+_MODS_COST = f"""
+    (SELECT COALESCE(SUM({
+        convert_sql("m.cost", "m.currency", "p.currency", "m.start_date")
+    }), 0)
+     FROM modifications AS m JOIN projects AS p ON p.id = m.project_id
+     WHERE m.project_id = {{project_id}} AND m.is_paid)
+    + (SELECT COALESCE(SUM({
+        convert_sql(
+            "t.minutes * t.rate / 60.0", "m.currency", "p.currency", "t.start_time"
+        )
+    }), 0)
+       FROM time_entries AS t
+       JOIN modifications AS m ON m.id = t.modification_id
+       JOIN projects AS p ON p.id = m.project_id
+       WHERE m.project_id = {{project_id}} AND m.is_paid)
+"""
+_RECALC_PAID = """
+    UPDATE project_rollups SET total_paid = {paid}
+    WHERE project_id = {project_id};
+"""
+_RECALC_MODS = """
+    UPDATE project_rollups SET mods_cost = {cost}
+    WHERE project_id = {project_id};
+"""
+
+
+def _recalc_paid(project_id: str) -> str:
+    return _RECALC_PAID.format(
+        paid=_PAID.format(project_id=project_id), project_id=project_id
+    )
+
+
+def _recalc_mods(project_id: str) -> str:
+    return _RECALC_MODS.format(
+        cost=_MODS_COST.format(project_id=project_id), project_id=project_id
+    )
+
+
+# Проект записи времени определяется через ее доработку
+_TIME_ENTRY_PROJECT = (
+    "(SELECT project_id FROM modifications WHERE id = {row}.modification_id)"
+)
+
+ROLLUP_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_project_insert
+    AFTER INSERT ON projects BEGIN
+        INSERT OR IGNORE INTO project_rollups (project_id, total_paid, mods_cost)
+        VALUES (NEW.id, 0, 0);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_project_delete
+    AFTER DELETE ON projects BEGIN
+        DELETE FROM project_rollups WHERE project_id = OLD.id;
+        DELETE FROM project_tags WHERE project_id = OLD.id;
+        DELETE FROM payment_schedules WHERE project_id = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_project_currency
+    AFTER UPDATE OF currency ON projects BEGIN
+        {_recalc_paid("NEW.id")} {_recalc_mods("NEW.id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_payment_insert
+    AFTER INSERT ON payments BEGIN {_recalc_paid("NEW.project_id")} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_payment_update
+    AFTER UPDATE OF project_id, amount, currency, payment_date, status
+    ON payments BEGIN
+        {_recalc_paid("OLD.project_id")} {_recalc_paid("NEW.project_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_payment_delete
+    AFTER DELETE ON payments BEGIN {_recalc_paid("OLD.project_id")} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_modification_insert
+    AFTER INSERT ON modifications BEGIN {_recalc_mods("NEW.project_id")} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_modification_update
+    AFTER UPDATE OF project_id, cost, currency, start_date, is_paid
+    ON modifications BEGIN
+        {_recalc_mods("OLD.project_id")} {_recalc_mods("NEW.project_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_modification_delete
+    AFTER DELETE ON modifications BEGIN {_recalc_mods("OLD.project_id")} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_time_entry_insert
+    AFTER INSERT ON time_entries BEGIN
+        {_recalc_mods(_TIME_ENTRY_PROJECT.format(row="NEW"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_time_entry_update
+    AFTER UPDATE OF modification_id, start_time, minutes, rate
+    ON time_entries BEGIN
+        {_recalc_mods(_TIME_ENTRY_PROJECT.format(row="OLD"))}
+        {_recalc_mods(_TIME_ENTRY_PROJECT.format(row="NEW"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_time_entry_delete
+    AFTER DELETE ON time_entries BEGIN
+        {_recalc_mods(_TIME_ENTRY_PROJECT.format(row="OLD"))}
+    END
+    """,
+]
+
+# Версия схемы (PRAGMA user_version) и триггеры, пересоздаваемые при ее смене
+SCHEMA_VERSION = 5
+# 1: в стоимость доработок входит оплата времени из time_entries
+# 2: суммы пересчитываются в валюту проекта по курсам exchange_rates
+# 3: при удалении проекта удаляются его связи с тегами
+# 4: проекты привязаны к клиентам (данные, без смены триггеров)
+# 5: при удалении проекта удаляются его графики платежей
+_CHANGED_TRIGGERS = {
+    1: [
+        "trg_rollup_modification_insert",
+        "trg_rollup_modification_update",
+        "trg_rollup_modification_delete",
+    ],
+    2: [
+        "trg_rollup_payment_insert",
+        "trg_rollup_payment_update",
+        "trg_rollup_payment_delete",
+        "trg_rollup_modification_insert",
+        "trg_rollup_modification_update",
+        "trg_rollup_modification_delete",
+        "trg_rollup_time_entry_insert",
+        "trg_rollup_time_entry_update",
+        "trg_rollup_time_entry_delete",
+    ],
+    3: ["trg_rollup_project_delete"],
+    5: ["trg_rollup_project_delete"],
+}
+# Полный пересчет сумм (после смены схемы или загрузки курсов)
+RECALC_ALL_ROLLUPS = (
+    f"UPDATE project_rollups SET "
+    f"total_paid = {_PAID.format(project_id='project_rollups.project_id')}, "
+    f"mods_cost = {_MODS_COST.format(project_id='project_rollups.project_id')}"
+)
+
+# Таблицы, изменения которых попадают в журнал синхронизации (родители первыми)
+SYNC_TABLES = [
+    "projects",
+    "modifications",
+    "payments",
+    "modification_payments",
+    "time_entries",
+]
+
+
+def _sync_trigger(table: str, event: str, op: str, row: str) -> str:
+    """Триггер записи изменения в change_log
+
+    Во время применения чужих изменений (ключ applying в sync_state)
+    журнал ведет сам импорт.
+    """
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sync_{table}_{event.lower()}
+    AFTER {event} ON {table}
+    WHEN NOT EXISTS (SELECT 1 FROM sync_state WHERE key = 'applying')
+    BEGIN
+        INSERT INTO change_log (table_name, row_uuid, op, changed_at, site_id)
+        VALUES (
+            '{table}', {row}.uuid, '{op}',
+            strftime('%Y-%m-%dT%H:%M:%fZ', 'now'),
+            (SELECT value FROM sync_state WHERE key = 'site_id')
+        );
+    END
+    """
+
+
+SYNC_TRIGGERS = [
+    _sync_trigger(table, event, op, row)
+    for table in SYNC_TABLES
+    for event, op, row in (
+        ("INSERT", "upsert", "NEW"),
+        ("UPDATE", "upsert", "NEW"),
+        ("DELETE", "delete", "OLD"),
+    )
+]
+
+# Идентификатор базы создается один раз
+INIT_SITE_ID = """
+    INSERT OR IGNORE INTO sync_state (key, value)
+    VALUES ('site_id', lower(hex(randomblob(16))))
+"""
+
+
+# Столбцы, добавленные после создания таблиц: таблица -> [(столбец, тип)]
+_ADDED_COLUMNS = {table: [("uuid", "VARCHAR(32)")] for table in SYNC_TABLES}
+for _table in ("projects", "payments", "modifications"):
+    _ADDED_COLUMNS[_table].append(
+        ("currency", f"VARCHAR(3) NOT NULL DEFAULT '{BASE_CURRENCY}'")
+    )
+_ADDED_COLUMNS["projects"].append(("client_id", "INTEGER REFERENCES clients (id)"))
+_ADDED_COLUMNS["payments"].append(
+    ("schedule_id", "INTEGER REFERENCES payment_schedules (id)")
+)
+
+
+def add_missing_columns(connection: Connection) -> None:
+    """Добавление столбцов в таблицы, созданные предыдущими версиями
+
+    Новые uuid заполняются случайными значениями.
+    """
+    for table, added in _ADDED_COLUMNS.items():
+        columns = {
+            row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")
+        }
+        for name, column_type in added:
+            if name in columns:
+                continue
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"
+            )
+            if name == "uuid":
+                connection.exec_driver_sql(
+                    f"UPDATE {table} SET uuid = lower(hex(randomblob(16))) "
+                    "WHERE uuid IS NULL"
+                )
+
+
+# Заполнение сумм для проектов, у которых их еще нет. Внешний псевдоним
+# не может быть p: подзапросы сумм сами соединяют projects AS p, и условие
+# на p.id сравнивало бы проект с самим собой
+BACKFILL_ROLLUPS = f"""
+    INSERT INTO project_rollups (project_id, total_paid, mods_cost)
+    SELECT
+        src.id,
+        {_PAID.format(project_id="src.id")},
+        {_MODS_COST.format(project_id="src.id")}
+    FROM projects AS src
+    WHERE NOT EXISTS (SELECT 1 FROM project_rollups r WHERE r.project_id = src.id)
+"""
+
+
+def create_missing_indexes(engine: Engine) -> None:
+    """Создание индексов, добавленных после создания таблиц"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def upgrade(engine: Engine) -> None:
+    """Приведение существующей базы к текущей схеме"""
+    with engine.begin() as connection:
+        add_missing_columns(connection)
+    create_missing_indexes(engine)
+    with engine.begin() as connection:
+        version: int = connection.exec_driver_sql("PRAGMA user_version").scalar_one()
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            for name in _CHANGED_TRIGGERS.get(target, []):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        for trigger in ROLLUP_TRIGGERS + SYNC_TRIGGERS:
+            connection.execute(text(trigger))
+        if version < SCHEMA_VERSION:
+            connection.exec_driver_sql(RECALC_ALL_ROLLUPS)
+        if version < 3:
+            fill_project_tags(connection)
+        if version < 4:
+            # Привязка к клиентам не должна попадать в журнал синхронизации
+            connection.exec_driver_sql(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('applying', 1)"
+            )
+            fill_clients(connection)
+            connection.exec_driver_sql("DELETE FROM sync_state WHERE key = 'applying'")
+        if version < SCHEMA_VERSION:
+            connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        connection.execute(text(BACKFILL_ROLLUPS))
+        connection.execute(text(INIT_SITE_ID))
@@ -1,50 +1,104 @@
-from datetime import datetime
+import sqlite3
+from datetime import date, datetime
+from typing import Any, List, Optional
+from uuid import uuid4
 from sqlalchemy import (
     create_engine,
-    Column,
     Integer,
     String,
     Float,
+    Date,
     DateTime,
     ForeignKey,
     Boolean,
     Text,
+    Index,
+    event,
 )
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    relationship,
+    sessionmaker,
+)
+
+
+class Base(DeclarativeBase):
+    """Базовый класс моделей"""
+
 
-Base = declarative_base()
+# Базовая валюта: курсы хранятся как цена единицы валюты в базовой валюте
+BASE_CURRENCY = "RUB"
+CURRENCIES = ["RUB", "USD", "EUR"]
+
+
+def new_uuid() -> str:
+    """Постоянный идентификатор строки для синхронизации баз"""
+    return uuid4().hex
 
 
 class Project(Base):
     __tablename__ = "projects"
 
-    id = Column(Integer, primary_key=True)
-    name = Column(String(255), nullable=False)
-    start_date = Column(DateTime, nullable=False)
-    deadline = Column(DateTime, nullable=False)
-    status = Column(String(50), default="active")
-    total_cost = Column(Float, nullable=False)
-    tech_stack = Column(Text)
-    description = Column(Text)
-    client_contacts = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    uuid: Mapped[str] = mapped_column(
+        String(32), default=new_uuid, unique=True, index=True, nullable=True
+    )
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    start_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    deadline: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(
+        String(50), default="active", index=True, nullable=True
+    )
+    total_cost: Mapped[float] = mapped_column(Float, nullable=False)
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY
+    )
+    tech_stack: Mapped[Optional[str]] = mapped_column(Text)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    client_contacts: Mapped[Optional[str]] = mapped_column(Text)
+    # Клиент определяется по контактам (см. clients.assign_clients)
+    client_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("clients.id"), index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
+    )
 
     # Relationships
-    payments = relationship(
+    payments: Mapped[List["Payment"]] = relationship(
         "Payment", back_populates="project", cascade="all, delete-orphan"
     )
-    modifications = relationship(
+    modifications: Mapped[List["Modification"]] = relationship(
         "Modification", back_populates="project", cascade="all, delete-orphan"
     )
+    schedules: Mapped[List["PaymentSchedule"]] = relationship(
+        "PaymentSchedule", back_populates="project", cascade="all, delete-orphan"
+    )
+    # Теги заполняются из tech_stack (см. tags.refresh_project_tags)
+    tags: Mapped[List["Tag"]] = relationship(
+        "Tag", secondary="project_tags", viewonly=True
+    )
+    client: Mapped[Optional["Client"]] = relationship(
+        "Client", back_populates="projects"
+    )
 
     def calculate_balance(self) -> dict:
         """Расчет текущего баланса проекта"""
         total_paid = sum(
             payment.amount for payment in self.payments if payment.status == "completed"
         )
-        mods_cost = sum(mod.cost for mod in self.modifications if mod.is_paid)
+        mods_cost = sum(
+            mod.cost + sum(entry.amount for entry in mod.time_entries)
+            for mod in self.modifications
+            if mod.is_paid
+        )
         total_cost = self.total_cost + mods_cost
         balance = total_paid - total_cost
 
@@ -57,58 +111,288 @@ class Project(Base):
         }
 
 
+class Client(Base):
+    """Клиент: проекты с одним адресом почты или одним именем в контактах"""
+
+    __tablename__ = "clients"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    email: Mapped[Optional[str]] = mapped_column(String(200), index=True)
+    # Контакты проекта, по которому клиент был создан
+    contacts: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=True
+    )
+
+    # Relationships
+    projects: Mapped[List["Project"]] = relationship("Project", back_populates="client")
+
+
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_project_date", "project_id", "payment_date"),
+        Index("ix_payments_status_date", "status", "payment_date", "amount"),
+    )
 
-    id = Column(Integer, primary_key=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    amount = Column(Float, nullable=False)
-    payment_date = Column(DateTime, nullable=False)
-    payment_type = Column(String(50))
-    description = Column(Text)
-    status = Column(String(50), default="pending")
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    uuid: Mapped[str] = mapped_column(
+        String(32), default=new_uuid, unique=True, index=True, nullable=True
+    )
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id"), nullable=False
+    )
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY
+    )
+    payment_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    payment_type: Mapped[Optional[str]] = mapped_column(String(50))
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(50), default="pending", nullable=True)
+    # График, по которому создан ожидаемый платеж
+    schedule_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("payment_schedules.id"), index=True
+    )
+
+    # Relationships
+    project: Mapped["Project"] = relationship("Project", back_populates="payments")
+
+
+class PaymentSchedule(Base):
+    """График повторяющихся платежей (абонентское обслуживание)
+
+    Платежи графика создаются только до materialized_until, остальные
+    вычисляются по мере надобности (см. utils.recurrence).
+    """
+
+    __tablename__ = "payment_schedules"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id"), nullable=False, index=True
+    )
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY
+    )
+    cadence: Mapped[str] = mapped_column(String(20), nullable=False, default="monthly")
+    start_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    end_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    payment_type: Mapped[Optional[str]] = mapped_column(String(50))
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    materialized_until: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=True
+    )
 
     # Relationships
-    project = relationship("Project", back_populates="payments")
+    project: Mapped["Project"] = relationship("Project", back_populates="schedules")
 
 
 class Modification(Base):
     __tablename__ = "modifications"
+    __table_args__ = (
+        Index("ix_modifications_project_start", "project_id", "start_date"),
+    )
 
-    id = Column(Integer, primary_key=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    description = Column(Text, nullable=False)
-    cost = Column(Float, default=0.0)
-    start_date = Column(DateTime, nullable=False)
-    deadline = Column(DateTime, nullable=False)
-    status = Column(String(50), default="pending")
-    is_paid = Column(Boolean, default=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    uuid: Mapped[str] = mapped_column(
+        String(32), default=new_uuid, unique=True, index=True, nullable=True
+    )
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id"), nullable=False
+    )
+    description: Mapped[str] = mapped_column(Text, nullable=False)
+    cost: Mapped[float] = mapped_column(Float, default=0.0, nullable=True)
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY
+    )
+    start_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    deadline: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(50), default="pending", nullable=True)
+    is_paid: Mapped[bool] = mapped_column(Boolean, default=True, nullable=True)
 
     # Relationships
-    project = relationship("Project", back_populates="modifications")
-    payments = relationship(
+    project: Mapped["Project"] = relationship("Project", back_populates="modifications")
+    payments: Mapped[List["ModificationPayment"]] = relationship(
         "ModificationPayment",
         back_populates="modification",
         cascade="all, delete-orphan",
     )
+    time_entries: Mapped[List["TimeEntry"]] = relationship(
+        "TimeEntry", back_populates="modification", cascade="all, delete-orphan"
+    )
 
 
 class ModificationPayment(Base):
     __tablename__ = "modification_payments"
 
-    id = Column(Integer, primary_key=True)
-    modification_id = Column(Integer, ForeignKey("modifications.id"), nullable=False)
-    amount = Column(Float, nullable=False)
-    payment_date = Column(DateTime, nullable=False)
-    status = Column(String(50), default="pending")
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    uuid: Mapped[str] = mapped_column(
+        String(32), default=new_uuid, unique=True, index=True, nullable=True
+    )
+    modification_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("modifications.id"), nullable=False, index=True
+    )
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    payment_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    status: Mapped[str] = mapped_column(String(50), default="pending", nullable=True)
 
     # Relationships
-    modification = relationship("Modification", back_populates="payments")
+    modification: Mapped["Modification"] = relationship(
+        "Modification", back_populates="payments"
+    )
 
 
-# Database initialization
-def init_db(db_path: str = "flc.db"):
+class TimeEntry(Base):
+    """Время, затраченное на доработку (почасовая оплата)"""
+
+    __tablename__ = "time_entries"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    uuid: Mapped[str] = mapped_column(
+        String(32), default=new_uuid, unique=True, index=True, nullable=True
+    )
+    modification_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("modifications.id"), nullable=False, index=True
+    )
+    start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Пусто, пока идет таймер
+    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    minutes: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Ставка за час
+    rate: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    # Relationships
+    modification: Mapped["Modification"] = relationship(
+        "Modification", back_populates="time_entries"
+    )
+
+    @property
+    def amount(self) -> float:
+        return self.minutes * self.rate / 60
+
+
+class ProjectRollup(Base):
+    """Предрассчитанные суммы по проекту (поддерживаются триггерами)"""
+
+    __tablename__ = "project_rollups"
+
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id"), primary_key=True
+    )
+    total_paid: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    mods_cost: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class Tag(Base):
+    """Технология из стека проектов (название в нижнем регистре)"""
+
+    __tablename__ = "tags"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(
+        String(100), nullable=False, unique=True, index=True
+    )
+
+
+class ProjectTag(Base):
+    """Связь проекта с тегом"""
+
+    __tablename__ = "project_tags"
+    __table_args__ = (
+        # Обратный индекс: проекты по тегу без обращения к таблице
+        Index("ix_project_tags_tag_project", "tag_id", "project_id"),
+    )
+
+    project_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("projects.id"), primary_key=True
+    )
+    tag_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tags.id"), primary_key=True
+    )
+
+
+class ExchangeRate(Base):
+    """Курс валюты на дату: сколько базовой валюты стоит единица валюты"""
+
+    __tablename__ = "exchange_rates"
+
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    rate_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    rate: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class ChangeLog(Base):
+    """Журнал изменений для синхронизации (заполняется триггерами)"""
+
+    __tablename__ = "change_log"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String(50), nullable=False)
+    row_uuid: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    # "upsert" или "delete"
+    op: Mapped[str] = mapped_column(String(10), nullable=False)
+    # Время изменения UTC в формате ISO 8601 с миллисекундами
+    changed_at: Mapped[str] = mapped_column(String(30), nullable=False)
+    # База, в которой было сделано изменение
+    site_id: Mapped[str] = mapped_column(String(32), nullable=False)
+
+
+class SyncState(Base):
+    """Состояние синхронизации: идентификатор базы и отметки обмена"""
+
+    __tablename__ = "sync_state"
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+def _unicode_lower(value: Any) -> Any:
+    """Приведение к нижнему регистру с поддержкой Unicode"""
+    return value.lower() if isinstance(value, str) else value
+
+
+# Настройки каждого соединения (не сохраняются в файле базы)
+CONNECTION_PRAGMAS = [
+    # Ожидание блокировки вместо немедленной ошибки "database is locked"
+    "PRAGMA busy_timeout = 5000",
+    # Кэш страниц около 16 МБ (отрицательное значение — в КиБ)
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+]
+
+
+def _configure_connection(
+    dbapi_connection: sqlite3.Connection, connection_record: Any
+) -> None:
+    """Настройка нового соединения SQLite"""
+    # Встроенная lower() в SQLite понимает только ASCII, поиск по кириллице
+    # без этой замены был бы чувствителен к регистру
+    dbapi_connection.create_function("lower", 1, _unicode_lower, deterministic=True)
+    for pragma in CONNECTION_PRAGMAS:
+        dbapi_connection.execute(pragma)
+
+
+def create_db_engine(db_path: str = "flc.db") -> Engine:
+    """Движок для файла базы, приведенного к текущей схеме"""
     engine = create_engine(f"sqlite:///{db_path}")
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    event.listen(engine, "connect", _configure_connection)
+
+    from .maintenance import prepare_new_database
+    from .migrations import upgrade
+
+    # Режим auto_vacuum задается на том же соединении до создания таблиц
+    with engine.begin() as connection:
+        prepare_new_database(connection)
+        Base.metadata.create_all(connection)
+
+    upgrade(engine)
+    return engine
+
+
+# Database initialization
+def init_db(db_path: str = "flc.db") -> Session:
+    return sessionmaker(bind=create_db_engine(db_path))()
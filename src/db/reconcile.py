@@ -0,0 +1,263 @@
+"""Сверка банковской выписки с ожидающими платежами
+
+Ожидающие платежи и оплаты доработок раскладываются по ключу
+(валюта, сумма в копейках), а внутри ключа сортируются по дате. Для
+каждой строки выписки кандидаты находятся поиском по словарю и двумя
+бинарными поисками по окну дат, так что сверка занимает O(n log n)
+вместо сравнения всех пар.
+"""
+
+import csv
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from .events import MODIFICATIONS, PAYMENTS, ChangeEvent
+from .models import BASE_CURRENCY, Modification, ModificationPayment, Payment, Project
+
+# Виды ожидающих платежей
+PAYMENT = "payment"
+MODIFICATION_PAYMENT = "modification_payment"
+
+# Насколько дата в выписке может отличаться от даты платежа
+MATCH_WINDOW = timedelta(days=7)
+# Форматы дат в выписках банков
+DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"]
+
+
+@dataclass(frozen=True)
+class BankTransaction:
+    """Поступление из выписки"""
+
+    line: int
+    date: date
+    amount: float
+    currency: str
+    description: str = ""
+
+
+@dataclass(frozen=True)
+class PendingPayment:
+    """Ожидающий платеж проекта или оплата доработки"""
+
+    kind: str
+    item_id: int
+    project_id: int
+    project_name: str
+    amount: float
+    currency: str
+    payment_date: datetime
+
+    @property
+    def title(self) -> str:
+        what = "Платеж" if self.kind == PAYMENT else "Оплата доработки"
+        return (
+            f"{what} {self.amount:,.2f} {self.currency} от "
+            f"{self.payment_date:%d.%m.%Y} — {self.project_name}"
+        )
+
+
+@dataclass
+class ReconcileResult:
+    """Итог сверки: однозначные пары, спорные строки и строки без пары"""
+
+    matched: List[Tuple[BankTransaction, PendingPayment]] = field(default_factory=list)
+    ambiguous: List[Tuple[BankTransaction, List[PendingPayment]]] = field(
+        default_factory=list
+    )
+    unmatched: List[BankTransaction] = field(default_factory=list)
+
+
+def _cents(amount: float) -> int:
+    return round(amount * 100)
+
+
+def _parse_date(value: str) -> date:
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Неизвестный формат даты: {value}")
+
+
+def _parse_amount(value: str) -> float:
+    """Сумма с пробелами между разрядами и запятой в дробной части"""
+    return float(value.replace("\xa0", "").replace(" ", "").replace(",", "."))
+
+
+def read_statement(
+    csv_path: str, delimiter: Optional[str] = None
+) -> List[BankTransaction]:
+    """Поступления из CSV выписки (date,amount[,currency][,description])
+
+    Разделитель без явного указания определяется по заголовку.
+    Списания (неположительные суммы) пропускаются.
+    """
+    transactions = []
+    with open(csv_path, newline="", encoding="utf-8-sig") as file:
+        if delimiter is None:
+            header = file.readline()
+            delimiter = csv.Sniffer().sniff(header, delimiters=",;\t").delimiter
+            file.seek(0)
+        # Первая строка — заголовок, данные начинаются со второй
+        for line, row in enumerate(csv.DictReader(file, delimiter=delimiter), 2):
+            if not (row.get("date") or "").strip():
+                continue
+            amount = _parse_amount(row["amount"])
+            if amount <= 0:
+                continue
+            transactions.append(
+                BankTransaction(
+                    line=line,
+                    date=_parse_date(row["date"].strip()),
+                    amount=amount,
+                    currency=(row.get("currency") or BASE_CURRENCY).strip().upper(),
+                    description=(row.get("description") or "").strip(),
+                )
+            )
+    return transactions
+
+
+def load_pending(session: Session) -> List[PendingPayment]:
+    """Все ожидающие платежи и оплаты доработок (два запроса)"""
+    payments = session.execute(
+        select(
+            Payment.id,
+            Payment.project_id,
+            Project.name,
+            Payment.amount,
+            Payment.currency,
+            Payment.payment_date,
+        )
+        .join(Project, Project.id == Payment.project_id)
+        .where(Payment.status == "pending")
+    )
+    # Оплаты доработок идут в валюте доработки
+    modification_payments = session.execute(
+        select(
+            ModificationPayment.id,
+            Modification.project_id,
+            Project.name,
+            ModificationPayment.amount,
+            Modification.currency,
+            ModificationPayment.payment_date,
+        )
+        .join(Modification, Modification.id == ModificationPayment.modification_id)
+        .join(Project, Project.id == Modification.project_id)
+        .where(ModificationPayment.status == "pending")
+    )
+    return [PendingPayment(PAYMENT, *row) for row in payments] + [
+        PendingPayment(MODIFICATION_PAYMENT, *row) for row in modification_payments
+    ]
+
+
+class PendingIndex:
+    """Ожидающие платежи по ключу (валюта, сумма в копейках) и дате"""
+
+    def __init__(self, pending: Iterable[PendingPayment]):
+        buckets: Dict[Tuple[str, int], List[PendingPayment]] = defaultdict(list)
+        for payment in pending:
+            buckets[(payment.currency, _cents(payment.amount))].append(payment)
+
+        self._buckets: Dict[
+            Tuple[str, int], Tuple[List[int], List[PendingPayment]]
+        ] = {}
+        for key, payments in buckets.items():
+            payments.sort(key=lambda payment: payment.payment_date)
+            days = [payment.payment_date.toordinal() for payment in payments]
+            self._buckets[key] = (days, payments)
+
+    def find(
+        self, transaction: BankTransaction, window: timedelta = MATCH_WINDOW
+    ) -> List[PendingPayment]:
+        """Кандидаты с той же суммой и валютой в окне дат, ближайшие первыми"""
+        bucket = self._buckets.get((transaction.currency, _cents(transaction.amount)))
+        if bucket is None:
+            return []
+        days, payments = bucket
+        day = transaction.date.toordinal()
+        start = bisect_left(days, day - window.days)
+        end = bisect_right(days, day + window.days)
+        return sorted(
+            payments[start:end],
+            key=lambda payment: abs(payment.payment_date.toordinal() - day),
+        )
+
+
+def reconcile(
+    transactions: Iterable[BankTransaction],
+    pending: Iterable[PendingPayment],
+    window: timedelta = MATCH_WINDOW,
+) -> ReconcileResult:
+    """Сопоставление выписки с ожидающими платежами
+
+    Пара однозначна, если у поступления ровно один кандидат и на этот
+    платеж не претендует другое поступление; остальное — на проверку.
+    """
+    index = PendingIndex(pending)
+    found = [
+        (transaction, index.find(transaction, window)) for transaction in transactions
+    ]
+
+    claims: Dict[Tuple[str, int], int] = defaultdict(int)
+    for _, candidates in found:
+        for candidate in candidates:
+            claims[(candidate.kind, candidate.item_id)] += 1
+
+    result = ReconcileResult()
+    for transaction, candidates in found:
+        if not candidates:
+            result.unmatched.append(transaction)
+        elif (
+            len(candidates) == 1
+            and claims[(candidates[0].kind, candidates[0].item_id)] == 1
+        ):
+            result.matched.append((transaction, candidates[0]))
+        else:
+            result.ambiguous.append((transaction, candidates))
+    return result
+
+
+def apply_matches(
+    session: Session,
+    matches: Iterable[Tuple[BankTransaction, Optional[PendingPayment]]],
+) -> List[ChangeEvent]:
+    """Отметка сопоставленных платежей выполненными одним пакетным UPDATE
+
+    Дата платежа заменяется датой поступления из выписки. Пакетное
+    обновление минует события сессии, поэтому изменения возвращаются
+    для публикации в шину. Платеж, сопоставленный двум поступлениям,
+    считается ошибкой (ValueError), ничего не обновляется.
+    """
+    updates: Dict[str, Dict[int, Dict[str, Any]]] = {
+        PAYMENT: {},
+        MODIFICATION_PAYMENT: {},
+    }
+    changes = set()
+    for transaction, payment in matches:
+        if payment is None:
+            continue
+        if payment.item_id in updates[payment.kind]:
+            raise ValueError(f"Платеж сопоставлен двум поступлениям: {payment.title}")
+        updates[payment.kind][payment.item_id] = {
+            "id": payment.item_id,
+            "status": "completed",
+            "payment_date": datetime.combine(transaction.date, datetime.min.time()),
+        }
+        topic = PAYMENTS if payment.kind == PAYMENT else MODIFICATIONS
+        changes.add(ChangeEvent(payment.project_id, topic))
+
+    for kind, model in [
+        (PAYMENT, Payment),
+        (MODIFICATION_PAYMENT, ModificationPayment),
+    ]:
+        if updates[kind]:
+            session.execute(update(model), list(updates[kind].values()))
+    session.commit()
+    return list(changes)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Set, Tuple
+
+from src.utils.event_bus import EventBus
+from .crud import ReportManager
+from .events import MODIFICATIONS, PAYMENTS, PROJECT, TIME_ENTRIES, ChangeEvent
+
+# Изменения, влияющие на стоимость и остаток проектов
+_BALANCE_TOPICS = {PROJECT, PAYMENTS, MODIFICATIONS, TIME_ENTRIES}
+
+# Разделы с суммами зависят от этих изменений и от валюты отчета
+_MONEY_TOPICS = {PAYMENTS, MODIFICATIONS, TIME_ENTRIES}
+
+# Период помесячной выручки на панели
+REVENUE_PERIOD = timedelta(days=365)
+
+# Разделы панели: от каких изменений зависят и как вычисляются
+SECTIONS: Dict[str, Tuple[Set[str], Callable[[ReportManager], Any]]] = {
+    "totals": (_BALANCE_TOPICS, lambda r: r.get_totals()),
+    "aging": (_BALANCE_TOPICS, lambda r: r.get_receivables_aging()),
+    "revenue": (
+        {PAYMENTS},
+        lambda r: r.get_revenue_by_month(datetime.now() - REVENUE_PERIOD),
+    ),
+    "clients": (_BALANCE_TOPICS, lambda r: r.get_top_clients()),
+    "technologies": ({PROJECT}, lambda r: r.get_top_technologies()),
+}
+
+
+class DashboardRollups:
+    """Кэш агрегатов панели показателей с точечной инвалидацией"""
+
+    def __init__(self, report_manager: ReportManager, event_bus: EventBus):
+        self.report_manager = report_manager
+        self._values: Dict[str, Any] = {}
+        self.versions: Dict[str, int] = {name: 0 for name in SECTIONS}
+        event_bus.subscribe(self._on_data_changed)
+
+    def get(self, section: str) -> Any:
+        """Значение раздела (вычисляется, только если устарело)"""
+        if section not in self._values:
+            _, compute = SECTIONS[section]
+            self._values[section] = compute(self.report_manager)
+        return self._values[section]
+
+    def set_currency(self, currency: str) -> None:
+        """Смена валюты отчета со сбросом денежных разделов"""
+        if currency == self.report_manager.currency:
+            return
+        self.report_manager.currency = currency
+        for section, (topics, _) in SECTIONS.items():
+            if topics & _MONEY_TOPICS:
+                self._values.pop(section, None)
+                self.versions[section] += 1
+
+    def _on_data_changed(self, event: ChangeEvent) -> None:
+        """Сброс разделов, зависящих от изменившихся данных"""
+        for section, (topics, _) in SECTIONS.items():
+            if event.deleted or event.topic in topics:
+                self._values.pop(section, None)
+                self.versions[section] += 1
@@ -0,0 +1,309 @@
+"""Колоночный снимок платежей и доработок для тяжелой аналитики
+
+Каждый столбец таблицы хранится отдельным файлом .npy с точным типом
+и открывается через memory map, так что анализ идет без обращения к SQLite
+и без загрузки всего файла в память. Снимок обновляется по частям:
+из базы читаются только строки с id больше последнего выгруженного и строки,
+измененные или удаленные после отметки журнала change_log. Файлы столбцов
+таблицы, в которой что-то изменилось, при этом перезаписываются целиком.
+"""
+
+import json
+import os
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Connection, Engine
+
+from .currency import RateTable
+
+SNAPSHOT_FORMAT = "flc-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+# Сколько uuid передавать в одном запросе при перечитывании строк
+UUID_BATCH_SIZE = 500
+
+
+def _seconds(column: str) -> str:
+    """Дата в секундах от эпохи (NULL остается NULL)"""
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+
+# Столбцы снимка: таблица -> [(столбец, SQL-выражение, тип NumPy)]
+COLUMNS: Dict[str, List[Tuple[str, str, str]]] = {
+    "payments": [
+        ("id", "id", "int64"),
+        ("uuid", "uuid", "S32"),
+        ("project_id", "project_id", "int64"),
+        ("amount", "amount", "float64"),
+        ("currency", "currency", "U3"),
+        ("payment_date", _seconds("payment_date"), "datetime64[s]"),
+        ("payment_type", "COALESCE(payment_type, '')", "U"),
+        ("status", "COALESCE(status, '')", "U"),
+    ],
+    "modifications": [
+        ("id", "id", "int64"),
+        ("uuid", "uuid", "S32"),
+        ("project_id", "project_id", "int64"),
+        ("cost", "COALESCE(cost, 0)", "float64"),
+        ("currency", "currency", "U3"),
+        ("start_date", _seconds("start_date"), "datetime64[s]"),
+        ("deadline", _seconds("deadline"), "datetime64[s]"),
+        ("is_paid", "COALESCE(is_paid, 0)", "bool"),
+        ("status", "COALESCE(status, '')", "U"),
+    ],
+    "modification_payments": [
+        ("id", "id", "int64"),
+        ("uuid", "uuid", "S32"),
+        ("modification_id", "modification_id", "int64"),
+        ("amount", "amount", "float64"),
+        ("payment_date", _seconds("payment_date"), "datetime64[s]"),
+        ("status", "COALESCE(status, '')", "U"),
+    ],
+}
+# Курсы валют небольшие и выгружаются целиком
+RATE_COLUMNS = [
+    ("currency", "currency", "U3"),
+    ("rate_date", "rate_date", "datetime64[D]"),
+    ("rate", "rate", "float64"),
+]
+
+Columns = Dict[str, np.ndarray]
+
+
+def _to_columns(
+    rows: Sequence[Sequence[Any]], spec: List[Tuple[str, str, str]]
+) -> Columns:
+    """Строки запроса в типизированные массивы"""
+    columns = {}
+    for index, (name, _, dtype) in enumerate(spec):
+        values = [row[index] for row in rows]
+        if dtype.startswith("datetime64[s]"):
+            array = np.array(values, dtype="int64").astype(dtype)
+        elif dtype == "S32":
+            array = np.array([value.encode() for value in values], dtype=dtype)
+        elif dtype == "U":
+            array = np.array(values, dtype=str)
+        else:
+            array = np.array(values, dtype=dtype)
+        columns[name] = array
+    return columns
+
+
+def _select(spec: List[Tuple[str, str, str]], table: str) -> str:
+    return f"SELECT {', '.join(expr for _, expr, _ in spec)} FROM {table}"
+
+
+def _fetch(
+    connection: Connection, table: str, where: str, params: Tuple[Any, ...]
+) -> Columns:
+    spec = COLUMNS[table]
+    rows = connection.exec_driver_sql(
+        f"{_select(spec, table)} WHERE {where} ORDER BY id", params
+    ).all()
+    return _to_columns(rows, spec)
+
+
+def _concat(parts: List[Columns]) -> Columns:
+    """Объединение частей столбцов с упорядочиванием по id"""
+    merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    order = np.argsort(merged["id"], kind="stable")
+    return {name: array[order] for name, array in merged.items()}
+
+
+def _write_columns(directory: Path, columns: Columns) -> None:
+    """Сохранение столбцов (через временные файлы, чтобы не портить снимок)"""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, array in columns.items():
+        temporary = directory / f"{name}.tmp.npy"
+        np.save(temporary, np.ascontiguousarray(array))
+        os.replace(temporary, directory / f"{name}.npy")
+
+
+def _read_columns(
+    directory: Path,
+    names: Iterable[str],
+    mmap_mode: Optional[Literal["r+", "r", "w+", "c"]] = "r",
+) -> Columns:
+    return {
+        name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in names
+    }
+
+
+def _changed_uuids(connection: Connection, table: str, since: int) -> List[bytes]:
+    """uuid строк таблицы, измененных или удаленных после отметки журнала"""
+    return [
+        row[0].encode()
+        for row in connection.exec_driver_sql(
+            "SELECT DISTINCT row_uuid FROM change_log "
+            "WHERE id > ? AND table_name = ?",
+            (since, table),
+        )
+    ]
+
+
+def _refresh_table(
+    connection: Connection,
+    directory: Path,
+    table: str,
+    state: Optional[Dict[str, Any]],
+    change_id: int,
+) -> Dict[str, Any]:
+    """Обновление столбцов одной таблицы; возвращает ее состояние в манифесте"""
+    if state is None:
+        columns = _fetch(connection, table, "1", ())
+        _write_columns(directory / table, columns)
+        return {
+            "rows": len(columns["id"]),
+            "last_id": int(columns["id"].max(initial=0)),
+        }
+
+    last_id = state["last_id"]
+    merged = _merge_changes(connection, directory / table, table, last_id, change_id)
+    if merged is None:
+        return state
+    _write_columns(directory / table, merged)
+    return {
+        "rows": len(merged["id"]),
+        "last_id": int(max(last_id, merged["id"].max(initial=0))),
+    }
+
+
+def _merge_changes(
+    connection: Connection,
+    directory: Path,
+    table: str,
+    last_id: int,
+    change_id: int,
+) -> Optional[Columns]:
+    """Столбцы таблицы с новыми и измененными строками (None — изменений нет)
+
+    Результат не ссылается на memory map текущих файлов, поэтому они
+    закрываются при выходе из функции: открытый файл нельзя заменить
+    в Windows.
+    """
+    names = [name for name, _, _ in COLUMNS[table]]
+    added = _fetch(connection, table, "id > ?", (last_id,))
+    changed = _changed_uuids(connection, table, change_id)
+
+    current = _read_columns(directory, names)
+    stale = (
+        np.isin(current["uuid"], np.array(changed, dtype="S32")) if changed else None
+    )
+    if not len(added["id"]) and (stale is None or not stale.any()):
+        return None
+
+    parts = []
+    if stale is not None and stale.any():
+        keep = ~stale
+        parts.append({name: current[name][keep] for name in names})
+        # Старые строки, которые изменились (удаленные уже не найдутся)
+        stale_uuids = [uuid.decode() for uuid in current["uuid"][stale].tolist()]
+        for start in range(0, len(stale_uuids), UUID_BATCH_SIZE):
+            batch = stale_uuids[start : start + UUID_BATCH_SIZE]
+            parts.append(
+                _fetch(
+                    connection,
+                    table,
+                    f"id <= ? AND uuid IN ({', '.join('?' * len(batch))})",
+                    (last_id, *batch),
+                )
+            )
+    else:
+        parts.append({name: np.asarray(current[name]) for name in names})
+    parts.append(added)
+    # Объединение копирует данные из memory map
+    return _concat(parts)
+
+
+def build_snapshot(
+    engine: Engine, directory: str, full: bool = False
+) -> Dict[str, Any]:
+    """Создание или частичное обновление снимка; возвращает манифест"""
+    path = Path(directory)
+    manifest = None if full else _read_manifest(path)
+
+    with engine.connect() as connection:
+        change_id: int = connection.exec_driver_sql(
+            "SELECT COALESCE(MAX(id), 0) FROM change_log"
+        ).scalar_one()
+        tables = {}
+        for table in COLUMNS:
+            state = manifest["tables"].get(table) if manifest else None
+            tables[table] = _refresh_table(
+                connection,
+                path,
+                table,
+                state,
+                manifest["change_id"] if manifest else change_id,
+            )
+        rates = _to_columns(
+            connection.exec_driver_sql(
+                f"{_select(RATE_COLUMNS, 'exchange_rates')} ORDER BY currency, rate_date"
+            ).all(),
+            RATE_COLUMNS,
+        )
+    _write_columns(path / "exchange_rates", rates)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "change_id": change_id,
+        "tables": tables,
+    }
+    temporary = path / f"{MANIFEST}.tmp"
+    temporary.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(temporary, path / MANIFEST)
+    return manifest
+
+
+def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """Манифест существующего снимка (None, если снимка нет или он устарел)"""
+    try:
+        manifest: Dict[str, Any] = json.loads(
+            (path / MANIFEST).read_text(encoding="utf-8")
+        )
+    except (OSError, ValueError):
+        return None
+    if (
+        manifest.get("format") != SNAPSHOT_FORMAT
+        or manifest.get("version") != SNAPSHOT_VERSION
+    ):
+        return None
+    return manifest
+
+
+class Snapshot:
+    """Открытый снимок: столбцы таблиц как массивы с memory map"""
+
+    def __init__(self, directory: str):
+        self.path = Path(directory)
+        self.manifest = _read_manifest(self.path)
+        if self.manifest is None:
+            raise FileNotFoundError(f"Снимок не найден: {directory}")
+        self.tables: Dict[str, Columns] = {
+            table: _read_columns(self.path / table, [name for name, _, _ in spec])
+            for table, spec in COLUMNS.items()
+        }
+        self.rates = _read_columns(
+            self.path / "exchange_rates", [name for name, _, _ in RATE_COLUMNS]
+        )
+
+    def __getitem__(self, table: str) -> Columns:
+        return self.tables[table]
+
+    @cached_property
+    def rate_table(self) -> RateTable:
+        """Курсы валют снимка для пересчета сумм"""
+        currencies = np.asarray(self.rates["currency"])
+        return RateTable(
+            {
+                currency: (
+                    self.rates["rate_date"][currencies == currency],
+                    self.rates["rate"][currencies == currency],
+                )
+                for currency in np.unique(currencies).tolist()
+            }
+        )
@@ -0,0 +1,361 @@
+"""Обмен изменениями между копиями базы FLC
+
+Каждое изменение строки синхронизируемых таблиц записывается триггером
+в change_log. Выгрузка содержит последние состояния строк, измененных после
+отметки, в сжатом файле JSON Lines. При загрузке конфликты решаются по
+времени изменения: побеждает более позднее (при равенстве — больший site_id).
+
+Конфликт решается для строки целиком, а не по отдельным полям: если в одной
+базе переименовали проект, а в другой изменили его стоимость, после обмена
+в обеих останется строка с более поздним изменением, и правка другой
+стороны будет потеряна.
+"""
+
+import gzip
+import json
+import sqlite3
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+
+from .migrations import SYNC_TABLES
+from .models import Base, create_db_engine, new_uuid
+from .clients import assign_clients
+from .tags import prune_tags, refresh_project_tags
+
+DELTA_FORMAT = "flc-delta"
+DELTA_VERSION = 1
+# Сколько строк запрашивать за раз при выгрузке
+EXPORT_BATCH_SIZE = 500
+
+# (таблица, uuid) строки
+RowKey = Tuple[str, str]
+# Запись change_log: (id, таблица, uuid, операция, время, site_id)
+Change = Tuple[Optional[int], str, str, str, str, str]
+
+# Ссылка на родителя передается через uuid: таблица -> (столбец, родитель)
+PARENTS = {
+    "modifications": ("project_id", "projects"),
+    "payments": ("project_id", "projects"),
+    "modification_payments": ("modification_id", "modifications"),
+    "time_entries": ("modification_id", "modifications"),
+}
+# Дочерние строки, удаляемые вместе с родителем
+CHILDREN = {
+    "projects": [("modifications", "project_id"), ("payments", "project_id")],
+    "modifications": [
+        ("modification_payments", "modification_id"),
+        ("time_entries", "modification_id"),
+    ],
+}
+
+
+def _get_state(connection: Connection, key: str) -> Optional[str]:
+    return connection.exec_driver_sql(
+        "SELECT value FROM sync_state WHERE key = ?", (key,)
+    ).scalar()
+
+
+def _set_state(connection: Connection, key: str, value: object) -> None:
+    connection.exec_driver_sql(
+        "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+        (key, str(value)),
+    )
+
+
+def get_site_id(connection: Connection) -> str:
+    """Идентификатор этой базы"""
+    site_id = _get_state(connection, "site_id")
+    if site_id is None:
+        raise RuntimeError("В базе нет идентификатора site_id")
+    return site_id
+
+
+def _data_columns(table: str) -> List[str]:
+    """Столбцы, передаваемые при синхронизации (без локальных id)"""
+    # Клиент проекта определяется по контактам в каждой базе, графики
+    # платежей локальны (созданные по ним платежи передаются как обычные)
+    skip = {"id", "client_id", "schedule_id", PARENTS.get(table, (None,))[0]}
+    return [c.name for c in Base.metadata.tables[table].columns if c.name not in skip]
+
+
+def _fetch_rows(
+    connection: Connection, table: str, uuids: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Текущее состояние строк по uuid, ссылка на родителя заменена его uuid"""
+    columns = _data_columns(table)
+    select_list = ", ".join(f"t.{name}" for name in columns)
+    join = ""
+    if table in PARENTS:
+        column, parent = PARENTS[table]
+        select_list += ", p.uuid"
+        join = f"LEFT JOIN {parent} AS p ON p.id = t.{column}"
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(uuids), EXPORT_BATCH_SIZE):
+        batch = uuids[start : start + EXPORT_BATCH_SIZE]
+        placeholders = ", ".join("?" * len(batch))
+        for values in connection.exec_driver_sql(
+            f"SELECT {select_list} FROM {table} AS t {join} "
+            f"WHERE t.uuid IN ({placeholders})",
+            tuple(batch),
+        ):
+            row = dict(zip(columns, values))
+            if table in PARENTS:
+                row["parent_uuid"] = values[-1]
+            rows[row["uuid"]] = row
+    return rows
+
+
+def _latest_changes(connection: Connection, since: int) -> Dict[RowKey, Change]:
+    """Последнее изменение каждой строки после отметки"""
+    latest: Dict[RowKey, Change] = {}
+    for change_id, table, uuid, op, changed_at, site_id in connection.exec_driver_sql(
+        "SELECT id, table_name, row_uuid, op, changed_at, site_id "
+        "FROM change_log WHERE id > ? ORDER BY id",
+        (since,),
+    ):
+        latest[(table, uuid)] = (change_id, table, uuid, op, changed_at, site_id)
+    return latest
+
+
+def _snapshot_changes(connection: Connection) -> Dict[RowKey, Change]:
+    """Все строки базы как изменения (для полной выгрузки)"""
+    latest: Dict[RowKey, Change] = {}
+    site_id = get_site_id(connection)
+    for table in SYNC_TABLES:
+        for (uuid,) in connection.exec_driver_sql(f"SELECT uuid FROM {table}"):
+            # Пустое время: строка снимка уступает любому записанному изменению
+            latest[(table, uuid)] = (None, table, uuid, "upsert", "", site_id)
+    return latest
+
+
+def export_changes(
+    engine: Engine, path: str, since: Optional[int] = None, full: bool = False
+) -> Dict[str, int]:
+    """Выгрузка изменений после отметки в файл
+
+    Без since используется отметка предыдущей выгрузки; full выгружает
+    все строки базы.
+    """
+    with engine.begin() as connection:
+        if since is None:
+            since = int(_get_state(connection, "exported_until") or 0)
+        until: int = connection.exec_driver_sql(
+            "SELECT COALESCE(MAX(id), 0) FROM change_log"
+        ).scalar_one()
+        latest = (
+            _snapshot_changes(connection)
+            if full
+            else _latest_changes(connection, since)
+        )
+
+        upserts: Dict[str, List[str]] = {table: [] for table in SYNC_TABLES}
+        for (table, uuid), change in latest.items():
+            if change[3] == "upsert":
+                upserts[table].append(uuid)
+
+        entries = 0
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            header = {
+                "format": DELTA_FORMAT,
+                "version": DELTA_VERSION,
+                "site": get_site_id(connection),
+                "since": 0 if full else since,
+                "until": until,
+            }
+            file.write(json.dumps(header) + "\n")
+
+            # Родители раньше детей при добавлении, дети раньше при удалении
+            for table in SYNC_TABLES:
+                rows = _fetch_rows(connection, table, upserts[table])
+                for uuid in upserts[table]:
+                    # Строка удалена, а запись об удалении идет ниже
+                    if uuid in rows:
+                        _write_entry(file, latest[(table, uuid)], rows[uuid])
+                        entries += 1
+            for table in reversed(SYNC_TABLES):
+                for (name, _), change in latest.items():
+                    if name == table and change[3] == "delete":
+                        _write_entry(file, change, None)
+                        entries += 1
+
+        current = int(_get_state(connection, "exported_until") or 0)
+        _set_state(connection, "exported_until", max(current, until))
+    return {"entries": entries, "until": until}
+
+
+def _write_entry(file: IO[str], change: Change, row: Optional[Dict[str, Any]]) -> None:
+    change_id, table, uuid, op, changed_at, site_id = change
+    entry: Dict[str, Any] = {"id": change_id, "t": table, "op": op, "uuid": uuid}
+    entry.update({"at": changed_at, "site": site_id})
+    if row is not None:
+        entry["row"] = row
+    file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def _read_delta(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """Заголовок и записи файла изменений"""
+    file = gzip.open(path, "rt", encoding="utf-8")
+    header = json.loads(file.readline())
+    if header.get("format") != DELTA_FORMAT or header.get("version") != DELTA_VERSION:
+        file.close()
+        raise ValueError(f"{path}: неподдерживаемый формат файла изменений")
+
+    def entries() -> Iterator[Dict[str, Any]]:
+        with file:
+            for line in file:
+                yield json.loads(line)
+
+    return header, entries()
+
+
+def _local_id(connection: Connection, table: str, uuid: str) -> Optional[int]:
+    return connection.exec_driver_sql(
+        f"SELECT id FROM {table} WHERE uuid = ?", (uuid,)
+    ).scalar()
+
+
+def _apply_upsert(connection: Connection, table: str, row: Dict[str, Any]) -> bool:
+    """Добавление или обновление строки; False, если нет родителя"""
+    values = {name: row[name] for name in _data_columns(table) if name in row}
+    if table in PARENTS:
+        column, parent = PARENTS[table]
+        parent_id = _local_id(connection, parent, row["parent_uuid"])
+        if parent_id is None:
+            return False
+        values[column] = parent_id
+
+    local_id = _local_id(connection, table, row["uuid"])
+    if local_id is None:
+        names = ", ".join(values)
+        placeholders = ", ".join("?" * len(values))
+        connection.exec_driver_sql(
+            f"INSERT INTO {table} ({names}) VALUES ({placeholders})",
+            tuple(values.values()),
+        )
+    else:
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        connection.exec_driver_sql(
+            f"UPDATE {table} SET {assignments} WHERE id = ?",
+            (*values.values(), local_id),
+        )
+    return True
+
+
+def _apply_delete(connection: Connection, table: str, local_id: int) -> None:
+    """Удаление строки вместе с дочерними"""
+    for child, column in CHILDREN.get(table, []):
+        for (child_id,) in connection.exec_driver_sql(
+            f"SELECT id FROM {child} WHERE {column} = ?", (local_id,)
+        ).all():
+            _apply_delete(connection, child, child_id)
+    connection.exec_driver_sql(f"DELETE FROM {table} WHERE id = ?", (local_id,))
+
+
+def import_changes(engine: Engine, path: str) -> Dict[str, int]:
+    """Применение файла изменений другой базы"""
+    header, entries = _read_delta(path)
+    stats = {"applied": 0, "conflicts": 0, "skipped": 0, "orphans": 0}
+    # Теги и клиенты измененных проектов пересобираются после применения
+    tagged: Set[str] = set()
+
+    with engine.begin() as connection:
+        site_id = get_site_id(connection)
+        origin = header["site"]
+        if origin == site_id:
+            raise ValueError("Файл изменений выгружен из этой же базы")
+        watermark_key = f"imported:{origin}"
+        watermark = int(_get_state(connection, watermark_key) or 0)
+
+        # Примененные изменения журналируются здесь, а не триггерами
+        _set_state(connection, "applying", 1)
+        try:
+            for entry in entries:
+                if entry["id"] is not None and entry["id"] <= watermark:
+                    stats["skipped"] += 1
+                    continue
+                # Собственные изменения, вернувшиеся через другую базу
+                if entry["site"] == site_id:
+                    stats["skipped"] += 1
+                    continue
+
+                local = connection.exec_driver_sql(
+                    "SELECT changed_at, site_id FROM change_log WHERE row_uuid = ? "
+                    "ORDER BY id DESC LIMIT 1",
+                    (entry["uuid"],),
+                ).first()
+                if local is not None and tuple(local) >= (entry["at"], entry["site"]):
+                    stats["conflicts"] += 1
+                    continue
+
+                table = entry["t"]
+                if entry["op"] == "upsert":
+                    if not _apply_upsert(connection, table, entry["row"]):
+                        stats["orphans"] += 1
+                        continue
+                    if table == "projects":
+                        tagged.add(entry["uuid"])
+                else:
+                    local_id = _local_id(connection, table, entry["uuid"])
+                    if local_id is not None:
+                        _apply_delete(connection, table, local_id)
+
+                connection.exec_driver_sql(
+                    "INSERT INTO change_log "
+                    "(table_name, row_uuid, op, changed_at, site_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (table, entry["uuid"], entry["op"], entry["at"], entry["site"]),
+                )
+                stats["applied"] += 1
+
+            if tagged:
+                rows = connection.exec_driver_sql(
+                    "SELECT id, tech_stack, client_contacts FROM projects "
+                    f"WHERE uuid IN ({', '.join('?' * len(tagged))})",
+                    tuple(tagged),
+                ).all()
+                refresh_project_tags(connection, [(row[0], row[1]) for row in rows])
+                assign_clients(connection, [(row[0], row[2]) for row in rows])
+            else:
+                prune_tags(connection)
+        finally:
+            connection.exec_driver_sql("DELETE FROM sync_state WHERE key = 'applying'")
+
+        _set_state(connection, watermark_key, max(watermark, header["until"]))
+    return stats
+
+
+def clone_database(source_path: str, target_path: str) -> None:
+    """Создание копии базы для другого компьютера
+
+    Копия получает собственный site_id и считается получившей все изменения
+    источника, поэтому дальше обмен идет только изменениями.
+    """
+    source_engine = create_db_engine(source_path)
+    with source_engine.begin() as connection:
+        until = connection.exec_driver_sql(
+            "SELECT COALESCE(MAX(id), 0) FROM change_log"
+        ).scalar_one()
+        source_site = get_site_id(connection)
+        _set_state(connection, "exported_until", until)
+    source_engine.dispose()
+
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+    target_engine = create_db_engine(target_path)
+    with target_engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM change_log")
+        connection.exec_driver_sql(
+            "DELETE FROM sync_state WHERE key LIKE 'imported:%' "
+            "OR key IN ('site_id', 'exported_until')"
+        )
+        _set_state(connection, "site_id", new_uuid())
+        _set_state(connection, f"imported:{source_site}", until)
+    target_engine.dispose()
@@ -0,0 +1,65 @@
+"""Теги проектов: нормализованный технологический стек
+
+Источником остается текст Project.tech_stack; теги и связи project_tags
+пересобираются из него при сохранении проекта, загрузке изменений
+и миграции, а фильтрация по тегам идет по индексу (tag_id, project_id).
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+
+from src.utils.text_utils import parse_tech_stack
+
+# Сколько проектов разбирать за один проход при заполнении
+FILL_BATCH_SIZE = 500
+
+
+def refresh_project_tags(
+    connection: Connection, projects: Iterable[Tuple[int, Optional[str]]]
+) -> None:
+    """Пересборка тегов для пар (id проекта, tech_stack)"""
+    links: List[Tuple[int, str]] = []
+    project_ids = []
+    for project_id, tech_stack in projects:
+        project_ids.append((project_id,))
+        links.extend((project_id, name) for name in parse_tech_stack(tech_stack))
+    if not project_ids:
+        return
+
+    connection.exec_driver_sql(
+        "DELETE FROM project_tags WHERE project_id = ?", project_ids
+    )
+    if links:
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO tags (name) VALUES (?)",
+            [(name,) for name in {name for _, name in links}],
+        )
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO project_tags (project_id, tag_id) "
+            "SELECT ?, id FROM tags WHERE name = ?",
+            links,
+        )
+    prune_tags(connection)
+
+
+def prune_tags(connection: Connection) -> None:
+    """Удаление тегов, не привязанных ни к одному проекту"""
+    connection.exec_driver_sql(
+        "DELETE FROM tags WHERE NOT EXISTS "
+        "(SELECT 1 FROM project_tags WHERE tag_id = tags.id)"
+    )
+
+
+def fill_project_tags(connection: Connection) -> None:
+    """Заполнение тегов всех проектов из tech_stack (миграция)"""
+    last_id = 0
+    while True:
+        rows = connection.exec_driver_sql(
+            "SELECT id, tech_stack FROM projects WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, FILL_BATCH_SIZE),
+        ).all()
+        if not rows:
+            return
+        refresh_project_tags(connection, [tuple(row) for row in rows])
+        last_id = rows[-1][0]
@@ -0,0 +1,142 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
+from typing import Any, Callable, Dict, Iterable, Optional, Set, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .crud import ReportManager
+from .models import create_db_engine
+
+# Сколько баз держать открытыми одновременно
+MAX_OPEN_WORKSPACES = 4
+# Сколько потоков используют сводные отчеты по нескольким базам
+REPORT_WORKERS = 4
+
+T = TypeVar("T")
+
+
+class WorkspaceManager:
+    """Пул движков для отдельных баз (рабочих областей) с вытеснением LRU
+
+    Схема и настройки соединений применяются один раз при первом открытии
+    базы. Базы, на которые есть активные ссылки (acquire), не вытесняются.
+    """
+
+    def __init__(self, max_open: int = MAX_OPEN_WORKSPACES):
+        self.max_open = max_open
+        self._pool: "OrderedDict[str, sessionmaker[Session]]" = OrderedDict()
+        self._pinned: Set[str] = set()
+        self._lock = RLock()
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        return os.path.abspath(path)
+
+    def sessionmaker(self, path: str) -> "sessionmaker[Session]":
+        """Фабрика сессий для базы (открывает ее при необходимости)"""
+        path = self.normalize(path)
+        with self._lock:
+            factory = self._pool.get(path)
+            if factory is not None:
+                self._pool.move_to_end(path)
+                return factory
+
+        # Создание движка с миграциями выполняется без блокировки пула
+        factory = sessionmaker(bind=create_db_engine(path))
+        with self._lock:
+            existing = self._pool.get(path)
+            if existing is not None:
+                factory.kw["bind"].dispose()
+                return existing
+            self._pool[path] = factory
+            self._evict()
+            return factory
+
+    def engine(self, path: str) -> Engine:
+        engine: Engine = self.sessionmaker(path).kw["bind"]
+        return engine
+
+    def session(self, path: str) -> Session:
+        """Новая сессия для базы"""
+        return self.sessionmaker(path)()
+
+    def acquire(self, path: str) -> Session:
+        """Сессия для активной рабочей области; база не вытесняется до release"""
+        path = self.normalize(path)
+        # Закрепляем до открытия, чтобы новая база не была сразу вытеснена;
+        # сама база открывается без блокировки пула
+        with self._lock:
+            self._pinned.add(path)
+        try:
+            return self.session(path)
+        except Exception:
+            self.release(path)
+            raise
+
+    def release(self, path: str) -> None:
+        with self._lock:
+            self._pinned.discard(self.normalize(path))
+            self._evict()
+
+    def _evict(self) -> None:
+        """Закрытие давно не использованных баз сверх лимита"""
+        for path in list(self._pool):
+            if len(self._pool) <= self.max_open:
+                return
+            if path not in self._pinned:
+                self._pool.pop(path).kw["bind"].dispose()
+
+    def open_paths(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._pool)
+
+    def map(
+        self,
+        paths: Iterable[str],
+        query: Callable[[Session], T],
+        workers: int = REPORT_WORKERS,
+    ) -> Dict[str, T]:
+        """Выполнение запроса в каждой базе параллельно (своя сессия на поток)"""
+
+        def run(path: str) -> T:
+            with self.session(path) as session:
+                return query(session)
+
+        paths = [self.normalize(path) for path in paths]
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(paths))),
+            thread_name_prefix="workspace-report",
+        ) as executor:
+            return dict(zip(paths, executor.map(run, paths)))
+
+    def get_combined_totals(
+        self, paths: Iterable[str], workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Итоги по каждой базе и общие итоги по всем"""
+        totals = self.map(
+            paths,
+            lambda session: ReportManager(session).get_totals(),
+            workers or REPORT_WORKERS,
+        )
+        combined = {
+            key: sum(values[key] for values in totals.values())
+            for key in (
+                "projects",
+                "active_projects",
+                "total_cost",
+                "total_paid",
+                "outstanding",
+            )
+        }
+        return {"workspaces": totals, "combined": combined}
+
+    def dispose(self) -> None:
+        """Закрытие всех баз"""
+        with self._lock:
+            for factory in self._pool.values():
+                factory.kw["bind"].dispose()
+            self._pool.clear()
+            self._pinned.clear()
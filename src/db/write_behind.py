@@ -0,0 +1,74 @@
+from typing import Any, Callable, Dict
+
+from sqlalchemy.orm import Session
+
+# Период сохранения накопленных изменений, мс
+FLUSH_INTERVAL_MS = 30 * 1000
+# Сколько объектов копить до внеочередного сохранения
+MAX_PENDING = 100
+
+# Отложенный вызов: schedule(задержка_мс, функция), например Tk.after
+Scheduler = Callable[[int, Callable[[], None]], Any]
+
+
+class WriteBehindBuffer:
+    """Отложенная запись: изменения объектов копятся и сохраняются одним commit
+
+    Повторные изменения одного объекта между сохранениями объединяются
+    (в базу уходит только последнее состояние).
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        schedule: Scheduler,
+        flush_interval_ms: int = FLUSH_INTERVAL_MS,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.session = session
+        self.schedule = schedule
+        self.flush_interval_ms = flush_interval_ms
+        self.max_pending = max_pending
+        self._pending: Dict[int, Any] = {}
+        self._scheduled = False
+        self.flushes = 0
+
+    def stage(self, obj: Any) -> None:
+        """Постановка объекта в очередь на сохранение"""
+        self._pending[id(obj)] = obj
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.flush_interval_ms, self._scheduled_flush)
+
+    def discard(self, obj: Any) -> None:
+        """Отмена сохранения объекта (например, удаленного вместе с владельцем)"""
+        self._pending.pop(id(obj), None)
+        if obj in self.session.new:
+            self.session.expunge(obj)
+
+    def _scheduled_flush(self) -> None:
+        self._scheduled = False
+        self.flush()
+
+    def flush(self) -> None:
+        """Сохранение накопленных изменений одной транзакцией
+
+        При ошибке транзакция откатывается, чтобы сессией можно было
+        пользоваться дальше; накопленные изменения при этом теряются.
+        """
+        if not self._pending:
+            return
+        objects, self._pending = list(self._pending.values()), {}
+        try:
+            self.session.add_all(objects)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        self.flushes += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
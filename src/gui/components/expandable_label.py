@@ -0,0 +1,39 @@
+from typing import Any
+
+import customtkinter as ctk
+
+# Длина свернутого текста
+PREVIEW_LENGTH = 80
+
+
+class ExpandableLabel(ctk.CTkLabel):
+    """Легкая надпись, раскрывающая полный текст по щелчку"""
+
+    def __init__(
+        self, master: Any, text: str, wraplength: int = 600, **kwargs: Any
+    ) -> None:
+        self.full_text = text
+        self.expanded = False
+
+        first_line = text.split("\n", 1)[0]
+        self.preview = first_line[:PREVIEW_LENGTH]
+        self.is_truncated = self.preview != text
+        if self.is_truncated:
+            self.preview += " …"
+
+        super().__init__(
+            master,
+            text=self.preview,
+            wraplength=wraplength,
+            justify="left",
+            anchor="w",
+            cursor="hand2" if self.is_truncated else "",
+            **kwargs,
+        )
+        if self.is_truncated:
+            self.bind("<Button-1>", self.toggle)
+
+    def toggle(self, event: Any = None) -> None:
+        """Переключение между кратким и полным текстом"""
+        self.expanded = not self.expanded
+        self.configure(text=self.full_text if self.expanded else self.preview)
@@ -0,0 +1,61 @@
+from typing import Any, Callable, List, Optional
+
+import customtkinter as ctk
+
+# Сколько уведомлений показывать одновременно
+MAX_NOTIFICATIONS = 5
+
+
+class NotificationBar(ctk.CTkFrame):
+    """Панель уведомлений; скрыта, пока уведомлений нет"""
+
+    def __init__(self, master: Any, after_widget: Any, **kwargs: Any) -> None:
+        super().__init__(master, fg_color=("#fff4d6", "#4a3b12"), **kwargs)
+        self.after_widget = after_widget
+        self.rows: List[ctk.CTkFrame] = []
+        self.hidden_count = 0
+        self.more_label = ctk.CTkLabel(self, text="", anchor="w")
+
+    def add(self, text: str, on_click: Optional[Callable[[], None]] = None) -> None:
+        """Добавление уведомления"""
+        if len(self.rows) >= MAX_NOTIFICATIONS:
+            self.hidden_count += 1
+            self.more_label.configure(text=f"…и еще {self.hidden_count}")
+            self._pack_more_label()
+            return
+
+        row = ctk.CTkFrame(self, fg_color="transparent")
+        row.pack(fill="x", padx=5, pady=2)
+        label = ctk.CTkLabel(row, text=text, anchor="w")
+        label.pack(side="left", fill="x", expand=True, padx=5)
+        if on_click:
+            label.configure(cursor="hand2")
+            label.bind("<Button-1>", lambda event: on_click())
+        ctk.CTkButton(row, text="✕", width=28, command=lambda: self._dismiss(row)).pack(
+            side="right", padx=5
+        )
+
+        self.rows.append(row)
+        if self.hidden_count:
+            # Строка «…и еще» остается под уведомлениями
+            self._pack_more_label()
+        self.pack(fill="x", padx=10, pady=5, after=self.after_widget)
+
+    def _pack_more_label(self) -> None:
+        """Размещение строки «…и еще» после всех уведомлений"""
+        self.more_label.pack_forget()
+        self.more_label.pack(fill="x", padx=10, pady=(0, 5))
+
+    def clear(self) -> None:
+        """Закрытие всех уведомлений"""
+        for row in list(self.rows):
+            self._dismiss(row)
+
+    def _dismiss(self, row: ctk.CTkFrame) -> None:
+        """Закрытие уведомления"""
+        self.rows.remove(row)
+        row.destroy()
+        if not self.rows:
+            self.hidden_count = 0
+            self.more_label.pack_forget()
+            self.pack_forget()
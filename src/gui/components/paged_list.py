@@ -0,0 +1,63 @@
+from typing import Any, Callable, List
+
+import customtkinter as ctk
+
+# Размер страницы по умолчанию
+PAGE_SIZE = 30
+
+
+class PagedList(ctk.CTkScrollableFrame):
+    """Прокручиваемый список, подгружающий элементы страницами"""
+
+    def __init__(
+        self,
+        master: Any,
+        fetch_page: Callable[[int, int], List[Any]],
+        render_item: Callable[[ctk.CTkFrame, Any], None],
+        page_size: int = PAGE_SIZE,
+        empty_text: str = "",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(master, **kwargs)
+
+        self.fetch_page = fetch_page
+        self.render_item = render_item
+        self.page_size = page_size
+        self.empty_text = empty_text
+
+        self._offset = 0
+        self._exhausted = False
+        self._load_scheduled = False
+
+        # Следим за положением прокрутки, чтобы подгружать следующую страницу
+        self._parent_canvas.configure(yscrollcommand=self._on_yscroll)
+
+    def reload(self) -> None:
+        """Перезагрузка списка с первой страницы"""
+        for widget in self.winfo_children():
+            widget.destroy()
+        self._offset = 0
+        self._exhausted = False
+        self.load_next_page()
+
+    def load_next_page(self) -> None:
+        """Загрузка следующей страницы"""
+        self._load_scheduled = False
+        if self._exhausted:
+            return
+
+        items = self.fetch_page(self._offset, self.page_size)
+        for item in items:
+            self.render_item(self, item)
+        self._offset += len(items)
+        self._exhausted = len(items) < self.page_size
+
+        if self._offset == 0 and self.empty_text:
+            ctk.CTkLabel(self, text=self.empty_text, text_color="gray").pack(pady=10)
+
+    def _on_yscroll(self, first: str, last: str) -> None:
+        """Подгрузка при прокрутке к концу списка"""
+        self._scrollbar.set(first, last)
+        if float(last) >= 0.95 and not self._exhausted and not self._load_scheduled:
+            self._load_scheduled = True
+            self.after_idle(self.load_next_page)
@@ -0,0 +1,153 @@
+import time
+import tkinter
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+import customtkinter as ctk
+
+from src.utils.perf import QueryStats
+
+# Период пульса для измерения задержки цикла событий, мс
+HEARTBEAT_MS = 100
+# Как часто пересчитывать виджеты, мс
+WIDGET_SCAN_MS = 1000
+# Задержка цикла событий, выше которой она подсвечивается, мс
+LAG_WARNING_MS = 50
+# Сколько открытых окон считать подозрительным
+MAX_TOPLEVELS = 10
+
+
+def count_widgets(widget: tkinter.Misc) -> int:
+    """Число виджетов в поддереве"""
+    return sum(1 + count_widgets(child) for child in widget.winfo_children())
+
+
+class PerfHud(ctk.CTkFrame):
+    """Оверлей с показателями производительности интерфейса"""
+
+    def __init__(
+        self,
+        master: Any,
+        watched_frame: tkinter.Misc,
+        query_stats: QueryStats,
+        max_hidden_cards: int,
+    ) -> None:
+        super().__init__(master, fg_color=("gray85", "gray20"), corner_radius=6)
+
+        self.watched_frame = watched_frame
+        self.query_stats = query_stats
+        self.max_hidden_cards = max_hidden_cards
+
+        self.label = ctk.CTkLabel(
+            self, text="", font=("Courier", 11), justify="left", anchor="w"
+        )
+        self.label.pack(padx=8, pady=(6, 0), anchor="w")
+        self.warning_label = ctk.CTkLabel(
+            self, text="", font=("Courier", 11), text_color="red", justify="left"
+        )
+        self.warning_label.pack(padx=8, pady=(0, 6), anchor="w")
+
+        self.visible = False
+        self._heartbeat_job: Optional[str] = None
+        self._lags: Deque[float] = deque(maxlen=1000 // HEARTBEAT_MS)
+        self._last_beat = 0.0
+        self._last_scan = 0.0
+        self._widget_text = ""
+        self._warnings: List[str] = []
+
+        # Запросы, выполненные между пульсами без пауз, считаются одним действием
+        self._last_stats = query_stats.snapshot()
+        self._action_count = 0
+        self._action_seconds = 0.0
+        self._last_action: Tuple[int, float] = (0, 0.0)
+        self._last_input = "—"
+        master.bind_all("<Button-1>", self._on_input, add="+")
+        master.bind_all("<Key>", self._on_input, add="+")
+
+    def toggle(self) -> None:
+        """Показ или скрытие оверлея"""
+        if self.visible:
+            self.place_forget()
+            if self._heartbeat_job:
+                self.after_cancel(self._heartbeat_job)
+                self._heartbeat_job = None
+        else:
+            self.place(relx=1.0, rely=0.0, x=-10, y=10, anchor="ne")
+            self.lift()
+            self._last_beat = time.perf_counter()
+            self._last_scan = 0.0
+            self._heartbeat_job = self.after(HEARTBEAT_MS, self._heartbeat)
+        self.visible = not self.visible
+
+    def _on_input(self, event: Any) -> None:
+        """Запоминание последнего пользовательского ввода"""
+        self._last_input = f"{event.type}: {event.widget.winfo_class()}"
+
+    def _heartbeat(self) -> None:
+        """Пульс: задержка цикла событий и запросы текущего действия"""
+        now = time.perf_counter()
+        self._lags.append(max(0.0, (now - self._last_beat) * 1000 - HEARTBEAT_MS))
+        self._last_beat = now
+
+        count, seconds = self.query_stats.snapshot()
+        delta_count = count - self._last_stats[0]
+        delta_seconds = seconds - self._last_stats[1]
+        self._last_stats = (count, seconds)
+        if delta_count:
+            self._action_count += delta_count
+            self._action_seconds += delta_seconds
+        elif self._action_count:
+            self._last_action = (self._action_count, self._action_seconds)
+            self._action_count = 0
+            self._action_seconds = 0.0
+
+        if (now - self._last_scan) * 1000 >= WIDGET_SCAN_MS:
+            self._last_scan = now
+            self._scan_widgets()
+
+        self._render()
+        self._heartbeat_job = self.after(HEARTBEAT_MS, self._heartbeat)
+
+    def _scan_widgets(self) -> None:
+        """Подсчет живых виджетов, окон и скрытых карточек"""
+        cards = self.watched_frame.winfo_children()
+        hidden_cards = sum(1 for card in cards if not card.winfo_ismapped())
+        widgets = count_widgets(self.watched_frame)
+
+        toplevels = [
+            child
+            for child in self.master.winfo_children()
+            if isinstance(child, tkinter.Toplevel)
+        ]
+        shown = sum(1 for window in toplevels if window.state() != "withdrawn")
+
+        self._widget_text = (
+            f"Виджеты списка: {widgets} (карточек {len(cards)}, скрыто {hidden_cards})\n"
+            f"Окна: {shown} открыто, {len(toplevels) - shown} в пуле"
+        )
+        self._warnings = []
+        if hidden_cards > self.max_hidden_cards:
+            self._warnings.append(
+                f"Утечка: {hidden_cards} скрытых карточек "
+                f"(лимит {self.max_hidden_cards})"
+            )
+        if len(toplevels) > MAX_TOPLEVELS:
+            self._warnings.append(f"Утечка: {len(toplevels)} окон Toplevel")
+
+    def _render(self) -> None:
+        """Обновление текста оверлея"""
+        last_lag = self._lags[-1] if self._lags else 0.0
+        max_lag = max(self._lags, default=0.0)
+        action_count, action_seconds = self._last_action
+        self.label.configure(
+            text=(
+                f"Задержка цикла: {last_lag:5.1f} мс (макс. за 1 с {max_lag:5.1f})\n"
+                f"Последнее действие ({self._last_input}):\n"
+                f"  запросов {action_count}, БД {action_seconds * 1000:.1f} мс\n"
+                f"{self._widget_text}"
+            )
+        )
+        warnings = list(self._warnings)
+        if max_lag > LAG_WARNING_MS:
+            warnings.append(f"Интерфейс подвисает: {max_lag:.0f} мс")
+        self.warning_label.configure(text="\n".join(warnings))
@@ -0,0 +1,104 @@
+from typing import Any, Callable, Dict
+
+import customtkinter as ctk
+
+from src.db.models import Project
+
+
+def get_status_color(status: str) -> str:
+    """Получение цвета для статуса"""
+    colors = {"active": "green", "completed": "gray", "overdue": "red"}
+    return colors.get(status, "white")
+
+
+def get_balance_color(balance: float) -> str:
+    """Получение цвета для баланса"""
+    if balance > 0:
+        return "green"
+    elif balance < 0:
+        return "red"
+    return "white"
+
+
+class ProjectCard(ctk.CTkFrame):
+    """Карточка проекта в списке главного окна"""
+
+    def __init__(
+        self,
+        master: Any,
+        project: Project,
+        balance: Dict[str, float],
+        on_open: Callable[[int], None],
+        on_payment: Callable[[int], None],
+        on_modification: Callable[[int], None],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(master, **kwargs)
+        self.project_id = project.id
+
+        # Основная информация
+        header_frame = ctk.CTkFrame(self)
+        header_frame.pack(fill="x", padx=10, pady=5)
+
+        self.name_label = ctk.CTkLabel(header_frame, font=("Arial", 16, "bold"))
+        self.name_label.pack(side="left")
+
+        self.status_label = ctk.CTkLabel(header_frame, font=("Arial", 12))
+        self.status_label.pack(side="right")
+
+        # Информация о проекте
+        info_frame = ctk.CTkFrame(self)
+        info_frame.pack(fill="x", padx=10, pady=5)
+
+        self.dates_label = ctk.CTkLabel(info_frame)
+        self.dates_label.pack(side="left", padx=5)
+
+        self.finance_label = ctk.CTkLabel(info_frame)
+        self.finance_label.pack(side="right", padx=5)
+
+        # Кнопки управления
+        buttons_frame = ctk.CTkFrame(self)
+        buttons_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkButton(
+            buttons_frame,
+            text="Открыть",
+            command=lambda: on_open(self.project_id),
+            width=100,
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            buttons_frame,
+            text="Платеж",
+            command=lambda: on_payment(self.project_id),
+            width=100,
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            buttons_frame,
+            text="Доработка",
+            command=lambda: on_modification(self.project_id),
+            width=100,
+        ).pack(side="left", padx=5)
+
+        self.update_project(project, balance)
+
+    def update_project(self, project: Project, balance: Dict[str, float]) -> None:
+        """Обновление данных карточки без пересоздания виджетов"""
+        self.name_label.configure(text=project.name)
+        self.status_label.configure(
+            text=project.status.capitalize(),
+            text_color=get_status_color(project.status),
+        )
+        self.dates_label.configure(
+            text=f"Начало: {project.start_date.strftime('%d.%m.%Y')} | "
+            f"Дедлайн: {project.deadline.strftime('%d.%m.%Y')}"
+        )
+
+        # Финансы
+        self.finance_label.configure(
+            text=f"Стоимость: {project.total_cost:,.2f} | "
+            f"Оплачено: {balance['total_paid']:,.2f} | "
+            f"Баланс: {balance['balance']:,.2f} {project.currency}",
+            text_color=get_balance_color(balance["balance"]),
+        )
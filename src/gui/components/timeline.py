@@ -0,0 +1,327 @@
+import tkinter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import customtkinter as ctk
+import numpy as np
+
+from src.utils.recurrence import add_months
+from src.utils.timeline import SpanRow, TimelineModel, from_days, to_days
+
+# Высота дорожки и шкалы дат, px
+LANE_HEIGHT = 18
+AXIS_HEIGHT = 24
+# Масштаб: по умолчанию и пределы, px на день
+DEFAULT_SCALE = 4.0
+MIN_SCALE = 0.02
+MAX_SCALE = 80.0
+# Шаг масштабирования колесом мыши
+ZOOM_STEP = 1.25
+# Ниже этого масштаба или при большем числе видимых отрезков
+# вместо отрезков рисуются полосы плотности
+DETAIL_MIN_SCALE = 0.5
+MAX_VISIBLE_BARS = 1500
+# Ширина интервала и число дорожек в одной полосе плотности
+BAND_WIDTH_PX = 6
+LANES_PER_BAND = 4
+# Задержка пересчета полос после прокрутки и масштабирования, мс
+BAND_REFRESH_MS = 120
+# Сколько ширин окна загружать по обе стороны от видимого периода
+PRELOAD_WIDTHS = 1.0
+# Наименьшее расстояние между делениями шкалы, px
+MIN_TICK_PX = 70
+# Деления шкалы: шаг в днях (для подбора), шаг в месяцах, формат подписи
+TICKS = [
+    (1, 0, "%d.%m"),
+    (7, 0, "%d.%m"),
+    (30, 1, "%m.%Y"),
+    (91, 3, "%m.%Y"),
+    (365, 12, "%Y"),
+]
+
+STATUS_COLORS = {"active": "#3b8ed0", "completed": "gray55", "overdue": "#d9534f"}
+MODIFICATION_COLOR = "#f0ad4e"
+BAND_COLOR = (59, 142, 208)
+
+
+class TimelineView(ctk.CTkFrame):
+    """Шкала времени проектов и доработок на холсте
+
+    На холсте есть только видимые отрезки. Прокрутка и масштаб сдвигают
+    и растягивают уже созданные элементы (Canvas.move / Canvas.scale),
+    после чего добавляются вошедшие в окно отрезки и удаляются ушедшие.
+    При мелком масштабе отрезки заменяются полосами плотности.
+    """
+
+    def __init__(
+        self,
+        master: Any,
+        fetch_spans: Callable[[datetime, datetime], List[SpanRow]],
+        on_open: Optional[Callable[[int], None]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(master, **kwargs)
+
+        self.fetch_spans = fetch_spans
+        self.on_open = on_open
+
+        self.canvas = tkinter.Canvas(self, highlightthickness=0, background="white")
+        self.canvas.pack(fill="both", expand=True)
+        self.status_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.status_label.pack(fill="x", padx=10)
+
+        self.scale = DEFAULT_SCALE
+        # День у левого края и дорожка у верхнего края видимой области
+        self.origin = to_days(datetime.now()) - 30
+        self.top_lane = 0.0
+
+        self.model = TimelineModel([])
+        self._loaded = (0.0, 0.0)
+        # Номер отрезка модели -> элемент холста и обратно
+        self._items: Dict[int, int] = {}
+        self._spans_by_item: Dict[int, int] = {}
+        self._detailed = True
+        self._band_job: Optional[str] = None
+        self._drag: Optional[Tuple[int, int]] = None
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", self._on_wheel)
+        self.canvas.bind("<Button-5>", self._on_wheel)
+        self.canvas.tag_bind("bar", "<Enter>", self._on_hover)
+        self.canvas.tag_bind("bar", "<Double-Button-1>", self._on_double_click)
+
+    def reload(self) -> None:
+        """Повторная загрузка отрезков (после изменения данных)"""
+        self._loaded = (0.0, 0.0)
+        self.refresh()
+
+    def _window(self) -> Tuple[float, float, float, float]:
+        """Видимое окно: (день слева, день справа, верхняя и нижняя дорожки)"""
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height() - AXIS_HEIGHT, 0)
+        return (
+            self.origin,
+            self.origin + width / self.scale,
+            self.top_lane,
+            self.top_lane + height / LANE_HEIGHT,
+        )
+
+    def _x(self, days: float) -> float:
+        return (days - self.origin) * self.scale
+
+    def _y(self, lane: float) -> float:
+        return AXIS_HEIGHT + (lane - self.top_lane) * LANE_HEIGHT
+
+    def _ensure_loaded(self, t0: float, t1: float) -> None:
+        """Загрузка отрезков с запасом, если окно вышло за загруженный период"""
+        if self._loaded[0] <= t0 and t1 <= self._loaded[1]:
+            return
+        margin = (t1 - t0) * PRELOAD_WIDTHS
+        start, end = t0 - margin, t1 + margin
+        self.model = TimelineModel(self.fetch_spans(from_days(start), from_days(end)))
+        self._loaded = (start, end)
+        # Номера отрезков и дорожки новой модели другие
+        self.canvas.delete("bar")
+        self._items.clear()
+        self._spans_by_item.clear()
+
+    def refresh(self) -> None:
+        """Отсечение невидимого и выбор детализации для текущего окна"""
+        if self._band_job is not None:
+            self.after_cancel(self._band_job)
+            self._band_job = None
+
+        t0, t1, lane0, lane1 = self._window()
+        self._ensure_loaded(t0, t1)
+        visible = self.model.visible(t0, t1, lane0, lane1)
+        self._detailed = (
+            self.scale >= DETAIL_MIN_SCALE and len(visible) <= MAX_VISIBLE_BARS
+        )
+        if self._detailed:
+            self.canvas.delete("band")
+            self._sync_bars(visible)
+        else:
+            self._sync_bars(visible[:0])
+            self._draw_bands(t0, t1, lane0, lane1)
+        self._draw_axis(t0, t1)
+
+        self.status_label.configure(
+            text=(
+                f"{from_days(t0):%d.%m.%Y} — {from_days(t1):%d.%m.%Y} · "
+                f"в окне: {len(visible)} из {len(self.model)}"
+                + ("" if self._detailed else " (плотность)")
+            )
+        )
+
+    def _sync_bars(self, visible: np.ndarray) -> None:
+        """Создание вошедших в окно отрезков и удаление ушедших"""
+        wanted = set(visible.tolist())
+        for index in [index for index in self._items if index not in wanted]:
+            item = self._items.pop(index)
+            del self._spans_by_item[item]
+            self.canvas.delete(item)
+
+        added = wanted.difference(self._items)
+        for index in added:
+            item = self._create_bar(index)
+            self._items[index] = item
+            self._spans_by_item[item] = index
+        if added:
+            # Доработки поверх своих проектов, шкала под всеми
+            self.canvas.tag_raise("modification")
+            self.canvas.tag_lower("grid")
+
+    def _create_bar(self, index: int) -> int:
+        kind, _, _, _, _, _, status = self.model.rows[index]
+        lane = self.model.lanes[index]
+        x0 = self._x(self.model.starts[index])
+        x1 = self._x(self.model.ends[index])
+        y = self._y(lane)
+        if kind == "project":
+            return self.canvas.create_rectangle(
+                x0,
+                y + 2,
+                x1,
+                y + LANE_HEIGHT - 2,
+                fill=STATUS_COLORS.get(status, STATUS_COLORS["active"]),
+                outline="",
+                tags=("bar", "project"),
+            )
+        return self.canvas.create_rectangle(
+            x0,
+            y + 6,
+            x1,
+            y + LANE_HEIGHT - 6,
+            fill=MODIFICATION_COLOR,
+            outline="",
+            tags=("bar", "modification"),
+        )
+
+    def _draw_bands(self, t0: float, t1: float, lane0: float, lane1: float) -> None:
+        """Полосы плотности: цвет интервала зависит от числа идущих проектов"""
+        self.canvas.delete("band")
+        bins = max(int(self.canvas.winfo_width() // BAND_WIDTH_PX), 1)
+        edges, bands, counts = self.model.density(
+            t0, t1, bins, int(lane0), int(lane1), LANES_PER_BAND
+        )
+        peak = max(int(counts.max(initial=0)), 1)
+        for band, row in zip(bands.tolist(), counts):
+            y0 = self._y(band * LANES_PER_BAND)
+            y1 = y0 + LANES_PER_BAND * LANE_HEIGHT - 1
+            for column in np.flatnonzero(row).tolist():
+                self.canvas.create_rectangle(
+                    self._x(edges[column]),
+                    y0,
+                    self._x(edges[column + 1]),
+                    y1,
+                    fill=_band_color(row[column] / peak),
+                    outline="",
+                    tags=("band",),
+                )
+        self.canvas.tag_lower("grid")
+
+    def _draw_axis(self, t0: float, t1: float) -> None:
+        """Деления шкалы дат и линия сегодняшнего дня (их немного)"""
+        self.canvas.delete("axis")
+        height = self.canvas.winfo_height()
+        step_days, months, label = next(
+            (tick for tick in TICKS if tick[0] * self.scale >= MIN_TICK_PX), TICKS[-1]
+        )
+        moment = from_days(t0).replace(hour=0, minute=0, second=0, microsecond=0)
+        if months:
+            moment = moment.replace(day=1)
+            if months == 12:
+                moment = moment.replace(month=1)
+        end = from_days(t1)
+        while moment <= end:
+            x = self._x(to_days(moment))
+            self.canvas.create_line(
+                x, AXIS_HEIGHT, x, height, fill="gray88", tags=("axis", "grid")
+            )
+            self.canvas.create_text(
+                x + 3,
+                AXIS_HEIGHT / 2,
+                text=moment.strftime(label),
+                anchor="w",
+                fill="gray30",
+                tags=("axis",),
+            )
+            moment = (
+                add_months(moment, months) if months else moment + timedelta(step_days)
+            )
+
+        today = self._x(to_days(datetime.now()))
+        self.canvas.create_line(
+            today, 0, today, height, fill="red", dash=(4, 2), tags=("axis",)
+        )
+        self.canvas.tag_lower("grid")
+
+    def _after_move(self) -> None:
+        """Отсечение сразу; полосы плотности пересчитываются с задержкой"""
+        if self._detailed:
+            self.refresh()
+        elif self._band_job is None:
+            self._band_job = self.after(BAND_REFRESH_MS, self.refresh)
+
+    def _on_press(self, event: Any) -> None:
+        self._drag = (event.x, event.y)
+
+    def _on_drag(self, event: Any) -> None:
+        """Прокрутка перетаскиванием: сдвиг существующих элементов"""
+        if self._drag is None:
+            return
+        dx, dy = event.x - self._drag[0], event.y - self._drag[1]
+        self._drag = (event.x, event.y)
+        # Выше первой дорожки прокручивать некуда
+        dy = min(dy, self.top_lane * LANE_HEIGHT)
+        self.origin -= dx / self.scale
+        self.top_lane -= dy / LANE_HEIGHT
+        for tag in ("bar", "band", "axis"):
+            self.canvas.move(tag, dx, dy if tag != "axis" else 0)
+        self._after_move()
+
+    def _on_wheel(self, event: Any) -> None:
+        """Масштаб колесом мыши вокруг указателя: растяжение элементов"""
+        zoom_in = getattr(event, "delta", 0) > 0 or event.num == 4
+        scale = self.scale * (ZOOM_STEP if zoom_in else 1 / ZOOM_STEP)
+        scale = min(max(scale, MIN_SCALE), MAX_SCALE)
+        if scale == self.scale:
+            return
+        factor = scale / self.scale
+        days = self.origin + event.x / self.scale
+        self.scale = scale
+        self.origin = days - event.x / self.scale
+        for tag in ("bar", "band", "axis"):
+            self.canvas.scale(tag, event.x, 0, factor, 1.0)
+        self._after_move()
+
+    def _span_under_pointer(self) -> Optional[SpanRow]:
+        current = self.canvas.find_withtag("current")
+        index = self._spans_by_item.get(current[0]) if current else None
+        return None if index is None else self.model.rows[index]
+
+    def _on_hover(self, event: Any) -> None:
+        """Название и сроки отрезка под указателем"""
+        row = self._span_under_pointer()
+        if row:
+            _, _, _, title, start, deadline, _ = row
+            self.status_label.configure(
+                text=f"{title}: {start:%d.%m.%Y} — {deadline:%d.%m.%Y}"
+            )
+
+    def _on_double_click(self, event: Any) -> None:
+        """Открытие проекта отрезка"""
+        row = self._span_under_pointer()
+        if row and self.on_open:
+            self.on_open(row[2])
+
+
+def _band_color(level: float) -> str:
+    """Цвет полосы: от светлого к насыщенному по доле от максимума"""
+    red, green, blue = (
+        round(255 - (255 - channel) * (0.15 + 0.85 * level)) for channel in BAND_COLOR
+    )
+    return f"#{red:02x}{green:02x}{blue:02x}"
@@ -0,0 +1,55 @@
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import customtkinter as ctk
+
+# Сколько скрытых экземпляров одной формы держать в запасе
+MAX_IDLE_FORMS = 2
+
+
+class FormPool:
+    """Пул форм: закрытая форма скрывается и переиспользуется"""
+
+    def __init__(self, master: Any) -> None:
+        self.master = master
+        self._forms: Dict[Type[ctk.CTkToplevel], List[ctk.CTkToplevel]] = {}
+
+    def show(
+        self,
+        form_class: Type[ctk.CTkToplevel],
+        project_id: Optional[int] = None,
+        callback: Optional[Callable[[], None]] = None,
+    ) -> ctk.CTkToplevel:
+        """Показ формы, привязанной к проекту"""
+        forms = self._forms.setdefault(form_class, [])
+        forms[:] = [form for form in forms if form.winfo_exists()]
+
+        idle = [form for form in forms if form.state() == "withdrawn"]
+        if idle:
+            # Дерево виджетов уже построено, меняем только данные
+            form = idle[0]
+            form.bind_project(project_id, callback)
+            form.deiconify()
+            form.lift()
+            form.focus()
+        else:
+            form = form_class(self.master, project_id, callback)
+            form.pool = self
+            forms.append(form)
+        return form
+
+    def release(self, form: ctk.CTkToplevel) -> bool:
+        """Возврат формы в пул; False, если форму нужно уничтожить"""
+        forms = self._forms.get(type(form), [])
+        idle = [f for f in forms if f is not form and f.state() == "withdrawn"]
+        if len(idle) >= MAX_IDLE_FORMS:
+            forms.remove(form)
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Уничтожение всех форм пула"""
+        for forms in self._forms.values():
+            for form in forms:
+                if form.winfo_exists():
+                    form.destroy()
+        self._forms.clear()
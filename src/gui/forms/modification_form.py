@@ -1,11 +1,18 @@
 import customtkinter as ctk
 from datetime import datetime
 from tkcalendar import DateEntry
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
+
+from src.gui.forms.form_pool import FormPool
 
 
 class ModificationForm(ctk.CTkToplevel):
-    def __init__(self, parent, project_id: int, callback: Optional[Callable] = None):
+    def __init__(
+        self,
+        parent: Any,
+        project_id: int,
+        callback: Optional[Callable[[], None]] = None,
+    ) -> None:
         super().__init__(parent)
 
         self.title("Доработка проекта")
@@ -13,23 +20,49 @@ class ModificationForm(ctk.CTkToplevel):
 
         self.project_manager = parent.project_manager
         self.modification_manager = parent.modification_manager
+        self.pool: Optional[FormPool] = None
+
+        self._setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.bind_project(project_id, callback)
+
+    def bind_project(
+        self, project_id: int, callback: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Привязка формы к проекту и сброс полей"""
         self.project_id = project_id
         self.callback = callback
-
         self.project = self.project_manager.get_project(project_id)
-        self._setup_ui()
 
-    def _setup_ui(self):
+        self.project_label.configure(text=f"Проект: {self.project.name}")
+        self.currency_label.configure(text=self.project.currency)
+        self.description_text.delete("1.0", "end")
+        self.start_date.set_date(datetime.now())
+        self.deadline.set_date(datetime.now())
+        self.is_paid_var.set(True)
+        self.cost_var.set("0")
+        self._toggle_cost_field()
+        self.status_var.set("pending")
+        self.add_payment_var.set(False)
+        self.payment_amount_var.set("0")
+        self.payment_date.set_date(datetime.now())
+        self._toggle_payment_fields()
+
+    def close(self) -> None:
+        """Закрытие формы (в пуле форма скрывается)"""
+        if self.pool and self.pool.release(self):
+            self.withdraw()
+        else:
+            self.destroy()
+
+    def _setup_ui(self) -> None:
         """Настройка интерфейса формы"""
         # Информация о проекте
         project_frame = ctk.CTkFrame(self)
         project_frame.pack(fill="x", padx=10, pady=5)
 
-        ctk.CTkLabel(
-            project_frame,
-            text=f"Проект: {self.project.name}",
-            font=("Arial", 14, "bold"),
-        ).pack(anchor="w", padx=10, pady=5)
+        self.project_label = ctk.CTkLabel(project_frame, font=("Arial", 14, "bold"))
+        self.project_label.pack(anchor="w", padx=10, pady=5)
 
         # Описание доработки
         ctk.CTkLabel(self, text="Описание доработки:").pack(
@@ -71,12 +104,12 @@ class ModificationForm(ctk.CTkToplevel):
         self.deadline.pack()
 
         # Тип доработки (платная/бесплатная)
-        type_frame = ctk.CTkFrame(self)
-        type_frame.pack(fill="x", padx=10, pady=10)
+        self.type_frame = ctk.CTkFrame(self)
+        self.type_frame.pack(fill="x", padx=10, pady=10)
 
         self.is_paid_var = ctk.BooleanVar(value=True)
         ctk.CTkCheckBox(
-            type_frame,
+            self.type_frame,
             text="Платная доработка",
             variable=self.is_paid_var,
             command=self._toggle_cost_field,
@@ -94,6 +127,8 @@ class ModificationForm(ctk.CTkToplevel):
             self.cost_frame, width=150, textvariable=self.cost_var
         )
         self.cost_entry.pack(side="left", padx=5)
+        self.currency_label = ctk.CTkLabel(self.cost_frame)
+        self.currency_label.pack(side="left", padx=5)
 
         # Статус
         ctk.CTkLabel(self, text="Статус:").pack(anchor="w", padx=10, pady=(10, 0))
@@ -114,12 +149,12 @@ class ModificationForm(ctk.CTkToplevel):
             ).pack(side="left", padx=10)
 
         # Платёж
-        payment_frame = ctk.CTkFrame(self)
-        payment_frame.pack(fill="x", padx=10, pady=10)
+        self.payment_frame = ctk.CTkFrame(self)
+        self.payment_frame.pack(fill="x", padx=10, pady=10)
 
         self.add_payment_var = ctk.BooleanVar(value=False)
         ctk.CTkCheckBox(
-            payment_frame,
+            self.payment_frame,
             text="Добавить платёж",
             variable=self.add_payment_var,
             command=self._toggle_payment_fields,
@@ -166,22 +201,24 @@ class ModificationForm(ctk.CTkToplevel):
             buttons_frame, text="Сохранить", command=self._save_modification, width=120
         ).pack(side="left", padx=5)
 
-        ctk.CTkButton(
-            buttons_frame, text="Отмена", command=self.destroy, width=120
-        ).pack(side="left", padx=5)
+        ctk.CTkButton(buttons_frame, text="Отмена", command=self.close, width=120).pack(
+            side="left", padx=5
+        )
 
-    def _toggle_cost_field(self):
+    def _toggle_cost_field(self) -> None:
         """Переключение видимости поля стоимости"""
         if self.is_paid_var.get():
-            self.cost_frame.pack(fill="x", padx=10, pady=5)
+            self.cost_frame.pack(fill="x", padx=10, pady=5, after=self.type_frame)
         else:
             self.cost_frame.pack_forget()
             self.cost_var.set("0")
 
-    def _toggle_payment_fields(self):
+    def _toggle_payment_fields(self) -> None:
         """Переключение видимости полей платежа"""
         if self.add_payment_var.get():
-            self.payment_details_frame.pack(fill="x", padx=10, pady=5)
+            self.payment_details_frame.pack(
+                fill="x", padx=10, pady=5, after=self.payment_frame
+            )
         else:
             self.payment_details_frame.pack_forget()
 
@@ -197,6 +234,7 @@ class ModificationForm(ctk.CTkToplevel):
                 "is_paid": self.is_paid_var.get(),
                 "cost": float(self.cost_var.get()) if self.is_paid_var.get() else 0.0,
                 "status": self.status_var.get(),
+                "currency": self.project.currency,
             }
 
             # Создаем доработку
@@ -218,7 +256,7 @@ class ModificationForm(ctk.CTkToplevel):
             if self.callback:
                 self.callback()
 
-            self.destroy()
+            self.close()
 
         except ValueError as e:
             # Показать сообщение об ошибке
@@ -1,48 +1,99 @@
 import customtkinter as ctk
 from datetime import datetime
 from tkcalendar import DateEntry
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
+
+from src.db.events import PAYMENTS, ChangeEvent
+from src.db.models import CURRENCIES
+from src.gui.forms.form_pool import FormPool
+from src.utils.recurrence import CADENCES
+
+# Вариант «без повторения» в выборе периодичности
+ONCE = "Однократно"
 
 
 class PaymentForm(ctk.CTkToplevel):
-    def __init__(self, parent, project_id: int, callback: Optional[Callable] = None):
+    def __init__(
+        self,
+        parent: Any,
+        project_id: int,
+        callback: Optional[Callable[[], None]] = None,
+    ) -> None:
         super().__init__(parent)
 
         self.title("Добавление платежа")
-        self.geometry("400x500")
+        self.geometry("400x560")
 
         self.project_manager = parent.project_manager
         self.payment_manager = parent.payment_manager
+        self.schedule_manager = parent.schedule_manager
+        self.event_bus = parent.event_bus
+        self.pool: Optional[FormPool] = None
+
+        self._setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.bind_project(project_id, callback)
+
+    def bind_project(
+        self, project_id: int, callback: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Привязка формы к проекту и сброс полей"""
         self.project_id = project_id
         self.callback = callback
-
         self.project = self.project_manager.get_project(project_id)
-        self._setup_ui()
 
-    def _setup_ui(self):
+        self.project_label.configure(text=f"Проект: {self.project.name}")
+        balance = self.project_manager.get_project_balance(project_id)
+        self.balance_label.configure(
+            text=f"Остаток к оплате: {abs(balance['balance']):,.2f} "
+            f"{self.project.currency}"
+        )
+
+        self.amount_var.set("0")
+        self.currency_var.set(self.project.currency)
+        self.payment_date.set_date(datetime.now())
+        self.payment_type_var.set("transfer")
+        self.status_var.set("completed")
+        self.repeat_var.set(ONCE)
+        self.has_end_var.set(False)
+        self.end_date.set_date(datetime.now())
+        self.description_text.delete("1.0", "end")
+
+    def close(self) -> None:
+        """Закрытие формы (в пуле форма скрывается)"""
+        if self.pool and self.pool.release(self):
+            self.withdraw()
+        else:
+            self.destroy()
+
+    def _setup_ui(self) -> None:
         """Настройка интерфейса формы"""
         # Информация о проекте
         project_frame = ctk.CTkFrame(self)
         project_frame.pack(fill="x", padx=10, pady=5)
 
-        ctk.CTkLabel(
-            project_frame,
-            text=f"Проект: {self.project.name}",
-            font=("Arial", 14, "bold"),
-        ).pack(anchor="w", padx=10, pady=5)
+        self.project_label = ctk.CTkLabel(project_frame, font=("Arial", 14, "bold"))
+        self.project_label.pack(anchor="w", padx=10, pady=5)
 
-        balance = self.project.calculate_balance()
-        ctk.CTkLabel(
-            project_frame, text=f"Остаток к оплате: {abs(balance['balance']):,.2f}"
-        ).pack(anchor="w", padx=10, pady=5)
+        self.balance_label = ctk.CTkLabel(project_frame)
+        self.balance_label.pack(anchor="w", padx=10, pady=5)
 
         # Сумма платежа
         ctk.CTkLabel(self, text="Сумма платежа:").pack(
             anchor="w", padx=10, pady=(10, 0)
         )
+        amount_frame = ctk.CTkFrame(self, fg_color="transparent")
+        amount_frame.pack(anchor="w", padx=10, pady=(0, 10))
         self.amount_var = ctk.StringVar(value="0")
-        self.amount_entry = ctk.CTkEntry(self, width=200, textvariable=self.amount_var)
-        self.amount_entry.pack(anchor="w", padx=10, pady=(0, 10))
+        self.amount_entry = ctk.CTkEntry(
+            amount_frame, width=200, textvariable=self.amount_var
+        )
+        self.amount_entry.pack(side="left")
+        # Платеж может поступить в другой валюте: он пересчитывается по курсу
+        self.currency_var = ctk.StringVar(value=CURRENCIES[0])
+        ctk.CTkOptionMenu(
+            amount_frame, values=CURRENCIES, variable=self.currency_var, width=80
+        ).pack(side="left", padx=5)
 
         # Дата платежа
         date_frame = ctk.CTkFrame(self)
@@ -59,6 +110,33 @@ class PaymentForm(ctk.CTkToplevel):
         )
         self.payment_date.pack(side="left", padx=5)
 
+        # Повторение: платежи графика создаются с даты платежа
+        repeat_frame = ctk.CTkFrame(self)
+        repeat_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(repeat_frame, text="Повтор:").pack(side="left", padx=5)
+        self.repeat_var = ctk.StringVar(value=ONCE)
+        ctk.CTkOptionMenu(
+            repeat_frame,
+            values=[ONCE, *CADENCES.values()],
+            variable=self.repeat_var,
+            width=140,
+        ).pack(side="left", padx=5)
+
+        self.has_end_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(repeat_frame, text="до", variable=self.has_end_var).pack(
+            side="left", padx=5
+        )
+        self.end_date = DateEntry(
+            repeat_frame,
+            width=12,
+            background="darkblue",
+            foreground="white",
+            borderwidth=2,
+            date_pattern="dd.mm.yyyy",
+        )
+        self.end_date.pack(side="left", padx=5)
+
         # Тип платежа
         ctk.CTkLabel(self, text="Тип платежа:").pack(anchor="w", padx=10, pady=(10, 0))
         self.payment_type_var = ctk.StringVar(value="transfer")
@@ -102,9 +180,9 @@ class PaymentForm(ctk.CTkToplevel):
             buttons_frame, text="Сохранить", command=self._save_payment, width=120
         ).pack(side="left", padx=5)
 
-        ctk.CTkButton(
-            buttons_frame, text="Отмена", command=self.destroy, width=120
-        ).pack(side="left", padx=5)
+        ctk.CTkButton(buttons_frame, text="Отмена", command=self.close, width=120).pack(
+            side="left", padx=5
+        )
 
     def _save_payment(self):
         """Сохранение платежа"""
@@ -112,18 +190,44 @@ class PaymentForm(ctk.CTkToplevel):
             payment_data = {
                 "project_id": self.project_id,
                 "amount": float(self.amount_var.get()),
+                "currency": self.currency_var.get(),
                 "payment_date": datetime.strptime(self.payment_date.get(), "%d.%m.%Y"),
                 "payment_type": self.payment_type_var.get(),
                 "status": self.status_var.get(),
                 "description": self.description_text.get("1.0", "end-1c"),
             }
 
-            self.payment_manager.add_payment(**payment_data)
+            cadence = next(
+                (
+                    key
+                    for key, label in CADENCES.items()
+                    if label == self.repeat_var.get()
+                ),
+                None,
+            )
+            if cadence is None:
+                self.payment_manager.add_payment(**payment_data)
+            else:
+                # Платежи графика ожидаются, статус формы не используется
+                del payment_data["status"]
+                end_date = (
+                    datetime.strptime(self.end_date.get(), "%d.%m.%Y")
+                    if self.has_end_var.get()
+                    else None
+                )
+                self.schedule_manager.create_schedule(
+                    cadence=cadence,
+                    start_date=payment_data.pop("payment_date"),
+                    end_date=end_date,
+                    **payment_data,
+                )
+                # Пакетная вставка платежей минует события сессии
+                self.event_bus.publish(ChangeEvent(self.project_id, PAYMENTS))
 
             if self.callback:
                 self.callback()
 
-            self.destroy()
+            self.close()
 
         except ValueError as e:
             # Показать сообщение об ошибке
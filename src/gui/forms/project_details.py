@@ -1,9 +1,28 @@
-from typing import Callable, Optional
+import itertools
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import customtkinter as ctk
 
+from src.db.crud import ClientManager
+from src.db.events import MODIFICATIONS, PAYMENTS, PROJECT, TIME_ENTRIES, ChangeEvent
+from src.db.models import Modification, Payment, TimeEntry
+from src.gui.components.expandable_label import ExpandableLabel
+from src.gui.components.paged_list import PagedList
+from src.utils.recurrence import CADENCES, occurrences
 from src.utils.plot_utils import create_modifications_chart, create_payments_chart
 
+# Вкладки окна
+GENERAL_TAB = "Общая информация"
+PAYMENTS_TAB = "Платежи"
+MODIFICATIONS_TAB = "Доработки"
+ANALYTICS_TAB = "Аналитика"
+
+# Период обновления таймера, мс
+TIMER_TICK_MS = 1000
+# Сколько будущих платежей графика показывать
+UPCOMING_PAYMENTS = 3
+
 
 class ProjectDetails(ctk.CTkToplevel):
     def __init__(self, parent, project_id: int, callback: Optional[Callable] = None):
@@ -15,34 +34,71 @@ class ProjectDetails(ctk.CTkToplevel):
         self.project_manager = parent.project_manager
         self.payment_manager = parent.payment_manager
         self.modification_manager = parent.modification_manager
+        self.schedule_manager = parent.schedule_manager
+        self.chart_renderer = parent.chart_renderer
+        self.form_pool = parent.form_pool
+        self.write_buffer = parent.write_buffer
         self.project_id = project_id
         self.callback = callback
 
+        # Таймер учета времени по доработке
+        self.timer_entry: Optional[TimeEntry] = None
+        self._timer_start: Optional[datetime] = None
+        self._timer_rate = 0.0
+        self._timer_title = ""
+        self._tick_job: Optional[str] = None
+        self._time_labels: Dict[int, ctk.CTkLabel] = {}
+        self._time_totals: Dict[int, Tuple[float, float]] = {}
+
         self.project = self.project_manager.get_project(project_id)
         self._setup_ui()
-        self._load_data()
+        self._update_balance()
+
+        # Подписка на изменения данных проекта
+        self.event_bus = parent.event_bus
+        self._pending_topics: Set[str] = set()
+        self.event_bus.subscribe(self._on_data_changed)
 
-    def _setup_ui(self):
+    def destroy(self) -> None:
+        """Закрытие окна с сохранением таймера и отпиской от шины изменений"""
+        self._stop_timer()
+        self.event_bus.unsubscribe(self._on_data_changed)
+        super().destroy()
+
+    def _setup_ui(self) -> None:
         """Настройка интерфейса"""
         # Создаем notebook для вкладок
-        self.notebook = ctk.CTkTabview(self)
+        self.notebook = ctk.CTkTabview(self, command=self._on_tab_changed)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=5)
 
-        # Добавляем вкладки
-        self.notebook.add("Общая информация")
-        self.notebook.add("Платежи")
-        self.notebook.add("Доработки")
-        self.notebook.add("Аналитика")
-
-        # Настраиваем каждую вкладку
-        self._setup_general_tab()
-        self._setup_payments_tab()
-        self._setup_modifications_tab()
-        self._setup_analytics_tab()
-
-    def _setup_general_tab(self):
+        # Вкладки строятся при первом открытии
+        self._tab_builders: Dict[str, Callable[[], None]] = {
+            GENERAL_TAB: self._setup_general_tab,
+            PAYMENTS_TAB: self._setup_payments_tab,
+            MODIFICATIONS_TAB: self._setup_modifications_tab,
+            ANALYTICS_TAB: self._setup_analytics_tab,
+        }
+        self._built_tabs: Set[str] = set()
+        for name in self._tab_builders:
+            self.notebook.add(name)
+
+        self._ensure_tab(GENERAL_TAB)
+
+    def _on_tab_changed(self) -> None:
+        """Обработка переключения вкладки"""
+        self._ensure_tab(self.notebook.get())
+
+    def _ensure_tab(self, name: str) -> None:
+        """Построение вкладки, если она еще не построена"""
+        if name not in self._built_tabs:
+            self._built_tabs.add(name)
+            self._tab_builders[name]()
+
+    def _setup_general_tab(self) -> None:
         """Настройка вкладки общей информации"""
-        tab = self.notebook.tab("Общая информация")
+        tab = self.notebook.tab(GENERAL_TAB)
+        for widget in tab.winfo_children():
+            widget.destroy()
 
         # Заголовок проекта
         header_frame = ctk.CTkFrame(tab)
@@ -119,22 +175,53 @@ class ProjectDetails(ctk.CTkToplevel):
         )
         contacts_text.configure(state="disabled")
 
-    def _setup_payments_tab(self):
+        # Сводка по клиенту во всех его проектах
+        summary = (
+            ClientManager(
+                self.project_manager.session, self.project.currency
+            ).get_client_summary(self.project.client_id)
+            if self.project.client_id
+            else None
+        )
+        if summary is not None:
+            ctk.CTkLabel(
+                contacts_frame,
+                text=(
+                    f"Клиент: {summary['name']} · проектов: {summary['projects']} · "
+                    f"оплачено: {summary['lifetime_value']:,.2f} · "
+                    f"долг: {summary['outstanding']:,.2f} {self.project.currency}"
+                ),
+            ).pack(anchor="w", padx=10, pady=(0, 5))
+
+    def _setup_payments_tab(self) -> None:
         """Настройка вкладки платежей"""
-        tab = self.notebook.tab("Платежи")
+        tab = self.notebook.tab(PAYMENTS_TAB)
 
         # Кнопка добавления платежа
         ctk.CTkButton(
             tab, text="Добавить платёж", command=lambda: self._show_payment_form()
         ).pack(anchor="w", padx=10, pady=5)
 
+        # Графики повторяющихся платежей
+        self.schedules_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        self.schedules_frame.pack(fill="x", padx=10)
+        self._render_schedules()
+
         # Список платежей
-        self.payments_frame = ctk.CTkScrollableFrame(tab)
-        self.payments_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.payments_list = PagedList(
+            tab,
+            fetch_page=lambda offset, limit: self.payment_manager.get_project_payments(
+                self.project_id, offset=offset, limit=limit
+            ),
+            render_item=self._create_payment_card,
+            empty_text="Платежей пока нет",
+        )
+        self.payments_list.pack(fill="both", expand=True, padx=10, pady=5)
+        self.payments_list.reload()
 
-    def _setup_modifications_tab(self):
+    def _setup_modifications_tab(self) -> None:
         """Настройка вкладки доработок"""
-        tab = self.notebook.tab("Доработки")
+        tab = self.notebook.tab(MODIFICATIONS_TAB)
 
         # Кнопка добавления доработки
         ctk.CTkButton(
@@ -143,75 +230,113 @@ class ProjectDetails(ctk.CTkToplevel):
             command=lambda: self._show_modification_form(),
         ).pack(anchor="w", padx=10, pady=5)
 
-        # Список доработок
-        self.modifications_frame = ctk.CTkScrollableFrame(tab)
-        self.modifications_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        # Таймер учета времени
+        timer_frame = ctk.CTkFrame(tab)
+        timer_frame.pack(fill="x", padx=10, pady=5)
 
-    def _setup_analytics_tab(self):
-        """Настройка вкладки аналитики"""
-        tab = self.notebook.tab("Аналитика")
+        self.timer_label = ctk.CTkLabel(timer_frame, text="Таймер не запущен")
+        self.timer_label.pack(side="left", padx=5)
 
-        # График платежей
-        self.payments_chart = create_payments_chart(tab, self.project)
-        self.payments_chart.pack(fill="x", padx=10, pady=5)
+        self.timer_stop_button = ctk.CTkButton(
+            timer_frame,
+            text="Остановить",
+            width=100,
+            state="disabled",
+            command=self._stop_timer,
+        )
+        self.timer_stop_button.pack(side="right", padx=5)
 
-        # График доработок
-        self.modifications_chart = create_modifications_chart(tab, self.project)
-        self.modifications_chart.pack(fill="x", padx=10, pady=5)
+        self.rate_entry = ctk.CTkEntry(timer_frame, width=90)
+        self.rate_entry.pack(side="right", padx=5)
+        ctk.CTkLabel(timer_frame, text="Ставка в час:").pack(side="right", padx=5)
 
-    def _load_data(self):
-        """Загрузка данных проекта"""
-        # Обновление баланса
-        balance = self.project.calculate_balance()
-        self.balance_label.configure(
-            text=(
-                f"Стоимость проекта: {balance['total_cost']:,.2f}\n"
-                f"Оплачено: {balance['total_paid']:,.2f}\n"
-                f"Баланс: {balance['balance']:,.2f}\n"
-                f"Стоимость доработок: {balance['mods_cost']:,.2f}"
+        # Список доработок
+        self.modifications_list = PagedList(
+            tab,
+            fetch_page=self._fetch_modifications,
+            render_item=self._create_modification_card,
+            empty_text="Доработок пока нет",
+        )
+        self.modifications_list.pack(fill="both", expand=True, padx=10, pady=5)
+        self.modifications_list.reload()
+
+    def _fetch_modifications(self, offset: int, limit: int) -> List[Modification]:
+        """Страница доработок вместе с итогами затраченного времени"""
+        if offset == 0:
+            self._time_labels = {}
+        modifications: List[Modification] = (
+            self.modification_manager.get_project_modifications(
+                self.project_id, offset=offset, limit=limit
             )
         )
+        self._time_totals = self.modification_manager.get_time_totals(
+            [modification.id for modification in modifications]
+        )
+        return modifications
 
-        # Загрузка платежей
-        self._load_payments()
-
-        # Загрузка доработок
-        self._load_modifications()
-
-        # Обновление графиков
-        self._update_analytics()
-
-    def _load_payments(self):
-        """Загрузка списка платежей"""
-        # Очистка списка
-        for widget in self.payments_frame.winfo_children():
-            widget.destroy()
+    def _setup_analytics_tab(self) -> None:
+        """Настройка вкладки аналитики"""
+        tab = self.notebook.tab(ANALYTICS_TAB)
 
-        # Получение платежей
-        payments = self.payment_manager.get_project_payments(self.project_id)
+        # Контейнеры графиков
+        self.payments_plot_frame = ctk.CTkFrame(tab)
+        self.payments_plot_frame.pack(fill="x", padx=10, pady=5)
 
-        # Отображение платежей
-        for payment in payments:
-            self._create_payment_card(payment)
+        self.modifications_plot_frame = ctk.CTkFrame(tab)
+        self.modifications_plot_frame.pack(fill="x", padx=10, pady=5)
 
-    def _load_modifications(self):
-        """Загрузка списка доработок"""
-        # Очистка списка
-        for widget in self.modifications_frame.winfo_children():
-            widget.destroy()
+        self._update_analytics()
 
-        # Получение доработок
-        modifications = self.modification_manager.get_project_modifications(
-            self.project_id
+    def _on_data_changed(self, event: ChangeEvent) -> None:
+        """Получение уведомления об изменении данных"""
+        if event.project_id != self.project_id:
+            return
+        if not self._pending_topics:
+            self.after_idle(self._apply_changes)
+        self._pending_topics.add("deleted" if event.deleted else event.topic)
+
+    def _apply_changes(self) -> None:
+        """Обновление только затронутых вкладок"""
+        topics, self._pending_topics = self._pending_topics, set()
+        if "deleted" in topics:
+            # Время по удаленному проекту не сохраняем
+            self._discard_timer()
+            self.destroy()
+            return
+        if MODIFICATIONS in topics and not self._timer_target_exists():
+            self._discard_timer()
+
+        # Непостроенные вкладки получат свежие данные при открытии
+        built = self._built_tabs
+        if PROJECT in topics:
+            self._setup_general_tab()
+        if PAYMENTS in topics and PAYMENTS_TAB in built:
+            self._render_schedules()
+            self.payments_list.reload()
+        if MODIFICATIONS in topics and MODIFICATIONS_TAB in built:
+            self.modifications_list.reload()
+        elif TIME_ENTRIES in topics and MODIFICATIONS_TAB in built:
+            self._update_time_labels()
+        if topics & {PAYMENTS, MODIFICATIONS, TIME_ENTRIES} and ANALYTICS_TAB in built:
+            self._update_analytics()
+        self._update_balance()
+
+    def _update_balance(self) -> None:
+        """Обновление баланса"""
+        balance = self.project_manager.get_project_balance(self.project_id)
+        currency = self.project.currency
+        self.balance_label.configure(
+            text=(
+                f"Стоимость проекта: {balance['total_cost']:,.2f} {currency}\n"
+                f"Оплачено: {balance['total_paid']:,.2f} {currency}\n"
+                f"Баланс: {balance['balance']:,.2f} {currency}\n"
+                f"Стоимость доработок: {balance['mods_cost']:,.2f} {currency}"
+            )
         )
 
-        # Отображение доработок
-        for modification in modifications:
-            self._create_modification_card(modification)
-
-    def _create_payment_card(self, payment):
+    def _create_payment_card(self, parent: Any, payment: Payment) -> None:
         """Создание карточки платежа"""
-        frame = ctk.CTkFrame(self.payments_frame)
+        frame = ctk.CTkFrame(parent)
         frame.pack(fill="x", padx=5, pady=5)
 
         # Основная информация
@@ -219,7 +344,9 @@ class ProjectDetails(ctk.CTkToplevel):
         info_frame.pack(fill="x", padx=10, pady=5)
 
         ctk.CTkLabel(
-            info_frame, text=f"Сумма: {payment.amount:,.2f}", font=("Arial", 12, "bold")
+            info_frame,
+            text=f"Сумма: {payment.amount:,.2f} {payment.currency}",
+            font=("Arial", 12, "bold"),
         ).pack(side="left", padx=5)
 
         ctk.CTkLabel(
@@ -234,14 +361,15 @@ class ProjectDetails(ctk.CTkToplevel):
 
         # Описание
         if payment.description:
-            desc_text = ctk.CTkTextbox(frame, height=40)
-            desc_text.pack(fill="x", padx=10, pady=(0, 5))
-            desc_text.insert("1.0", payment.description)
-            desc_text.configure(state="disabled")
+            ExpandableLabel(frame, payment.description).pack(
+                fill="x", padx=10, pady=(0, 5)
+            )
 
-    def _create_modification_card(self, modification):
+    def _create_modification_card(
+        self, parent: Any, modification: Modification
+    ) -> None:
         """Создание карточки доработки"""
-        frame = ctk.CTkFrame(self.modifications_frame)
+        frame = ctk.CTkFrame(parent)
         frame.pack(fill="x", padx=5, pady=5)
 
         # Основная информация
@@ -257,7 +385,7 @@ class ProjectDetails(ctk.CTkToplevel):
         if modification.is_paid:
             ctk.CTkLabel(
                 info_frame,
-                text=f"Стоимость: {modification.cost:,.2f}",
+                text=f"Стоимость: {modification.cost:,.2f} {modification.currency}",
                 font=("Arial", 12),
             ).pack(side="left", padx=5)
 
@@ -266,10 +394,9 @@ class ProjectDetails(ctk.CTkToplevel):
         ).pack(side="right", padx=5)
 
         # Описание
-        desc_text = ctk.CTkTextbox(frame, height=60)
-        desc_text.pack(fill="x", padx=10, pady=(0, 5))
-        desc_text.insert("1.0", modification.description)
-        desc_text.configure(state="disabled")
+        ExpandableLabel(frame, modification.description).pack(
+            fill="x", padx=10, pady=(0, 5)
+        )
 
         # Даты
         dates_frame = ctk.CTkFrame(frame)
@@ -279,9 +406,115 @@ class ProjectDetails(ctk.CTkToplevel):
             dates_frame,
             text=f"Начало: {modification.start_date.strftime('%d.%m.%Y')} | "
             f"Дедлайн: {modification.deadline.strftime('%d.%m.%Y')}",
-        ).pack(anchor="w")
+        ).pack(side="left")
 
-    def _update_analytics(self):
+        # Затраченное время
+        ctk.CTkButton(
+            dates_frame,
+            text="▶ Время",
+            width=80,
+            command=lambda: self._start_timer(
+                modification.id, modification.description
+            ),
+        ).pack(side="right", padx=5)
+
+        time_label = ctk.CTkLabel(dates_frame)
+        time_label.pack(side="right", padx=5)
+        self._time_labels[modification.id] = time_label
+        self._show_time_total(modification.id, self._time_totals.get(modification.id))
+
+    def _show_time_total(
+        self, modification_id: int, totals: Optional[Tuple[float, float]]
+    ) -> None:
+        """Вывод затраченного времени доработки"""
+        minutes, amount = totals or (0.0, 0.0)
+        self._time_labels[modification_id].configure(
+            text=f"Время: {minutes / 60:.1f} ч · {amount:,.2f}" if minutes else ""
+        )
+
+    def _update_time_labels(self) -> None:
+        """Обновление затраченного времени у показанных доработок"""
+        totals = self.modification_manager.get_time_totals(list(self._time_labels))
+        for modification_id in self._time_labels:
+            self._show_time_total(modification_id, totals.get(modification_id))
+
+    def _start_timer(self, modification_id: int, title: str) -> None:
+        """Запуск таймера по доработке (предыдущий таймер останавливается)"""
+        self._stop_timer()
+        try:
+            rate = float(self.rate_entry.get().replace(",", "."))
+        except ValueError:
+            rate = self.modification_manager.get_last_rate(modification_id) or 0.0
+            self.rate_entry.delete(0, "end")
+            self.rate_entry.insert(0, f"{rate:g}")
+
+        self._timer_start = datetime.now()
+        self._timer_rate = rate
+        self._timer_title = title if len(title) <= 30 else title[:30] + "..."
+        self.timer_entry = TimeEntry(
+            modification_id=modification_id,
+            start_time=self._timer_start,
+            minutes=0.0,
+            rate=rate,
+        )
+        self.timer_stop_button.configure(state="normal")
+        self._tick()
+
+    def _tick(self) -> None:
+        """Обновление таймера; запись в базу идет через буфер отложенной записи"""
+        if self.timer_entry is None or self._timer_start is None:
+            return
+        elapsed = datetime.now() - self._timer_start
+        self.timer_entry.minutes = elapsed.total_seconds() / 60
+        self.write_buffer.stage(self.timer_entry)
+
+        seconds = int(elapsed.total_seconds())
+        amount = self.timer_entry.minutes * self._timer_rate / 60
+        self.timer_label.configure(
+            text=f"{self._timer_title}: {seconds // 3600:02d}:"
+            f"{seconds // 60 % 60:02d}:{seconds % 60:02d} · {amount:,.2f}"
+        )
+        self._tick_job = self.after(TIMER_TICK_MS, self._tick)
+
+    def _timer_target_exists(self) -> bool:
+        """Существует ли доработка запущенного таймера"""
+        if self.timer_entry is None:
+            return True
+        exists: bool = self.modification_manager.modification_exists(
+            self.timer_entry.modification_id
+        )
+        return exists
+
+    def _stop_timer(self) -> None:
+        """Остановка таймера и немедленное сохранение записи"""
+        if self.timer_entry is None or self._timer_start is None:
+            return
+        if not self._timer_target_exists():
+            # Доработку удалили: запись времени без нее не сохраняем
+            self._discard_timer()
+            return
+        self.after_cancel(self._tick_job)
+        end_time = datetime.now()
+        self.timer_entry.end_time = end_time
+        self.timer_entry.minutes = (end_time - self._timer_start).total_seconds() / 60
+        self.write_buffer.stage(self.timer_entry)
+        self.write_buffer.flush()
+        self._reset_timer()
+
+    def _discard_timer(self) -> None:
+        """Остановка таймера без сохранения записи"""
+        if self.timer_entry is None:
+            return
+        self.after_cancel(self._tick_job)
+        self.write_buffer.discard(self.timer_entry)
+        self._reset_timer()
+
+    def _reset_timer(self) -> None:
+        self.timer_entry = None
+        self.timer_label.configure(text="Таймер не запущен")
+        self.timer_stop_button.configure(state="disabled")
+
+    def _update_analytics(self) -> None:
         """Обновление графиков"""
         # Очищаем старые графики
         for widget in self.payments_plot_frame.winfo_children():
@@ -290,23 +523,78 @@ class ProjectDetails(ctk.CTkToplevel):
             widget.destroy()
 
         # График платежей
-        payments_chart = create_payments_chart(self.payments_plot_frame, self.project)
+        payments_chart = create_payments_chart(
+            self.payments_plot_frame,
+            self.project_id,
+            self.payment_manager.get_payment_series(self.project_id),
+            self.chart_renderer,
+        )
         payments_chart.pack(fill="both", expand=True)
 
         # График доработок
         modifications_chart = create_modifications_chart(
-            self.modifications_plot_frame, self.project
+            self.modifications_plot_frame,
+            self.project_id,
+            self.modification_manager.get_modification_series(self.project_id),
+            self.chart_renderer,
         )
         modifications_chart.pack(fill="both", expand=True)
 
-    def _show_payment_form(self):
+    def _render_schedules(self) -> None:
+        """Графики платежей проекта с ближайшими еще не созданными платежами"""
+        for widget in self.schedules_frame.winfo_children():
+            widget.destroy()
+
+        for schedule in self.schedule_manager.get_project_schedules(self.project_id):
+            row = ctk.CTkFrame(self.schedules_frame)
+            row.pack(fill="x", pady=2)
+
+            period = f"с {schedule.start_date:%d.%m.%Y}"
+            if schedule.end_date:
+                period += f" по {schedule.end_date:%d.%m.%Y}"
+            # Будущие даты вычисляются, а не читаются из базы
+            upcoming = [
+                f"{moment:%d.%m.%Y}"
+                for moment in itertools.islice(
+                    occurrences(
+                        schedule.start_date,
+                        schedule.cadence,
+                        schedule.end_date,
+                        schedule.materialized_until,
+                    ),
+                    UPCOMING_PAYMENTS,
+                )
+            ]
+            text = (
+                f"{CADENCES[schedule.cadence]}: {schedule.amount:,.2f} "
+                f"{schedule.currency} {period}"
+            )
+            if upcoming:
+                text += f" · далее: {', '.join(upcoming)}"
+            ctk.CTkLabel(row, text=text, anchor="w").pack(side="left", padx=5)
+
+            ctk.CTkButton(
+                row,
+                text="Удалить",
+                width=80,
+                command=lambda schedule_id=schedule.id: self._delete_schedule(
+                    schedule_id
+                ),
+            ).pack(side="right", padx=5)
+
+    def _delete_schedule(self, schedule_id: int) -> None:
+        """Удаление графика с его будущими ожидаемыми платежами"""
+        self.schedule_manager.delete_schedule(schedule_id)
+        self.event_bus.publish(ChangeEvent(self.project_id, PAYMENTS))
+
+    def _show_payment_form(self) -> None:
         """Показать форму добавления платежа"""
         from .payment_form import PaymentForm
 
-        PaymentForm(self, self.project_id, self._load_data)
+        self.form_pool.show(PaymentForm, self.project_id)
 
-    def _show_modification_form(self):
+    def _show_modification_form(self) -> None:
         """Показать форму добавления доработки"""
         from .modification_form import ModificationForm
 
-        ModificationForm(self, self.project_id, self._load_data)
+        self.form_pool.show(ModificationForm, self.project_id)
@@ -1,22 +1,37 @@
 import customtkinter as ctk
 from datetime import datetime
 from tkcalendar import DateEntry
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
+
+from src.db.models import BASE_CURRENCY, CURRENCIES
+from src.gui.forms.form_pool import FormPool
 
 
 class ProjectForm(ctk.CTkToplevel):
     def __init__(
         self,
-        parent,
+        parent: Any,
         project_id: Optional[int] = None,
-        callback: Optional[Callable] = None,
-    ):
+        callback: Optional[Callable[[], None]] = None,
+    ) -> None:
         super().__init__(parent)
 
         self.title("Проект")
         self.geometry("600x700")
 
         self.project_manager = parent.project_manager
+        self.pool: Optional[FormPool] = None
+
+        self._setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.bind_project(project_id, callback)
+
+    def bind_project(
+        self,
+        project_id: Optional[int] = None,
+        callback: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Привязка формы к проекту (или к новому проекту) и сброс полей"""
         self.project_id = project_id
         self.callback = callback
 
@@ -24,17 +39,32 @@ class ProjectForm(ctk.CTkToplevel):
         if project_id:
             self.project = self.project_manager.get_project(project_id)
 
-        self._setup_ui()
+        self.name_var.set(self.project.name if self.project else "")
+        self.cost_var.set(str(self.project.total_cost) if self.project else "0")
+        self.status_var.set(self.project.status if self.project else "active")
+        self.currency_var.set(self.project.currency if self.project else BASE_CURRENCY)
+        for textbox in (self.tech_text, self.description_text, self.contacts_text):
+            textbox.delete("1.0", "end")
+        self.start_date.set_date(datetime.now())
+        self.deadline.set_date(datetime.now())
+
         if self.project:
             self._load_project_data()
 
-    def _setup_ui(self):
+    def close(self) -> None:
+        """Закрытие формы (в пуле форма скрывается)"""
+        if self.pool and self.pool.release(self):
+            self.withdraw()
+        else:
+            self.destroy()
+
+    def _setup_ui(self) -> None:
         """Настройка интерфейса формы"""
         # Основная информация
         ctk.CTkLabel(self, text="Название проекта:").pack(
             anchor="w", padx=10, pady=(10, 0)
         )
-        self.name_var = ctk.StringVar(value=self.project.name if self.project else "")
+        self.name_var = ctk.StringVar()
         self.name_entry = ctk.CTkEntry(self, width=400, textvariable=self.name_var)
         self.name_entry.pack(anchor="w", padx=10, pady=(0, 10))
 
@@ -74,11 +104,17 @@ class ProjectForm(ctk.CTkToplevel):
         ctk.CTkLabel(self, text="Стоимость проекта:").pack(
             anchor="w", padx=10, pady=(10, 0)
         )
-        self.cost_var = ctk.StringVar(
-            value=str(self.project.total_cost) if self.project else "0"
+        cost_frame = ctk.CTkFrame(self, fg_color="transparent")
+        cost_frame.pack(anchor="w", padx=10, pady=(0, 10))
+        self.cost_var = ctk.StringVar(value="0")
+        self.cost_entry = ctk.CTkEntry(
+            cost_frame, width=200, textvariable=self.cost_var
         )
-        self.cost_entry = ctk.CTkEntry(self, width=200, textvariable=self.cost_var)
-        self.cost_entry.pack(anchor="w", padx=10, pady=(0, 10))
+        self.cost_entry.pack(side="left")
+        self.currency_var = ctk.StringVar(value=BASE_CURRENCY)
+        ctk.CTkOptionMenu(
+            cost_frame, values=CURRENCIES, variable=self.currency_var, width=80
+        ).pack(side="left", padx=5)
 
         # Технологический стек
         ctk.CTkLabel(self, text="Технологический стек:").pack(
@@ -103,9 +139,7 @@ class ProjectForm(ctk.CTkToplevel):
 
         # Статус
         ctk.CTkLabel(self, text="Статус:").pack(anchor="w", padx=10, pady=(10, 0))
-        self.status_var = ctk.StringVar(
-            value=self.project.status if self.project else "active"
-        )
+        self.status_var = ctk.StringVar(value="active")
         statuses = ["active", "completed", "overdue"]
 
         status_frame = ctk.CTkFrame(self)
@@ -127,9 +161,9 @@ class ProjectForm(ctk.CTkToplevel):
             buttons_frame, text="Сохранить", command=self._save_project, width=120
         ).pack(side="left", padx=5)
 
-        ctk.CTkButton(
-            buttons_frame, text="Отмена", command=self.destroy, width=120
-        ).pack(side="left", padx=5)
+        ctk.CTkButton(buttons_frame, text="Отмена", command=self.close, width=120).pack(
+            side="left", padx=5
+        )
 
     def _load_project_data(self):
         """Загрузка данных проекта в форму"""
@@ -152,6 +186,7 @@ class ProjectForm(ctk.CTkToplevel):
                 "start_date": datetime.strptime(self.start_date.get(), "%d.%m.%Y"),
                 "deadline": datetime.strptime(self.deadline.get(), "%d.%m.%Y"),
                 "total_cost": float(self.cost_var.get()),
+                "currency": self.currency_var.get(),
                 "tech_stack": self.tech_text.get("1.0", "end-1c"),
                 "description": self.description_text.get("1.0", "end-1c"),
                 "client_contacts": self.contacts_text.get("1.0", "end-1c"),
@@ -166,7 +201,7 @@ class ProjectForm(ctk.CTkToplevel):
             if self.callback:
                 self.callback()
 
-            self.destroy()
+            self.close()
 
         except ValueError as e:
             # Показать сообщение об ошибке
@@ -0,0 +1,157 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+import customtkinter as ctk
+
+from src.db.events import ChangeEvent
+from src.db.models import CURRENCIES
+from src.gui.components.project_card import get_balance_color
+
+
+class DashboardWindow(ctk.CTkToplevel):
+    """Сводная панель показателей по всем проектам"""
+
+    def __init__(self, parent: Any) -> None:
+        super().__init__(parent)
+
+        self.title("Сводка по проектам")
+        self.geometry("900x700")
+
+        self.rollups = parent.rollups
+        self.event_bus = parent.event_bus
+        self._rendered: Dict[str, int] = {}
+        self._refresh_scheduled = False
+
+        self._setup_ui()
+        self._refresh()
+
+        self.event_bus.subscribe(self._on_data_changed)
+
+    def destroy(self) -> None:
+        """Закрытие окна с отпиской от шины изменений"""
+        self.event_bus.unsubscribe(self._on_data_changed)
+        super().destroy()
+
+    def _setup_ui(self) -> None:
+        """Настройка интерфейса"""
+        # Итоги
+        totals_frame = ctk.CTkFrame(self)
+        totals_frame.pack(fill="x", padx=10, pady=5)
+        self.totals_label = ctk.CTkLabel(
+            totals_frame, text="", font=("Arial", 14), justify="left"
+        )
+        self.totals_label.pack(side="left", padx=10, pady=5)
+
+        # Валюта, в которую пересчитываются суммы панели
+        self.currency_var = ctk.StringVar(value=self.rollups.report_manager.currency)
+        ctk.CTkOptionMenu(
+            totals_frame,
+            values=CURRENCIES,
+            variable=self.currency_var,
+            command=self._change_currency,
+            width=80,
+        ).pack(side="right", padx=10, pady=5)
+
+        columns = ctk.CTkFrame(self)
+        columns.pack(fill="both", expand=True, padx=10, pady=5)
+        columns.grid_columnconfigure((0, 1), weight=1)
+
+        self.section_frames = {
+            "aging": self._create_section(columns, "Дебиторская задолженность", 0, 0),
+            "revenue": self._create_section(columns, "Поступления по месяцам", 0, 1),
+            "clients": self._create_section(columns, "Топ клиентов", 1, 0),
+            "technologies": self._create_section(columns, "Топ технологий", 1, 1),
+        }
+
+    def _create_section(self, master: Any, title: str, row: int, column: int) -> Any:
+        """Создание блока раздела"""
+        frame = ctk.CTkFrame(master)
+        frame.grid(row=row, column=column, sticky="nsew", padx=5, pady=5)
+        ctk.CTkLabel(frame, text=title, font=("Arial", 14, "bold")).pack(
+            anchor="w", padx=10, pady=5
+        )
+        body = ctk.CTkFrame(frame, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=10, pady=(0, 5))
+        return body
+
+    def _change_currency(self, currency: str) -> None:
+        """Пересчет панели в выбранную валюту"""
+        self.rollups.set_currency(currency)
+        self._refresh()
+
+    def _on_data_changed(self, event: ChangeEvent) -> None:
+        """Получение уведомления об изменении данных"""
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            self.after_idle(self._refresh)
+
+    def _refresh(self) -> None:
+        """Перерисовка только устаревших разделов"""
+        self._refresh_scheduled = False
+        renderers: Dict[str, Callable[[Any], None]] = {
+            "totals": self._render_totals,
+            "aging": self._render_aging,
+            "revenue": self._render_revenue,
+            "clients": self._render_clients,
+            "technologies": self._render_technologies,
+        }
+        for section, render in renderers.items():
+            version = self.rollups.versions[section]
+            if self._rendered.get(section) != version:
+                render(self.rollups.get(section))
+                self._rendered[section] = version
+
+    def _fill_rows(self, section: str, rows: List[Tuple[str, str]]) -> None:
+        """Заполнение раздела строками «название — значение»"""
+        body = self.section_frames[section]
+        for widget in body.winfo_children():
+            widget.destroy()
+        if not rows:
+            ctk.CTkLabel(body, text="Нет данных", text_color="gray").pack(anchor="w")
+        for name, value in rows:
+            row = ctk.CTkFrame(body, fg_color="transparent")
+            row.pack(fill="x")
+            ctk.CTkLabel(row, text=name, anchor="w").pack(side="left")
+            ctk.CTkLabel(row, text=value, anchor="e").pack(side="right")
+
+    def _render_totals(self, totals: Dict[str, Any]) -> None:
+        """Вывод итогов"""
+        self.totals_label.configure(
+            text=(
+                f"Проектов: {totals['projects']} "
+                f"(активных: {totals['active_projects']})\n"
+                f"Сумма договоров: {totals['total_cost']:,.2f} | "
+                f"Получено: {totals['total_paid']:,.2f} | "
+                f"К получению: {totals['outstanding']:,.2f} "
+                f"{self.currency_var.get()}"
+            ),
+            text_color=get_balance_color(-totals["outstanding"]),
+        )
+
+    def _render_aging(self, aging: List[Dict[str, Any]]) -> None:
+        """Вывод задолженности по срокам"""
+        self._fill_rows(
+            "aging",
+            [
+                (row["bucket"], f"{row['amount'] or 0:,.2f} ({row['projects']})")
+                for row in aging
+            ],
+        )
+
+    def _render_revenue(self, revenue: List[Tuple[str, float]]) -> None:
+        """Вывод поступлений по месяцам"""
+        self._fill_rows(
+            "revenue", [(month, f"{amount:,.2f}") for month, amount in revenue]
+        )
+
+    def _render_clients(self, clients: List[Tuple[str, float, int]]) -> None:
+        """Вывод топа клиентов"""
+        self._fill_rows(
+            "clients",
+            [(name, f"{paid:,.2f} ({count})") for name, paid, count in clients],
+        )
+
+    def _render_technologies(self, technologies: List[Tuple[str, int]]) -> None:
+        """Вывод топа технологий"""
+        self._fill_rows(
+            "technologies", [(name, str(count)) for name, count in technologies]
+        )
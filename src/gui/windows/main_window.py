@@ -1,25 +1,224 @@
 import customtkinter as ctk
-from typing import Optional
-from src.db.models import init_db, Project
-from src.db.crud import ProjectManager, PaymentManager, ModificationManager
+import time
+from dataclasses import replace
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from tkinter import filedialog
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from src.db.models import Project
+from src.db.crud import (
+    ProjectManager,
+    ProjectQuery,
+    PaymentManager,
+    ModificationManager,
+    ReportManager,
+    ScheduleManager,
+)
+from sqlalchemy.exc import OperationalError
+from src.db import maintenance
+from src.db.events import MODIFICATIONS, PROJECT, ChangeEvent, bind_change_events
+from src.db.rollups import DashboardRollups
+from src.db.workspaces import WorkspaceManager
+from src.db.write_behind import WriteBehindBuffer
+from src.gui.components.notification_bar import NotificationBar
+from src.gui.components.perf_hud import PerfHud
+from src.gui.components.project_card import ProjectCard
+from src.gui.forms.form_pool import FormPool
+from src.utils.cancellation import CancellationToken
+from src.utils.chart_renderer import ChartRenderer
+from src.utils.event_bus import EventBus
+from src.utils.perf import QueryStats
+from src.utils.reminders import ReminderScheduler
+from src.utils.text_utils import parse_tech_stack
+
+# Задержка поиска после последнего нажатия клавиши
+SEARCH_DEBOUNCE_MS = 300
+# Сколько скрытых карточек держать для повторного использования
+MAX_HIDDEN_CARDS = 200
+# Размер порции карточек при постепенной загрузке списка
+LOAD_CHUNK_SIZE = 20
+# Наибольший интервал ожидания напоминания (страховка от сна системы), мс
+MAX_REMINDER_WAIT_MS = 60 * 60 * 1000
+# Обслуживание базы: период проверки, нужный простой и интервал между запусками
+MAINTENANCE_CHECK_MS = 60 * 1000
+MAINTENANCE_IDLE_SECONDS = 120
+MAINTENANCE_INTERVAL_SECONDS = 6 * 60 * 60
+# Сколько свободных страниц возвращать за один шаг
+VACUUM_STEP_PAGES = 256
+# Сколько самых частых тегов предлагать в фильтре
+TAG_MENU_SIZE = 30
+# Подпись меню тегов и режимы сочетания нескольких тегов
+TAG_MENU_TITLE = "Теги ▾"
+TAG_MODES = {"Все теги": True, "Любой тег": False}
+
+# Фильтры статуса (ни одного отмеченного — все проекты)
+STATUS_FILTERS = {
+    "Активные": "active",
+    "Завершенные": "completed",
+    "Просроченные": "overdue",
+}
+# Сортировки списка и направления
+SORT_OPTIONS = {
+    "По порядку добавления": "id",
+    "По дедлайну": "deadline",
+    "По балансу": "balance",
+    "По стоимости": "total_cost",
+    "По последнему платежу": "last_payment",
+}
+SORT_DIRECTIONS = {"↑": False, "↓": True}
+# Формат дат в полях фильтра
+FILTER_DATE_FORMAT = "%d.%m.%Y"
+
+# Проект с балансом в выдаче списка и он же с текстом для поиска
+ProjectRow = Tuple[Project, Dict[str, float]]
+SearchResult = Tuple[Project, Dict[str, float], str]
+
+
+def _parse_amount(text: str) -> Optional[float]:
+    """Граница суммы из поля фильтра (пустое или неверное значение — без границы)"""
+    try:
+        return float(text.replace(" ", "").replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _parse_date(text: str) -> Optional[datetime]:
+    """Граница даты из поля фильтра (пустое или неверное значение — без границы)"""
+    try:
+        return datetime.strptime(text.strip(), FILTER_DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def _search_haystack(project: Project) -> str:
+    """Текст проекта, по которому выполняется поиск"""
+    return f"{project.name}\n{project.description or ''}".lower()
 
 
 class MainWindow(ctk.CTk):
-    def __init__(self):
+    def __init__(
+        self,
+        db_path: str = "flc.db",
+        workspaces: Optional[WorkspaceManager] = None,
+    ):
         super().__init__()
 
-        self.title("FreeLance Compass")
         self.geometry("1200x800")
 
+        self.workspaces = workspaces or WorkspaceManager()
+        self.query_stats = QueryStats()
+        self.chart_renderer = ChartRenderer()
+        self.form_pool = FormPool(self)
+
+        self.project_cards: Dict[int, ProjectCard] = {}
+        self._pending_changes: Dict[int, bool] = {}
+        self._tags_changed = False
+
+        # Состояние поиска
+        # Упорядоченное множество видимых карточек
+        self._visible_ids: Dict[int, None] = {}
+        self._search_job: Optional[str] = None
+        self._load_token = CancellationToken()
+        # (текст, фильтры без текста, строки) последнего поиска: уточняющий
+        # текст фильтрует закэшированный результат
+        self._search_cache: Optional[Tuple[str, ProjectQuery, List[SearchResult]]] = (
+            None
+        )
+
+        # Напоминания о дедлайнах
+        self._reminder_job: Optional[str] = None
+        self._pending_reminders: Set[int] = set()
+
+        self._setup_ui()
+        self._open_workspace(db_path)
+
+        # Обслуживание базы во время простоя
+        self._last_input = time.monotonic()
+        self._next_maintenance = 0.0
+        self.bind_all("<Key>", self._on_user_input, add="+")
+        self.bind_all("<Button>", self._on_user_input, add="+")
+        self.after(MAINTENANCE_CHECK_MS, self._run_idle_maintenance)
+
+        # Оверлей производительности (F12)
+        self.perf_hud = PerfHud(
+            self, self.projects_frame, self.query_stats, MAX_HIDDEN_CARDS
+        )
+        self.bind("<F12>", lambda event: self.perf_hud.toggle())
+
+    def _open_workspace(self, db_path: str) -> None:
+        """Подключение к базе рабочей области и загрузка ее данных"""
+        self.session = self.workspaces.acquire(db_path)
+        self.db_path = db_path
+        self.title(f"FreeLance Compass — {Path(db_path).stem}")
+
         # Инициализация менеджеров
-        self.session = init_db()
         self.project_manager = ProjectManager(self.session)
         self.payment_manager = PaymentManager(self.session)
         self.modification_manager = ModificationManager(self.session)
-
-        self._setup_ui()
+        self.schedule_manager = ScheduleManager(self.session)
+        # Платежи графиков, подошедшие к горизонту с прошлого запуска
+        self.schedule_manager.materialize()
+        self.engine = self.workspaces.engine(db_path)
+        self.query_stats.bind(self.engine)
+
+        # Отложенная запись частых изменений (тики таймера)
+        self.write_buffer = WriteBehindBuffer(self.session, self.after)
+
+        # Шина изменений данных
+        self.event_bus = EventBus()
+        bind_change_events(self.session, self.event_bus)
+        self.event_bus.subscribe(self._on_data_changed)
+        self.rollups = DashboardRollups(ReportManager(self.session), self.event_bus)
+
+        self._update_tag_menu()
         self._load_projects()
 
+        self.reminders = ReminderScheduler()
+        self.reminders.load(self.project_manager.get_open_deadlines(datetime.now()))
+        self._schedule_reminders()
+
+    def _switch_workspace(self, db_path: str) -> None:
+        """Переключение на другую базу без перезапуска"""
+        if self.workspaces.normalize(db_path) == self.workspaces.normalize(
+            self.db_path
+        ):
+            return
+
+        # Окна, формы и карточки держат объекты старой сессии
+        self._load_token.cancel()
+        self.form_pool.clear()
+        for window in self.winfo_children():
+            if isinstance(window, ctk.CTkToplevel):
+                window.destroy()
+        for card in self.project_cards.values():
+            card.destroy()
+        self.project_cards = {}
+        self._visible_ids = {}
+        self._pending_changes = {}
+        self._pending_reminders = set()
+        self._search_cache = None
+        self.notification_bar.clear()
+
+        old_path = self.db_path
+        self.write_buffer.flush()
+        self.session.close()
+        self._open_workspace(db_path)
+        self.workspaces.release(old_path)
+
+    def _choose_workspace(self) -> None:
+        """Выбор существующей или новой базы рабочей области"""
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Рабочая область",
+            initialdir=str(Path(self.db_path).resolve().parent),
+            defaultextension=".db",
+            filetypes=[("База FLC", "*.db"), ("Все файлы", "*.*")],
+            confirmoverwrite=False,
+        )
+        if path:
+            self._switch_workspace(path)
+
     def _setup_ui(self):
         """Настройка пользовательского интерфейса"""
         # Верхняя панель с кнопками и поиском
@@ -32,9 +231,33 @@ class MainWindow(ctk.CTk):
         )
         self.add_button.pack(side="left", padx=5)
 
+        # Сводная панель
+        self.dashboard_button = ctk.CTkButton(
+            self.top_frame, text="Сводка", command=self._open_dashboard
+        )
+        self.dashboard_button.pack(side="left", padx=5)
+
+        # Переключение рабочей области
+        self.workspace_button = ctk.CTkButton(
+            self.top_frame, text="Рабочая область…", command=self._choose_workspace
+        )
+        self.workspace_button.pack(side="left", padx=5)
+
+        # Сверка ожидающих платежей с выпиской банка
+        self.reconcile_button = ctk.CTkButton(
+            self.top_frame, text="Сверка с банком…", command=self._open_reconcile
+        )
+        self.reconcile_button.pack(side="left", padx=5)
+
+        # Шкала времени проектов
+        self.timeline_button = ctk.CTkButton(
+            self.top_frame, text="Таймлайн", command=self._open_timeline
+        )
+        self.timeline_button.pack(side="left", padx=5)
+
         # Поиск
         self.search_var = ctk.StringVar()
-        self.search_var.trace("w", self._on_search)
+        self.search_var.trace_add("write", self._on_search)
         self.search_entry = ctk.CTkEntry(
             self.top_frame,
             placeholder_text="Поиск проектов...",
@@ -43,166 +266,425 @@ class MainWindow(ctk.CTk):
         )
         self.search_entry.pack(side="right", padx=5)
 
+        self.notification_bar = NotificationBar(self, after_widget=self.top_frame)
+
         # Фильтры статуса
         self.status_frame = ctk.CTkFrame(self)
         self.status_frame.pack(fill="x", padx=10, pady=5)
 
-        statuses = ["Все", "Активные", "Завершенные", "Просроченные"]
-        self.status_var = ctk.StringVar(value="Все")
-
-        for status in statuses:
-            ctk.CTkRadioButton(
+        self.status_vars = {}
+        for label, status in STATUS_FILTERS.items():
+            self.status_vars[status] = ctk.BooleanVar(value=False)
+            ctk.CTkCheckBox(
                 self.status_frame,
-                text=status,
-                variable=self.status_var,
-                value=status,
+                text=label,
+                variable=self.status_vars[status],
                 command=self._load_projects,
             ).pack(side="left", padx=10)
 
+        # Фильтр по тегам: список через запятую и режим «все» / «любой»
+        self.tag_mode_var = ctk.StringVar(value=next(iter(TAG_MODES)))
+        ctk.CTkSegmentedButton(
+            self.status_frame,
+            values=list(TAG_MODES),
+            variable=self.tag_mode_var,
+            command=lambda value: self._load_projects(),
+        ).pack(side="right", padx=5)
+
+        self.tag_menu = ctk.CTkOptionMenu(
+            self.status_frame, values=[], command=self._add_tag_filter, width=140
+        )
+        self.tag_menu.pack(side="right", padx=5)
+
+        self.tags_var = ctk.StringVar()
+        self.tags_var.trace_add("write", self._on_search)
+        ctk.CTkEntry(
+            self.status_frame,
+            placeholder_text="Теги: django, react",
+            textvariable=self.tags_var,
+            width=200,
+        ).pack(side="right", padx=5)
+
+        # Сортировка и фильтры по датам и балансу (выполняются в SQL)
+        self.sort_frame = ctk.CTkFrame(self)
+        self.sort_frame.pack(fill="x", padx=10, pady=5)
+
+        self.sort_var = ctk.StringVar(value=next(iter(SORT_OPTIONS)))
+        ctk.CTkOptionMenu(
+            self.sort_frame,
+            values=list(SORT_OPTIONS),
+            variable=self.sort_var,
+            command=lambda value: self._load_projects(),
+            width=200,
+        ).pack(side="left", padx=5)
+
+        self.sort_direction_var = ctk.StringVar(value=next(iter(SORT_DIRECTIONS)))
+        ctk.CTkSegmentedButton(
+            self.sort_frame,
+            values=list(SORT_DIRECTIONS),
+            variable=self.sort_direction_var,
+            command=lambda value: self._load_projects(),
+        ).pack(side="left", padx=5)
+
+        self.range_vars = {}
+        for key, placeholder in [
+            ("deadline_after", "Дедлайн с (дд.мм.гггг)"),
+            ("deadline_before", "Дедлайн по"),
+            ("min_balance", "Баланс от"),
+            ("max_balance", "Баланс до"),
+        ]:
+            self.range_vars[key] = ctk.StringVar()
+            self.range_vars[key].trace_add("write", self._on_search)
+            ctk.CTkEntry(
+                self.sort_frame,
+                placeholder_text=placeholder,
+                textvariable=self.range_vars[key],
+                width=150,
+            ).pack(side="right", padx=5)
+
         # Список проектов
         self.projects_frame = ctk.CTkScrollableFrame(self)
         self.projects_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-    def _load_projects(self):
-        """Загрузка списка проектов"""
-        # Очистка списка
-        for widget in self.projects_frame.winfo_children():
-            widget.destroy()
+    def _get_filters(self) -> ProjectQuery:
+        """Текущие фильтры и сортировка списка"""
+        ranges = {key: var.get().strip() for key, var in self.range_vars.items()}
+        return ProjectQuery(
+            statuses=tuple(
+                status for status, var in self.status_vars.items() if var.get()
+            ),
+            tags=tuple(parse_tech_stack(self.tags_var.get())),
+            match_all=TAG_MODES[self.tag_mode_var.get()],
+            deadline_after=_parse_date(ranges["deadline_after"]),
+            deadline_before=_parse_date(ranges["deadline_before"]),
+            min_balance=_parse_amount(ranges["min_balance"]),
+            max_balance=_parse_amount(ranges["max_balance"]),
+            sort=SORT_OPTIONS[self.sort_var.get()],
+            descending=SORT_DIRECTIONS[self.sort_direction_var.get()],
+        )
 
-        # Получение проектов
-        status_filter = self.status_var.get()
-        if status_filter == "Все":
-            projects = self.project_manager.get_all_projects()
-        else:
-            status_map = {
-                "Активные": "active",
-                "Завершенные": "completed",
-                "Просроченные": "overdue",
-            }
-            projects = self.project_manager.get_all_projects(status_map[status_filter])
-
-        # Отображение проектов
-        for project in projects:
-            self._create_project_card(project)
-
-    def _create_project_card(self, project: Project):
+    def _update_tag_menu(self) -> None:
+        """Заполнение меню самыми частыми тегами (один групповой запрос)"""
+        tags = self.project_manager.get_tag_counts(TAG_MENU_SIZE)
+        self.tag_menu.configure(values=[f"{name} ({count})" for name, count in tags])
+        self.tag_menu.set(TAG_MENU_TITLE)
+
+    def _add_tag_filter(self, choice: str) -> None:
+        """Добавление выбранного в меню тега к фильтру"""
+        name = choice.rsplit(" (", 1)[0]
+        tags = parse_tech_stack(self.tags_var.get())
+        if name not in tags:
+            self.tags_var.set(", ".join(tags + [name]))
+        self.tag_menu.set(TAG_MENU_TITLE)
+
+    def _load_projects(self) -> None:
+        """Загрузка списка проектов с учетом фильтра и поиска"""
+        self._search_cache = None
+        self._run_search()
+
+    def _create_project_card(
+        self, project: Project, balance: Dict[str, float]
+    ) -> ProjectCard:
         """Создание карточки проекта"""
-        frame = ctk.CTkFrame(self.projects_frame)
-        frame.pack(fill="x", padx=5, pady=5)
-
-        # Основная информация
-        header_frame = ctk.CTkFrame(frame)
-        header_frame.pack(fill="x", padx=10, pady=5)
-
-        ctk.CTkLabel(header_frame, text=project.name, font=("Arial", 16, "bold")).pack(
-            side="left"
+        card = ProjectCard(
+            self.projects_frame,
+            project,
+            balance,
+            on_open=self._open_project_details,
+            on_payment=self._show_payment_form,
+            on_modification=self._show_modification_form,
         )
-
-        status_label = ctk.CTkLabel(
-            header_frame,
-            text=project.status.capitalize(),
-            font=("Arial", 12),
-            text_color=self._get_status_color(project.status),
+        self.project_cards[project.id] = card
+        return card
+
+    def _remove_project_card(self, project_id: int) -> None:
+        """Удаление карточки проекта"""
+        card = self.project_cards.pop(project_id, None)
+        self._visible_ids.pop(project_id, None)
+        if card:
+            card.destroy()
+
+    def _hide_project_card(self, project_id: int) -> None:
+        """Скрытие карточки с сохранением для повторного использования"""
+        if project_id in self._visible_ids:
+            del self._visible_ids[project_id]
+            self.project_cards[project_id].pack_forget()
+
+    def _show_chunk(self, chunk: List[ProjectRow]) -> None:
+        """Показ порции проектов с повторным использованием карточек"""
+        for project, balance in chunk:
+            if project.id in self._visible_ids:
+                continue
+            card = self.project_cards.get(project.id)
+            if card is None:
+                card = self._create_project_card(project, balance)
+            card.pack(fill="x", padx=5, pady=5)
+            self._visible_ids[project.id] = None
+
+    def _prune_hidden_cards(self) -> None:
+        """Ограничение числа скрытых карточек в запасе"""
+        hidden_ids = [i for i in self.project_cards if i not in self._visible_ids]
+        for project_id in hidden_ids[: max(0, len(hidden_ids) - MAX_HIDDEN_CARDS)]:
+            self.project_cards.pop(project_id).destroy()
+
+    def _render_progressively(
+        self,
+        chunks: Iterator[List[ProjectRow]],
+        token: CancellationToken,
+        on_done: Callable[[], None],
+    ) -> None:
+        """Вывод списка порциями: первая сразу, остальные в свободное время"""
+        for project_id in self._visible_ids:
+            self.project_cards[project_id].pack_forget()
+        self._visible_ids = {}
+
+        def render_next() -> None:
+            if token.cancelled:
+                return
+            chunk = next(chunks, None)
+            if chunk is None:
+                self._prune_hidden_cards()
+                on_done()
+                return
+            self._show_chunk(chunk)
+            self.after_idle(render_next)
+
+        render_next()
+
+    def _matches_filters(self, project: Project) -> bool:
+        """Проверка соответствия проекта фильтрам и поиску (запрос по id)"""
+        search_text = self.search_var.get().strip().lower()
+        return self.project_manager.matches_query(
+            replace(self._get_filters(), text=search_text), project.id
         )
-        status_label.pack(side="right")
 
-        # Информация о проекте
-        info_frame = ctk.CTkFrame(frame)
-        info_frame.pack(fill="x", padx=10, pady=5)
-
-        # Даты
-        dates_label = ctk.CTkLabel(
-            info_frame,
-            text=f"Начало: {project.start_date.strftime('%d.%m.%Y')} | "
-            f"Дедлайн: {project.deadline.strftime('%d.%m.%Y')}",
-        )
-        dates_label.pack(side="left", padx=5)
-
-        # Финансы
-        balance = project.calculate_balance()
-        finance_label = ctk.CTkLabel(
-            info_frame,
-            text=f"Стоимость: {project.total_cost:,.2f} | "
-            f"Оплачено: {balance['total_paid']:,.2f} | "
-            f"Баланс: {balance['balance']:,.2f}",
-            text_color=self._get_balance_color(balance["balance"]),
+    def _on_data_changed(self, event: ChangeEvent) -> None:
+        """Получение уведомления об изменении данных"""
+        if not self._pending_changes:
+            self.after_idle(self._apply_changes)
+        self._pending_changes[event.project_id] = (
+            self._pending_changes.get(event.project_id, False) or event.deleted
         )
-        finance_label.pack(side="right", padx=5)
-
-        # Кнопки управления
-        buttons_frame = ctk.CTkFrame(frame)
-        buttons_frame.pack(fill="x", padx=10, pady=5)
-
-        ctk.CTkButton(
-            buttons_frame,
-            text="Открыть",
-            command=lambda: self._open_project_details(project.id),
-            width=100,
-        ).pack(side="left", padx=5)
-
-        ctk.CTkButton(
-            buttons_frame,
-            text="Платеж",
-            command=lambda: self._show_payment_form(project.id),
-            width=100,
-        ).pack(side="left", padx=5)
-
-        ctk.CTkButton(
-            buttons_frame,
-            text="Доработка",
-            command=lambda: self._show_modification_form(project.id),
-            width=100,
-        ).pack(side="left", padx=5)
-
-    def _get_status_color(self, status: str) -> str:
-        """Получение цвета для статуса"""
-        colors = {"active": "green", "completed": "gray", "overdue": "red"}
-        return colors.get(status, "white")
-
-    def _get_balance_color(self, balance: float) -> str:
-        """Получение цвета для баланса"""
-        if balance > 0:
-            return "green"
-        elif balance < 0:
-            return "red"
-        return "white"
+        if event.topic in (PROJECT, MODIFICATIONS):
+            self._pending_reminders.add(event.project_id)
+        if event.topic == PROJECT:
+            self._tags_changed = True
+
+    def _apply_changes(self) -> None:
+        """Точечное обновление карточек измененных проектов"""
+        changes, self._pending_changes = self._pending_changes, {}
+        # Кэш результатов поиска мог устареть
+        self._search_cache = None
+        self._update_reminders(changes)
+        if self._tags_changed:
+            self._tags_changed = False
+            self._update_tag_menu()
+
+        # В отсортированном списке проект может сменить место: карточки
+        # обновляются, а порядок берется из нового запроса
+        sorted_list = self._get_filters().sort != "id"
+        for project_id, deleted in changes.items():
+            project = None if deleted else self.project_manager.get_project(project_id)
+            if project is None:
+                self._remove_project_card(project_id)
+                continue
+
+            balance = self.project_manager.get_project_balance(project_id)
+            card = self.project_cards.get(project_id)
+            if card:
+                card.update_project(project, balance)
+
+            if sorted_list:
+                continue
+            if not self._matches_filters(project):
+                self._hide_project_card(project_id)
+            elif project_id not in self._visible_ids:
+                if card is None:
+                    card = self._create_project_card(project, balance)
+                card.pack(fill="x", padx=5, pady=5)
+                self._visible_ids[project_id] = None
+        if sorted_list:
+            self._run_search()
+
+    def _update_reminders(self, changes: Dict[int, bool]) -> None:
+        """Обновление очереди напоминаний по измененным проектам"""
+        project_ids, self._pending_reminders = self._pending_reminders, set()
+        if not project_ids:
+            return
+        now = datetime.now()
+        for project_id in project_ids:
+            rows = (
+                []
+                if changes.get(project_id)
+                else self.project_manager.get_open_deadlines(now, project_id)
+            )
+            self.reminders.update_project(project_id, rows)
+        self._schedule_reminders()
+
+    def _schedule_reminders(self) -> None:
+        """Ожидание ближайшего напоминания без периодического опроса"""
+        if self._reminder_job is not None:
+            self.after_cancel(self._reminder_job)
+            self._reminder_job = None
+        wait = self.reminders.seconds_until_next()
+        if wait is not None:
+            delay = min(int(wait * 1000), MAX_REMINDER_WAIT_MS)
+            self._reminder_job = self.after(delay, self._fire_reminders)
+
+    def _fire_reminders(self) -> None:
+        """Показ наступивших напоминаний"""
+        self._reminder_job = None
+        for reminder in self.reminders.pop_due():
+            self.notification_bar.add(
+                reminder.message,
+                partial(self._open_project_details, reminder.project_id),
+            )
+        self._schedule_reminders()
+
+    def _on_user_input(self, event: Any = None) -> None:
+        """Отметка активности пользователя"""
+        self._last_input = time.monotonic()
+
+    def _is_idle(self) -> bool:
+        return time.monotonic() - self._last_input >= MAINTENANCE_IDLE_SECONDS
+
+    def _run_idle_maintenance(self) -> None:
+        """Обновление статистики планировщика, когда пользователь не работает"""
+        if not self._is_idle() or time.monotonic() < self._next_maintenance:
+            self.after(MAINTENANCE_CHECK_MS, self._run_idle_maintenance)
+            return
+        try:
+            maintenance.optimize(self.engine)
+        except OperationalError:
+            # База занята, попробуем при следующей проверке
+            self.after(MAINTENANCE_CHECK_MS, self._run_idle_maintenance)
+            return
+        self._next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL_SECONDS
+        self._vacuum_step()
+
+    def _vacuum_step(self) -> None:
+        """Возврат свободных страниц небольшими порциями между событиями"""
+        remaining = 0
+        if self._is_idle():
+            try:
+                remaining = maintenance.incremental_vacuum(
+                    self.engine, VACUUM_STEP_PAGES
+                )
+            except OperationalError:
+                remaining = 0
+        if remaining:
+            self.after_idle(self._vacuum_step)
+        else:
+            self.after(MAINTENANCE_CHECK_MS, self._run_idle_maintenance)
 
     def _on_search(self, *args):
-        """Обработка поиска"""
-        search_text = self.search_var.get().lower()
-        for child in self.projects_frame.winfo_children():
-            child.pack_forget()
-
-        for project in self.project_manager.get_all_projects():
-            if (
-                search_text in project.name.lower()
-                or search_text in project.description.lower()
-            ):
-                self._create_project_card(project)
+        """Обработка ввода в поле поиска с задержкой"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self) -> None:
+        """Выполнение поиска с учетом фильтров статуса и тегов"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+
+        # Незавершенная выдача предыдущего запроса больше не нужна
+        self._load_token.cancel()
+        token = self._load_token = CancellationToken()
+
+        search_text = self.search_var.get().strip().lower()
+        filters = self._get_filters()
+
+        cache = self._search_cache
+        if (
+            cache is not None
+            and cache[1] == filters
+            and search_text.startswith(cache[0])
+        ):
+            # Запрос уточнен: сужаем предыдущий результат без обращения к БД
+            results = [item for item in cache[2] if search_text in item[2]]
+            chunks: Iterator[List[ProjectRow]] = iter(
+                [
+                    [
+                        (project, balance)
+                        for project, balance, _ in results[i : i + LOAD_CHUNK_SIZE]
+                    ]
+                    for i in range(0, len(results), LOAD_CHUNK_SIZE)
+                ]
+            )
+        else:
+            results = []
+            chunks = self._collect_results(
+                self.project_manager.query_projects(
+                    replace(filters, text=search_text), LOAD_CHUNK_SIZE
+                ),
+                results,
+            )
+
+        def on_done() -> None:
+            self._search_cache = (search_text, filters, results)
+
+        self._render_progressively(chunks, token, on_done)
+
+    def _collect_results(
+        self, chunks: Iterator[List[ProjectRow]], results: List[SearchResult]
+    ) -> Iterator[List[ProjectRow]]:
+        """Накопление результатов поиска для последующего сужения"""
+        for chunk in chunks:
+            results.extend(
+                (project, balance, _search_haystack(project))
+                for project, balance in chunk
+            )
+            yield chunk
 
     def _show_project_form(self, project_id: Optional[int] = None):
         """Показать форму создания/редактирования проекта"""
         from src.gui.forms.project_form import ProjectForm
 
-        ProjectForm(self, project_id, self._load_projects)
+        self.form_pool.show(ProjectForm, project_id)
 
     def _show_payment_form(self, project_id: int):
         """Показать форму добавления платежа"""
         from src.gui.forms.payment_form import PaymentForm
 
-        PaymentForm(self, project_id, self._load_projects)
+        self.form_pool.show(PaymentForm, project_id)
 
     def _show_modification_form(self, project_id: int):
         """Показать форму добавления доработки"""
         from src.gui.forms.modification_form import ModificationForm
 
-        ModificationForm(self, project_id, self._load_projects)
+        self.form_pool.show(ModificationForm, project_id)
+
+    def _open_dashboard(self) -> None:
+        """Открыть сводную панель показателей"""
+        from src.gui.windows.dashboard_window import DashboardWindow
+
+        DashboardWindow(self)
+
+    def _open_timeline(self) -> None:
+        """Открыть шкалу времени проектов"""
+        from src.gui.windows.timeline_window import TimelineWindow
+
+        TimelineWindow(self)
+
+    def _open_reconcile(self) -> None:
+        """Выбор выписки банка и открытие окна сверки"""
+        from src.gui.windows.reconcile_window import ReconcileWindow
+
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Выписка банка",
+            filetypes=[("CSV", "*.csv"), ("Все файлы", "*.*")],
+        )
+        if path:
+            ReconcileWindow(self, path)
 
     def _open_project_details(self, project_id: int):
         """Открыть детальную информацию о проекте"""
         from src.gui.forms.project_details import ProjectDetails
 
-        ProjectDetails(self, project_id, self._load_projects)
+        ProjectDetails(self, project_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import customtkinter as ctk
+
+from src.db.reconcile import (
+    BankTransaction,
+    PendingPayment,
+    apply_matches,
+    load_pending,
+    read_statement,
+    reconcile,
+)
+from src.gui.components.paged_list import PagedList
+
+# Вариант «не сопоставлять» для спорных строк
+SKIP_CHOICE = "Пропустить"
+# (номер спорной строки, (строка выписки, подходящие платежи))
+ReviewItem = Tuple[int, Tuple[BankTransaction, List[PendingPayment]]]
+
+
+class ReconcileWindow(ctk.CTkToplevel):
+    """Сверка выписки банка: однозначные пары и проверка спорных строк"""
+
+    def __init__(
+        self, parent: Any, csv_path: str, delimiter: Optional[str] = None
+    ) -> None:
+        super().__init__(parent)
+
+        self.title("Сверка с выпиской")
+        self.geometry("900x700")
+
+        self.session = parent.session
+        self.event_bus = parent.event_bus
+        self.result = reconcile(
+            read_statement(csv_path, delimiter), load_pending(self.session)
+        )
+        # Выбор пользователя: номер спорной строки -> платеж
+        self._choices: Dict[int, PendingPayment] = {}
+        # Показанные списки выбора: номер строки -> (список, варианты)
+        self._menus: Dict[int, Tuple[ctk.CTkOptionMenu, Dict[str, PendingPayment]]] = {}
+
+        self._setup_ui()
+
+    def _setup_ui(self) -> None:
+        """Настройка интерфейса"""
+        header = ctk.CTkFrame(self)
+        header.pack(fill="x", padx=10, pady=5)
+        self.summary_label = ctk.CTkLabel(header, text="", justify="left")
+        self.summary_label.pack(side="left", padx=10, pady=5)
+        self._update_summary()
+
+        ctk.CTkButton(header, text="Применить", command=self._apply).pack(
+            side="right", padx=5, pady=5
+        )
+
+        ctk.CTkLabel(self, text="Спорные поступления", font=("Arial", 14, "bold")).pack(
+            anchor="w", padx=10
+        )
+        self.review_list = PagedList(
+            self,
+            fetch_page=self._fetch_ambiguous,
+            render_item=self._create_review_row,
+            empty_text="Спорных поступлений нет",
+        )
+        self.review_list.pack(fill="both", expand=True, padx=10, pady=5)
+        self.review_list.reload()
+
+    def _update_summary(self) -> None:
+        """Вывод итогов сверки"""
+        self.summary_label.configure(
+            text=(
+                f"Однозначно сопоставлено: {len(self.result.matched)}\n"
+                f"На проверку: {len(self.result.ambiguous)} "
+                f"(выбрано: {len(self._choices)})\n"
+                f"Без пары: {len(self.result.unmatched)}"
+            )
+        )
+
+    def _fetch_ambiguous(self, offset: int, limit: int) -> List[ReviewItem]:
+        """Страница спорных строк вместе с их номерами"""
+        page = self.result.ambiguous[offset : offset + limit]
+        return list(enumerate(page, offset))
+
+    def _create_review_row(self, master: Any, item: ReviewItem) -> None:
+        """Строка выписки с выбором платежа"""
+        index, (transaction, candidates) = item
+        row = ctk.CTkFrame(master)
+        row.pack(fill="x", pady=2)
+
+        ctk.CTkLabel(
+            row,
+            text=(
+                f"Строка {transaction.line}: {transaction.date:%d.%m.%Y}, "
+                f"{transaction.amount:,.2f} {transaction.currency}\n"
+                f"{transaction.description}"
+            ),
+            justify="left",
+            anchor="w",
+        ).pack(side="left", fill="x", expand=True, padx=5)
+
+        # Одинаковые платежи различаются номером варианта
+        options = {
+            f"{number}. {candidate.title}": candidate
+            for number, candidate in enumerate(candidates, 1)
+        }
+        selected = self._choices.get(index)
+        current = next(
+            (title for title, value in options.items() if value == selected),
+            SKIP_CHOICE,
+        )
+        menu = ctk.CTkOptionMenu(
+            row,
+            values=self._available(index, options),
+            variable=ctk.StringVar(value=current),
+            command=lambda choice: self._choose(index, options.get(choice)),
+            width=420,
+        )
+        menu.pack(side="right", padx=5)
+        self._menus[index] = (menu, options)
+
+    def _available(self, index: int, options: Dict[str, PendingPayment]) -> List[str]:
+        """Варианты строки без платежей, выбранных для других строк"""
+        taken = [payment for other, payment in self._choices.items() if other != index]
+        return [
+            SKIP_CHOICE,
+            *(title for title, payment in options.items() if payment not in taken),
+        ]
+
+    def _choose(self, index: int, candidate: Optional[PendingPayment]) -> None:
+        """Запоминание выбора для спорной строки
+
+        Один платеж можно выбрать только для одной строки выписки, поэтому
+        из списков остальных строк он убирается.
+        """
+        if candidate is None:
+            self._choices.pop(index, None)
+        else:
+            self._choices[index] = candidate
+        for other, (menu, options) in self._menus.items():
+            if other != index and menu.winfo_exists():
+                menu.configure(values=self._available(other, options))
+        self._update_summary()
+
+    def _apply(self) -> None:
+        """Отметка однозначных и выбранных платежей выполненными"""
+        chosen = [
+            (self.result.ambiguous[index][0], candidate)
+            for index, candidate in self._choices.items()
+        ]
+        changes = apply_matches(self.session, self.result.matched + chosen)
+        for change in changes:
+            self.event_bus.publish(change)
+        self.destroy()
@@ -0,0 +1,50 @@
+from typing import Any
+
+import customtkinter as ctk
+
+from src.db.events import ChangeEvent
+from src.gui.components.timeline import TimelineView
+
+
+class TimelineWindow(ctk.CTkToplevel):
+    """Шкала времени проектов и доработок (диаграмма Ганта)"""
+
+    def __init__(self, parent: Any) -> None:
+        super().__init__(parent)
+
+        self.title("Таймлайн")
+        self.geometry("1100x700")
+
+        self.event_bus = parent.event_bus
+        self._refresh_scheduled = False
+
+        ctk.CTkLabel(
+            self,
+            text="Перетаскивание — прокрутка, колесо мыши — масштаб, "
+            "двойной щелчок — карточка проекта",
+            anchor="w",
+        ).pack(fill="x", padx=10, pady=(5, 0))
+        self.view = TimelineView(
+            self,
+            fetch_spans=parent.project_manager.get_timeline_spans,
+            on_open=parent._open_project_details,
+        )
+        self.view.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.event_bus.subscribe(self._on_data_changed)
+
+    def destroy(self) -> None:
+        """Закрытие окна с отпиской от шины изменений"""
+        self.event_bus.unsubscribe(self._on_data_changed)
+        super().destroy()
+
+    def _on_data_changed(self, event: ChangeEvent) -> None:
+        """Получение уведомления об изменении данных"""
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            self.after_idle(self._reload)
+
+    def _reload(self) -> None:
+        """Повторная загрузка отрезков"""
+        self._refresh_scheduled = False
+        self.view.reload()
@@ -0,0 +1,139 @@
+"""Векторная аналитика по колоночному снимку (без обращения к SQLite)
+
+Функции принимают открытый Snapshot и работают с массивами столбцов;
+суммы пересчитываются в валюту отчета по курсам из того же снимка.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.db.models import BASE_CURRENCY
+from src.db.snapshot import Snapshot
+
+
+def _completed_payments(
+    snapshot: Snapshot, currency: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Проекты, даты и суммы (в валюте отчета) выполненных платежей"""
+    payments = snapshot["payments"]
+    done = np.asarray(payments["status"]) == "completed"
+    dates = payments["payment_date"][done]
+    amounts = snapshot.rate_table.convert(
+        payments["amount"][done], payments["currency"][done], dates, currency
+    )
+    return payments["project_id"][done], dates, amounts
+
+
+def _modification_payments(
+    snapshot: Snapshot, currency: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Даты и суммы выполненных оплат доработок в валюте отчета
+
+    Валюта оплаты — валюта доработки (соединение по отсортированным id).
+    """
+    payments = snapshot["modification_payments"]
+    modifications = snapshot["modifications"]
+    done = np.asarray(payments["status"]) == "completed"
+    modification_ids = payments["modification_id"][done]
+
+    currencies = np.full(len(modification_ids), BASE_CURRENCY, dtype="U3")
+    known_ids = modifications["id"]
+    if len(known_ids):
+        position = np.minimum(
+            np.searchsorted(known_ids, modification_ids), len(known_ids) - 1
+        )
+        matched = known_ids[position] == modification_ids
+        currencies[matched] = modifications["currency"][position[matched]]
+
+    dates = payments["payment_date"][done]
+    return dates, snapshot.rate_table.convert(
+        payments["amount"][done], currencies, dates, currency
+    )
+
+
+def _group_sum(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Суммы значений по уникальным ключам"""
+    unique, index = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(index, weights=values, minlength=len(unique))
+
+
+def monthly_revenue(
+    snapshot: Snapshot, currency: str = BASE_CURRENCY
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Поступления по месяцам: массивы месяцев и сумм"""
+    _, dates, amounts = _completed_payments(snapshot, currency)
+    return _group_sum(dates.astype("datetime64[M]"), amounts)
+
+
+def revenue_trend(totals: np.ndarray, window: int = 3) -> np.ndarray:
+    """Скользящее среднее помесячных поступлений"""
+    if len(totals) < window:
+        return np.asarray(totals, dtype=np.float64)
+    kernel = np.ones(window) / window
+    return np.convolve(totals, kernel, mode="valid")
+
+
+def top_projects(
+    snapshot: Snapshot, limit: int = 10, currency: str = BASE_CURRENCY
+) -> List[Tuple[int, float]]:
+    """Проекты с наибольшими поступлениями"""
+    project_ids, _, amounts = _completed_payments(snapshot, currency)
+    projects, totals = _group_sum(project_ids, amounts)
+    order = np.argsort(totals)[::-1][:limit]
+    return list(zip(projects[order].tolist(), totals[order].tolist()))
+
+
+def yearly_summary(
+    snapshot: Snapshot, currency: str = BASE_CURRENCY
+) -> Dict[int, Dict[str, float]]:
+    """Итоги по годам: поступления, платежи, доработки и их оплаты"""
+    _, dates, amounts = _completed_payments(snapshot, currency)
+    years, revenue = _group_sum(dates.astype("datetime64[Y]"), amounts)
+    _, counts = _group_sum(dates.astype("datetime64[Y]"), np.ones(len(dates)))
+
+    modifications = snapshot["modifications"]
+    paid = np.asarray(modifications["is_paid"])
+    mod_dates = modifications["start_date"][paid]
+    mod_costs = snapshot.rate_table.convert(
+        modifications["cost"][paid],
+        modifications["currency"][paid],
+        mod_dates,
+        currency,
+    )
+    mod_years, mod_totals = _group_sum(mod_dates.astype("datetime64[Y]"), mod_costs)
+    _, mod_counts = _group_sum(
+        mod_dates.astype("datetime64[Y]"), np.ones(len(mod_dates))
+    )
+
+    extra_dates, extra_amounts = _modification_payments(snapshot, currency)
+    extra_years, extra_totals = _group_sum(
+        extra_dates.astype("datetime64[Y]"), extra_amounts
+    )
+
+    summary: Dict[int, Dict[str, float]] = {}
+
+    def row(year: np.datetime64) -> Dict[str, float]:
+        return summary.setdefault(
+            int(str(year)),
+            dict.fromkeys(
+                [
+                    "revenue",
+                    "payments",
+                    "average_payment",
+                    "modifications",
+                    "modifications_cost",
+                    "modification_payments",
+                ],
+                0.0,
+            ),
+        )
+
+    for year, total, count in zip(years, revenue, counts):
+        values = row(year)
+        values.update(revenue=total, payments=count, average_payment=total / count)
+    for year, total, count in zip(mod_years, mod_totals, mod_counts):
+        row(year).update(modifications=count, modifications_cost=total)
+    for year, total in zip(extra_years, extra_totals):
+        row(year)["modification_payments"] = total
+    return dict(sorted(summary.items()))
@@ -0,0 +1,9 @@
+class CancellationToken:
+    """Признак отмены долгой операции, выполняемой по частям"""
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Отмена операции"""
+        self.cancelled = True
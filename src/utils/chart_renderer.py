@@ -0,0 +1,157 @@
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from src.utils.downsampling import label_indices, lttb
+
+# Сколько готовых изображений держать в памяти
+CACHE_SIZE = 64
+# Разрешение изображения (пиксели = дюймы * DPI)
+DPI = 100
+
+CacheKey = Tuple[Hashable, ...]
+
+
+def data_version(*arrays: np.ndarray) -> str:
+    """Хэш данных графика, меняющийся при любом изменении ряда"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        if array.dtype == object:
+            digest.update("\x00".join(map(str, array.tolist())).encode())
+        else:
+            digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _new_figure(width: int, height: int) -> Tuple[Any, Any]:
+    """Создание фигуры Agg без использования pyplot"""
+    # matplotlib импортируется в фоновом потоке, чтобы не замедлять запуск
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(width / DPI, height / DPI), dpi=DPI)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.tick_params(labelsize=7)
+    axes.grid(True, alpha=0.3)
+    return figure, axes
+
+
+def _to_png(figure: Any) -> bytes:
+    """Сохранение фигуры в PNG"""
+    figure.tight_layout()
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png", dpi=DPI)
+    return buffer.getvalue()
+
+
+def render_payments_png(
+    dates: np.ndarray, amounts: np.ndarray, width: int, height: int
+) -> bytes:
+    """Отрисовка графика накопленных платежей в PNG"""
+    figure, axes = _new_figure(width, height)
+    cumulative = np.cumsum(amounts)
+    days = dates.astype("datetime64[s]").astype(np.int64).astype(np.float64)
+
+    keep = lttb(days, cumulative, width)
+    x, y = dates[keep].astype("datetime64[s]").astype(object), cumulative[keep]
+    axes.plot(x, y, color="tab:blue", marker="o" if len(keep) <= 50 else None)
+
+    for i in label_indices(len(keep)):
+        axes.annotate(
+            f"{y[i]:,.0f}",
+            (x[i], y[i]),
+            textcoords="offset points",
+            xytext=(0, 5),
+            ha="center",
+            fontsize=7,
+        )
+    figure.autofmt_xdate()
+    return _to_png(figure)
+
+
+def render_modifications_png(
+    dates: np.ndarray,
+    costs: np.ndarray,
+    descriptions: np.ndarray,
+    width: int,
+    height: int,
+) -> bytes:
+    """Отрисовка графика доработок в PNG"""
+    figure, axes = _new_figure(width, height)
+    cumulative = np.cumsum(costs)
+    days = dates.astype("datetime64[s]").astype(np.int64).astype(np.float64)
+    x = dates.astype("datetime64[s]").astype(object)
+
+    axes.bar(x, costs, color="lightblue", edgecolor="tab:blue", width=1.0)
+    keep = lttb(days, cumulative, width)
+    axes.plot(x[keep], cumulative[keep], color="tab:red")
+
+    for i in label_indices(len(x)):
+        description = descriptions[i]
+        if len(description) > 20:
+            description = description[:20] + "..."
+        axes.annotate(
+            description,
+            (x[i], costs[i]),
+            textcoords="offset points",
+            xytext=(0, 5),
+            ha="center",
+            fontsize=6,
+            rotation=30,
+        )
+    figure.autofmt_xdate()
+    return _to_png(figure)
+
+
+class ChartRenderer:
+    """Построение графиков в фоновом потоке с кэшем готовых PNG"""
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._in_flight: "Dict[CacheKey, Future[bytes]]" = {}
+        self._lock = RLock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="chart-renderer"
+        )
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        """Готовое изображение из кэша"""
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+            return png
+
+    def submit(
+        self, key: CacheKey, render: Callable[..., bytes], *args: Any
+    ) -> "Future[bytes]":
+        """Постановка отрисовки в очередь (повторные запросы объединяются)"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(render, *args)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda f: self._store(key, f))
+            return future
+
+    def _store(self, key: CacheKey, future: "Future[bytes]") -> None:
+        """Сохранение результата отрисовки в кэш"""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._cache[key] = future.result()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def shutdown(self) -> None:
+        """Остановка фонового потока"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
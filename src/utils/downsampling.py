@@ -0,0 +1,42 @@
+import numpy as np
+
+# Максимальное число подписей значений на графике
+MAX_LABELS = 10
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Индексы точек, отобранных алгоритмом Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    # Внутренние точки делятся на threshold - 2 корзины
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_start = min(end, n - 1)
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Точка корзины, образующая наибольший треугольник
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(area.argmax())
+        indices[i + 1] = selected
+
+    return indices
+
+
+def label_indices(count: int, max_labels: int = MAX_LABELS) -> np.ndarray:
+    """Равномерно распределенные индексы подписываемых точек"""
+    if count <= max_labels:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, max_labels).round().astype(np.int64))
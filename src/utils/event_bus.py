@@ -0,0 +1,29 @@
+from threading import Lock
+from typing import Any, Callable, List
+
+
+class EventBus:
+    """Внутрипроцессная шина событий (издатель/подписчик)"""
+
+    def __init__(self) -> None:
+        self._handlers: List[Callable[[Any], None]] = []
+        self._lock = Lock()
+
+    def subscribe(self, handler: Callable[[Any], None]) -> None:
+        """Подписка обработчика на события"""
+        with self._lock:
+            if handler not in self._handlers:
+                self._handlers.append(handler)
+
+    def unsubscribe(self, handler: Callable[[Any], None]) -> None:
+        """Отписка обработчика"""
+        with self._lock:
+            if handler in self._handlers:
+                self._handlers.remove(handler)
+
+    def publish(self, event: Any) -> None:
+        """Рассылка события всем подписчикам"""
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            handler(event)
@@ -0,0 +1,57 @@
+import time
+from threading import Lock
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+
+class QueryStats:
+    """Счетчик SQL-запросов и времени их выполнения"""
+
+    def __init__(self, engine: Optional[Engine] = None) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = Lock()
+        self.engine: Optional[Engine] = None
+        if engine is not None:
+            self.bind(engine)
+
+    def bind(self, engine: Engine) -> None:
+        """Переключение подсчета на другой движок"""
+        if self.engine is not None:
+            event.remove(self.engine, "before_cursor_execute", self._before_execute)
+            event.remove(self.engine, "after_cursor_execute", self._after_execute)
+        self.engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        many: bool,
+    ) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        many: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        with self._lock:
+            self.count += 1
+            self.seconds += elapsed
+
+    def snapshot(self) -> Tuple[int, float]:
+        """Текущие значения счетчиков (число запросов, секунды)"""
+        with self._lock:
+            return self.count, self.seconds
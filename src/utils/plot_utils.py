@@ -1,9 +1,35 @@
+import base64
+import tkinter
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+
 import customtkinter as ctk
-import pandas as pd
+import numpy as np
+
+from src.utils.chart_renderer import (
+    CacheKey,
+    ChartRenderer,
+    data_version,
+    render_modifications_png,
+    render_payments_png,
+)
+from src.utils.downsampling import label_indices, lttb
+
+# Отступ области графика от краев холста
+PADDING = 20
+# Минимальная ширина ячейки под один столбец, пикселей
+MIN_BAR_SLOT = 6
+# Максимальная ширина столбца, пикселей
+MAX_BAR_WIDTH = 30
+# Период опроса фоновой отрисовки, мс
+RENDER_POLL_MS = 50
 
 
 class SimpleChart(ctk.CTkFrame):
-    def __init__(self, master, title="", height=200, **kwargs):
+    def __init__(
+        self, master: Any, title: str = "", height: int = 200, **kwargs: Any
+    ) -> None:
         super().__init__(master, height=height, **kwargs)
 
         self.title = title
@@ -20,179 +46,246 @@ class SimpleChart(ctk.CTkFrame):
         )
         self.canvas.pack(pady=5)
 
-    def clear(self):
+    def clear(self) -> None:
         """Очистка холста"""
         self.canvas.delete("all")
 
+    def show_image(self, png: bytes) -> None:
+        """Вывод готового изображения графика"""
+        self._image = tkinter.PhotoImage(master=self.canvas, data=base64.b64encode(png))
+        self.clear()
+        self.canvas.create_image(0, 0, anchor="nw", image=self._image)
+
+    def show_when_ready(self, future: "Future[bytes]") -> None:
+        """Вывод изображения, когда фоновая отрисовка завершится"""
+
+        def check() -> None:
+            if not self.winfo_exists():
+                return
+            if not future.done():
+                self.after(RENDER_POLL_MS, check)
+            elif not future.cancelled() and future.exception() is None:
+                self.show_image(future.result())
+
+        self.after(RENDER_POLL_MS, check)
+
+    def draw_message(self, text: str) -> None:
+        """Вывод сообщения по центру холста"""
+        self.canvas.create_text(
+            self.canvas_width // 2, self.canvas_height // 2, text=text, fill="gray"
+        )
 
-def create_payments_chart(parent, project) -> SimpleChart:
-    """Создание графика платежей"""
-    chart = SimpleChart(parent, title="График платежей")
+    def draw_axes(self) -> None:
+        """Отрисовка осей"""
+        bottom = self.canvas_height - PADDING
+        self.canvas.create_line(
+            PADDING, bottom, self.canvas_width - PADDING, bottom, fill="black"
+        )
+        self.canvas.create_line(PADDING, PADDING, PADDING, bottom, fill="black")
 
-    # Получаем данные о платежах
-    payments_data = []
-    for payment in project.payments:
-        if payment.status == "completed":
-            payments_data.append(
-                {"date": payment.payment_date, "amount": payment.amount}
-            )
+    def draw_polyline(self, xs: np.ndarray, ys: np.ndarray, color: str) -> None:
+        """Отрисовка ряда одной ломаной вместо отрезка на каждую точку"""
+        if len(xs) > 1:
+            coords = np.column_stack((xs, ys)).ravel().tolist()
+            self.canvas.create_line(*coords, fill=color)
+        elif len(xs) == 1:
+            self.draw_marker(xs[0], ys[0], color)
 
-    if not payments_data:
-        chart.canvas.create_text(
-            chart.canvas_width // 2,
-            chart.canvas_height // 2,
-            text="Нет данных о платежах",
-            fill="gray",
-        )
-        return chart
+    def draw_marker(self, x: float, y: float, color: str) -> None:
+        """Отрисовка точки"""
+        self.canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color)
 
-    # Создаем DataFrame и сортируем по дате
-    df = pd.DataFrame(payments_data)
-    df = df.sort_values("date")
-    df["cumulative"] = df["amount"].cumsum()
-
-    # Находим границы для масштабирования
-    max_amount = df["cumulative"].max()
-    min_date = df["date"].min()
-    max_date = df["date"].max()
-    date_range = (max_date - min_date).days
-
-    # Масштабирование и отрисовка
-    padding = 20
-    y_scale = (chart.canvas_height - 2 * padding) / max_amount
-    x_scale = (chart.canvas_width - 2 * padding) / date_range
-
-    # Рисуем оси
-    chart.canvas.create_line(
-        padding,
-        chart.canvas_height - padding,
-        chart.canvas_width - padding,
-        chart.canvas_height - padding,
-        fill="black",
-    )
-    chart.canvas.create_line(
-        padding, padding, padding, chart.canvas_height - padding, fill="black"
-    )
 
-    # Рисуем график
-    prev_x = prev_y = None
-    for _, row in df.iterrows():
-        x = padding + (row["date"] - min_date).days * x_scale
-        y = chart.canvas_height - (padding + row["cumulative"] * y_scale)
+def to_days(dates: np.ndarray) -> np.ndarray:
+    """Перевод дат в число дней от первой даты"""
+    dates = dates.astype("datetime64[s]")
+    days: np.ndarray = (dates - dates.min()) / np.timedelta64(1, "D")
+    return days
 
-        # Точка
-        chart.canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill="blue")
 
-        # Линия к предыдущей точке
-        if prev_x is not None:
-            chart.canvas.create_line(prev_x, prev_y, x, y, fill="blue")
+def scale_x(days: np.ndarray, width: int) -> np.ndarray:
+    """Координаты X для дней; при одной дате точки ставятся по центру"""
+    span = days.max() if len(days) else 0.0
+    if span <= 0:
+        return np.full(len(days), width / 2)
+    return PADDING + days * ((width - 2 * PADDING) / span)
 
-        prev_x, prev_y = x, y
 
-        # Подпись значения
-        chart.canvas.create_text(
-            x, y - 10, text=f"{row['cumulative']:,.0f}", font=("Arial", 8)
-        )
+def scale_y(values: np.ndarray, max_value: float, height: int) -> np.ndarray:
+    """Координаты Y для значений"""
+    y_scale = (height - 2 * PADDING) / max_value if max_value > 0 else 1.0
+    return height - (PADDING + values * y_scale)
 
-    return chart
 
+def payments_series(
+    rows: Sequence[Tuple[datetime, float]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Даты и суммы платежей, отсортированные по дате"""
+    dates = np.array([row[0] for row in rows], dtype="datetime64[s]")
+    amounts = np.array([row[1] for row in rows], dtype=np.float64)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], amounts[order]
 
-def create_modifications_chart(parent, project) -> SimpleChart:
-    """Создание графика доработок"""
-    chart = SimpleChart(parent, title="График доработок")
 
-    # Получаем данные о доработках
-    mods_data = []
-    for mod in project.modifications:
-        if mod.is_paid:
-            mods_data.append(
-                {
-                    "date": mod.start_date,
-                    "cost": mod.cost,
-                    "description": mod.description[:20] + "..."
-                    if len(mod.description) > 20
-                    else mod.description,
-                }
-            )
-
-    if not mods_data:
-        chart.canvas.create_text(
-            chart.canvas_width // 2,
-            chart.canvas_height // 2,
-            text="Нет данных о доработках",
-            fill="gray",
-        )
-        return chart
+def modifications_series(
+    rows: Sequence[Tuple[datetime, float, str]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Даты, стоимости и описания доработок, отсортированные по дате"""
+    dates = np.array([row[0] for row in rows], dtype="datetime64[s]")
+    costs = np.array([row[1] or 0.0 for row in rows], dtype=np.float64)
+    descriptions = np.array([row[2] for row in rows], dtype=object)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], costs[order], descriptions[order]
 
-    # Создаем DataFrame и сортируем по дате
-    df = pd.DataFrame(mods_data)
-    df = df.sort_values("date")
-    df["cumulative"] = df["cost"].cumsum()
-
-    # Находим границы для масштабирования
-    max_amount = df["cumulative"].max()
-    min_date = df["date"].min()
-    max_date = df["date"].max()
-    date_range = (max_date - min_date).days or 1  # Избегаем деления на ноль
-
-    # Масштабирование и отрисовка
-    padding = 20
-    y_scale = (chart.canvas_height - 2 * padding) / max_amount if max_amount > 0 else 1
-    x_scale = (chart.canvas_width - 2 * padding) / date_range
-
-    # Рисуем оси
-    chart.canvas.create_line(
-        padding,
-        chart.canvas_height - padding,
-        chart.canvas_width - padding,
-        chart.canvas_height - padding,
-        fill="black",
-    )
-    chart.canvas.create_line(
-        padding, padding, padding, chart.canvas_height - padding, fill="black"
-    )
 
-    # Рисуем столбцы доработок и линию общей стоимости
-    bar_width = min(30, x_scale * date_range / len(df) - 5)
-    prev_x = prev_y = None
+def draw_payments(chart: SimpleChart, dates: np.ndarray, amounts: np.ndarray) -> None:
+    """Отрисовка графика платежей на холсте"""
+    days = to_days(dates)
+    cumulative = np.cumsum(amounts)
+
+    xs = scale_x(days, chart.canvas_width)
+    ys = scale_y(cumulative, cumulative.max(), chart.canvas_height)
+
+    # Не больше одной точки на пиксель ширины
+    keep = lttb(xs, ys, chart.canvas_width - 2 * PADDING)
+    xs, ys, cumulative = xs[keep], ys[keep], cumulative[keep]
 
-    for _, row in df.iterrows():
-        x = padding + (row["date"] - min_date).days * x_scale
-        y_cost = chart.canvas_height - (padding + row["cost"] * y_scale)
-        y_cum = chart.canvas_height - (padding + row["cumulative"] * y_scale)
+    chart.draw_axes()
+    chart.draw_polyline(xs, ys, "blue")
 
-        # Столбец доработки
+    # Подписи только для ограниченного числа точек
+    for i in label_indices(len(xs)):
+        chart.draw_marker(xs[i], ys[i], "blue")
+        chart.canvas.create_text(
+            xs[i], ys[i] - 10, text=f"{cumulative[i]:,.0f}", font=("Arial", 8)
+        )
+
+
+def draw_modifications(
+    chart: SimpleChart, dates: np.ndarray, costs: np.ndarray, descriptions: np.ndarray
+) -> None:
+    """Отрисовка графика доработок на холсте"""
+    days = to_days(dates)
+    cumulative = np.cumsum(costs)
+
+    width, height = chart.canvas_width, chart.canvas_height
+    max_amount = cumulative.max()
+    xs = scale_x(days, width)
+
+    # Доработки, попавшие в одну ячейку по ширине, объединяются в один столбец
+    plot_width = width - 2 * PADDING
+    slot = max(MIN_BAR_SLOT, plot_width / len(xs))
+    bins = ((xs - PADDING) // slot).astype(np.int64)
+    _, first, counts = np.unique(bins, return_index=True, return_counts=True)
+    bin_costs = np.add.reduceat(costs, first)
+    bin_xs = np.add.reduceat(xs, first) / counts
+    bar_width = min(MAX_BAR_WIDTH, slot - 5) if slot > 5 else 1
+
+    chart.draw_axes()
+
+    # Столбцы доработок (не больше, чем помещается по ширине)
+    bottom = height - PADDING
+    bar_tops = scale_y(bin_costs, max_amount, height)
+    for x, top in zip(bin_xs.tolist(), bar_tops.tolist()):
         chart.canvas.create_rectangle(
             x - bar_width / 2,
-            chart.canvas_height - padding,
+            bottom,
             x + bar_width / 2,
-            y_cost,
+            top,
             fill="lightblue",
             outline="blue",
         )
 
-        # Точка на линии общей стоимости
-        chart.canvas.create_oval(x - 3, y_cum - 3, x + 3, y_cum + 3, fill="red")
-
-        # Линия общей стоимости
-        if prev_x is not None:
-            chart.canvas.create_line(prev_x, prev_y, x, y_cum, fill="red")
-
-        prev_x, prev_y = x, y_cum
+    # Линия общей стоимости
+    ys = scale_y(cumulative, max_amount, height)
+    keep = lttb(xs, ys, plot_width)
+    chart.draw_polyline(xs[keep], ys[keep], "red")
 
-        # Подписи
+    # Подписи только для ограниченного числа столбцов
+    for i in label_indices(len(bin_xs)):
+        x, top = bin_xs[i], bar_tops[i]
         chart.canvas.create_text(
-            x, y_cost - 10, text=f"{row['cost']:,.0f}", font=("Arial", 8)
+            x, top - 10, text=f"{bin_costs[i]:,.0f}", font=("Arial", 8)
         )
 
         # Описание доработки (повернуто)
+        if counts[i] == 1:
+            description = descriptions[first[i]]
+            if len(description) > 20:
+                description = description[:20] + "..."
+        else:
+            description = f"{counts[i]} доработок"
         chart.canvas.create_text(
             x,
-            chart.canvas_height - padding + 10,
-            text=row["description"],
+            bottom + 10,
+            text=description,
             angle=45,
             anchor="w",
             font=("Arial", 8),
         )
 
+
+def _render_or_preview(
+    chart: SimpleChart,
+    renderer: Optional[ChartRenderer],
+    key: CacheKey,
+    render: Callable[..., bytes],
+    series: Tuple[np.ndarray, ...],
+    preview: Callable[..., None],
+) -> None:
+    """Вывод графика из кэша или упрощенной версии до окончания отрисовки"""
+    if renderer is None:
+        preview(chart, *series)
+        return
+
+    png = renderer.get(key)
+    if png is not None:
+        chart.show_image(png)
+        return
+
+    # Пока изображение строится в фоне, показываем упрощенный график
+    preview(chart, *series)
+    future = renderer.submit(
+        key, render, *series, chart.canvas_width, chart.canvas_height
+    )
+    chart.show_when_ready(future)
+
+
+def create_payments_chart(
+    parent: Any,
+    project_id: int,
+    rows: Sequence[Tuple[datetime, float]],
+    renderer: Optional[ChartRenderer] = None,
+) -> SimpleChart:
+    """Создание графика платежей"""
+    chart = SimpleChart(parent, title="График платежей")
+    if not rows:
+        chart.draw_message("Нет данных о платежах")
+        return chart
+
+    series = payments_series(rows)
+    key: CacheKey = (project_id, "payments", data_version(*series))
+    key += (chart.canvas_width, chart.canvas_height)
+    _render_or_preview(chart, renderer, key, render_payments_png, series, draw_payments)
+    return chart
+
+
+def create_modifications_chart(
+    parent: Any,
+    project_id: int,
+    rows: Sequence[Tuple[datetime, float, str]],
+    renderer: Optional[ChartRenderer] = None,
+) -> SimpleChart:
+    """Создание графика доработок"""
+    chart = SimpleChart(parent, title="График доработок")
+    if not rows:
+        chart.draw_message("Нет данных о доработках")
+        return chart
+
+    series = modifications_series(rows)
+    key: CacheKey = (project_id, "modifications", data_version(*series))
+    key += (chart.canvas_width, chart.canvas_height)
+    _render_or_preview(
+        chart, renderer, key, render_modifications_png, series, draw_modifications
+    )
     return chart
@@ -0,0 +1,232 @@
+import cProfile
+import functools
+import json
+import os
+import re
+import threading
+import time
+import tkinter
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# Действия короче этого порога не сохраняются в .pstats, мс
+PSTATS_MIN_MS = 50
+# Длина текста SQL в имени события трассы
+SQL_NAME_LENGTH = 80
+
+
+class Profiler:
+    """Запись вложенных интервалов в формате Chrome trace events"""
+
+    def __init__(self, output_dir: str, pstats: bool = False) -> None:
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pstats = pstats
+        self.events: List[Dict[str, Any]] = []
+        self._pid = os.getpid()
+        self._start = time.perf_counter()
+        self._local = threading.local()
+        self._actions = 0
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._start) * 1_000_000
+
+    def add_event(
+        self, name: str, category: str, begin_us: float, end_us: float
+    ) -> None:
+        """Добавление завершенного интервала"""
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": begin_us,
+                "dur": end_us - begin_us,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            }
+        )
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        """Интервал; внешний интервал UI-потока считается действием"""
+        depth = getattr(self._local, "depth", 0)
+        profile = None
+        if (
+            depth == 0
+            and self.pstats
+            and threading.current_thread() is threading.main_thread()
+        ):
+            profile = cProfile.Profile()
+
+        self._local.depth = depth + 1
+        begin = self._now_us()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            end = self._now_us()
+            self._local.depth = depth
+            self.add_event(name, category, begin, end)
+            if profile and (end - begin) / 1000 >= PSTATS_MIN_MS:
+                self._dump_action(name, profile)
+
+    def _dump_action(self, name: str, profile: cProfile.Profile) -> None:
+        """Сохранение профиля действия в .pstats"""
+        self._actions += 1
+        slug = re.sub(r"[^\w.-]+", "_", name)[:60]
+        profile.dump_stats(self.output_dir / f"{self._actions:04d}-{slug}.pstats")
+
+    def wrap(
+        self, func: Callable[..., Any], name: str, category: str
+    ) -> Callable[..., Any]:
+        """Обертка функции в интервал"""
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def instrument_class(
+        self, cls: type, category: str, public_only: bool = True
+    ) -> None:
+        """Обертка методов класса (по умолчанию только публичных)"""
+        for attr, value in list(vars(cls).items()):
+            if not callable(value) or isinstance(value, type):
+                continue
+            if public_only and attr.startswith("_"):
+                continue
+            setattr(cls, attr, self.wrap(value, f"{cls.__name__}.{attr}", category))
+
+    def instrument_functions(
+        self, module: ModuleType, names: List[str], category: str
+    ) -> None:
+        """Обертка функций модуля"""
+        for name in names:
+            func = getattr(module, name)
+            setattr(module, name, self.wrap(func, name, category))
+
+    def instrument_widgets(self, *classes: type) -> None:
+        """Интервалы создания составных виджетов"""
+        for cls in classes:
+            init = self.wrap(getattr(cls, "__init__"), f"{cls.__name__}()", "widget")
+            setattr(cls, "__init__", init)
+
+    def instrument_tk(self) -> None:
+        """Обертка всех обратных вызовов Tk: команд, привязок и after()"""
+        profiler = self
+        register = getattr(tkinter.Misc, "_register")
+
+        def _register(
+            widget: tkinter.Misc,
+            func: Callable[..., Any],
+            subst: Optional[Callable[..., Any]] = None,
+            needcleanup: int = 1,
+        ) -> str:
+            name = getattr(func, "__qualname__", None) or repr(func)
+            wrapped = profiler.wrap(func, name, "ui")
+            command: str = register(widget, wrapped, subst, needcleanup)
+            return command
+
+        setattr(tkinter.Misc, "_register", _register)
+
+    def instrument_sql(self) -> None:
+        """Интервалы SQL-запросов всех движков"""
+
+        def before(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            many: bool,
+        ) -> None:
+            conn.info.setdefault("profile_start", []).append(self._now_us())
+
+        def after(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            many: bool,
+        ) -> None:
+            begin = conn.info["profile_start"].pop()
+            name = " ".join(statement.split())[:SQL_NAME_LENGTH]
+            self.add_event(name, "sql", begin, self._now_us())
+
+        event.listen(Engine, "before_cursor_execute", before)
+        event.listen(Engine, "after_cursor_execute", after)
+
+    def write(self) -> Path:
+        """Сохранение трассы для chrome://tracing или Perfetto"""
+        path = self.output_dir / "trace.json"
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+        return path
+
+
+def enable_profiling(output_dir: str, pstats: bool = False) -> Profiler:
+    """Включение профилирования приложения
+
+    Вызывается до создания главного окна, чтобы обертки попали
+    во все импортируемые модули.
+    """
+    from src.db import crud
+    from src.gui.components.paged_list import PagedList
+    from src.gui.components.project_card import ProjectCard
+    from src.gui.forms import project_details
+    from src.gui.forms.modification_form import ModificationForm
+    from src.gui.forms.payment_form import PaymentForm
+    from src.gui.forms.project_form import ProjectForm
+    from src.gui.windows.dashboard_window import DashboardWindow
+    from src.utils import chart_renderer, plot_utils
+
+    profiler = Profiler(output_dir, pstats)
+    profiler.instrument_tk()
+    profiler.instrument_sql()
+
+    for manager in (
+        crud.ProjectManager,
+        crud.PaymentManager,
+        crud.ModificationManager,
+        crud.ReportManager,
+    ):
+        profiler.instrument_class(manager, "db")
+
+    # Построение графиков: предварительная отрисовка на холсте и PNG в фоне
+    chart_functions = ["create_payments_chart", "create_modifications_chart"]
+    profiler.instrument_functions(
+        plot_utils,
+        chart_functions + ["draw_payments", "draw_modifications"],
+        "chart",
+    )
+    for name in chart_functions:
+        setattr(project_details, name, getattr(plot_utils, name))
+    profiler.instrument_functions(
+        chart_renderer, ["render_payments_png", "render_modifications_png"], "chart"
+    )
+    for name in ("render_payments_png", "render_modifications_png"):
+        setattr(plot_utils, name, getattr(chart_renderer, name))
+
+    profiler.instrument_widgets(
+        ProjectCard,
+        PagedList,
+        plot_utils.SimpleChart,
+        project_details.ProjectDetails,
+        PaymentForm,
+        ModificationForm,
+        ProjectForm,
+        DashboardWindow,
+    )
+    return profiler
@@ -0,0 +1,66 @@
+import calendar
+import itertools
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+# Периодичность графиков платежей и ее подписи
+CADENCES = {
+    "weekly": "Еженедельно",
+    "monthly": "Ежемесячно",
+    "quarterly": "Ежеквартально",
+    "yearly": "Ежегодно",
+}
+# Шаг графика в месяцах (еженедельный считается в днях)
+CADENCE_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+WEEK = timedelta(weeks=1)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    """Сдвиг на месяцы; 31-е число переходит на последний день короткого месяца"""
+    month = moment.month - 1 + months
+    year = moment.year + month // 12
+    month = month % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def nth_occurrence(start: datetime, cadence: str, number: int) -> datetime:
+    """Дата платежа графика с номером number (с нуля)"""
+    if cadence == "weekly":
+        return start + number * WEEK
+    # Считаем от начала, а не от предыдущей даты: 31.01 -> 29.02 -> 31.03
+    return add_months(start, number * CADENCE_MONTHS[cadence])
+
+
+def _first_after(start: datetime, cadence: str, after: Optional[datetime]) -> int:
+    """Номер первого платежа строго после after"""
+    if after is None or after < start:
+        return 0
+    if cadence == "weekly":
+        return (after - start) // WEEK + 1
+    step = CADENCE_MONTHS[cadence]
+    months = (after.year - start.year) * 12 + after.month - start.month
+    number = max(months // step - 1, 0)
+    while nth_occurrence(start, cadence, number) <= after:
+        number += 1
+    return number
+
+
+def occurrences(
+    start: datetime,
+    cadence: str,
+    end: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+) -> Iterator[datetime]:
+    """Даты платежей графика после after и не позже end (без end — бесконечно)
+
+    Даты вычисляются по одной, так что длинный график не разворачивается
+    целиком: потребитель берет столько, сколько ему нужно.
+    """
+    if cadence not in CADENCES:
+        raise ValueError(f"Неизвестная периодичность: {cadence}")
+    for number in itertools.count(_first_after(start, cadence, after)):
+        moment = nth_occurrence(start, cadence, number)
+        if end is not None and moment > end:
+            return
+        yield moment
@@ -0,0 +1,142 @@
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# За сколько до дедлайна напоминать
+REMINDER_LEAD = timedelta(days=1)
+
+# (вид, id): ("project", 1) или ("modification", 5)
+ReminderKey = Tuple[str, int]
+# (вид, id, id проекта, название, дедлайн) — строка из get_open_deadlines
+DeadlineRow = Tuple[str, int, int, str, datetime]
+
+
+@dataclass(frozen=True)
+class Reminder:
+    kind: str
+    item_id: int
+    project_id: int
+    title: str
+    deadline: datetime
+    # True — дедлайн наступил, False — предварительное напоминание
+    due: bool
+
+    @property
+    def message(self) -> str:
+        what = "Проект" if self.kind == "project" else "Доработка"
+        when = self.deadline.strftime("%d.%m.%Y")
+        if self.due:
+            return f"{what} «{self.title}»: дедлайн наступил ({when})"
+        return f"{what} «{self.title}»: дедлайн {when}"
+
+
+# (время выдачи, порядковый номер, ключ, версия ключа, напоминание)
+HeapEntry = Tuple[datetime, int, ReminderKey, int, Reminder]
+
+
+class ReminderScheduler:
+    """Очередь напоминаний о дедлайнах на куче
+
+    Изменение дедлайна не ищет старую запись в куче: у ключа растет версия,
+    а записи со старой версией отбрасываются при извлечении.
+    """
+
+    def __init__(
+        self,
+        lead: timedelta = REMINDER_LEAD,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        self.lead = lead
+        self.clock = clock
+        self._heap: List[HeapEntry] = []
+        self._versions: Dict[ReminderKey, int] = {}
+        self._by_project: Dict[int, Set[ReminderKey]] = {}
+        self._counter = itertools.count()
+        # Выданные напоминания не повторяются при перезагрузке дедлайнов
+        self._delivered: Set[Reminder] = set()
+
+    def load(self, rows: Iterable[DeadlineRow]) -> None:
+        """Первичная загрузка всех дедлайнов"""
+        self._heap = []
+        self._versions = {}
+        self._by_project = {}
+        for row in rows:
+            self._add(row, push=self._heap.append)
+        heapq.heapify(self._heap)
+
+    def update_project(self, project_id: int, rows: Iterable[DeadlineRow]) -> None:
+        """Замена дедлайнов проекта и его доработок актуальными"""
+        for key in self._by_project.pop(project_id, set()):
+            self._versions[key] = self._versions.get(key, 0) + 1
+        for row in rows:
+            self._add(row, push=lambda entry: heapq.heappush(self._heap, entry))
+
+    def _add(self, row: DeadlineRow, push: Callable[[HeapEntry], None]) -> None:
+        kind, item_id, project_id, title, deadline = row
+        key = (kind, item_id)
+        version = self._versions[key] = self._versions.get(key, 0) + 1
+        now = self.clock()
+        if deadline < now:
+            return
+        self._by_project.setdefault(project_id, set()).add(key)
+
+        for at, due in ((deadline - self.lead, False), (deadline, True)):
+            reminder = Reminder(kind, item_id, project_id, title, deadline, due)
+            if reminder in self._delivered:
+                continue
+            # Предварительное напоминание, время которого прошло, выдается сразу
+            push((max(at, now), next(self._counter), key, version, reminder))
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._heap[0][3] != self._versions.get(self._heap[0][2]):
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        """Время ближайшего напоминания"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[Reminder]:
+        """Извлечение наступивших напоминаний"""
+        now = now or self.clock()
+        reminders = []
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            reminder = heapq.heappop(self._heap)[4]
+            self._delivered.add(reminder)
+            reminders.append(reminder)
+        return reminders
+
+    def seconds_until_next(self) -> Optional[float]:
+        """Сколько ждать до ближайшего напоминания"""
+        due = self.next_due()
+        if due is None:
+            return None
+        return max(0.0, (due - self.clock()).total_seconds())
+
+
+def run_headless(
+    load_rows: Callable[[], Iterable[DeadlineRow]],
+    notify: Callable[[Reminder], None],
+    refresh: timedelta,
+    scheduler: Optional[ReminderScheduler] = None,
+) -> None:
+    """Цикл напоминаний без интерфейса
+
+    Процесс спит до ближайшего напоминания. Изменения из других процессов
+    до него не доходят, поэтому дедлайны перечитываются раз в refresh.
+    """
+    scheduler = scheduler or ReminderScheduler()
+    while True:
+        scheduler.load(load_rows())
+        reload_at = time.monotonic() + refresh.total_seconds()
+        while time.monotonic() < reload_at:
+            for reminder in scheduler.pop_due():
+                notify(reminder)
+            wait = scheduler.seconds_until_next()
+            remaining = reload_at - time.monotonic()
+            time.sleep(
+                max(0.0, min(remaining, wait if wait is not None else remaining))
+            )
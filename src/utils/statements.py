@@ -0,0 +1,235 @@
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.db.crud import ReportManager
+from src.db.models import BASE_CURRENCY
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+# Меньше этого числа выписок процессы не запускаются: их старт дороже работы
+MIN_PARALLEL_STATEMENTS = 20
+FORMATS = ("html", "pdf")
+# Позиции и выравнивание колонок таблицы в PDF (доли ширины страницы)
+PDF_COLUMNS = (0.04, 0.30, 0.38, 0.53, 0.63, 0.73, 0.85, 0.96)
+PDF_ALIGN = ("left", "left", "left", "right", "right", "right", "right", "right")
+
+_AMOUNT_FIELDS = (
+    "total_cost",
+    "period_paid",
+    "period_mods_cost",
+    "total_paid",
+    "outstanding",
+)
+
+
+def month_period(month: str) -> Tuple[datetime, datetime]:
+    """Границы месяца в формате ГГГГ-ММ: [начало, начало следующего)"""
+    start = datetime.strptime(month, "%Y-%m")
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def build_statements(
+    rows: Iterable[Any],
+    period_start: datetime,
+    period_end: datetime,
+    currency: str = BASE_CURRENCY,
+) -> List[Dict[str, Any]]:
+    """Группировка строк агрегирующего запроса в выписки по клиентам"""
+    statements: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        statement = statements.get(row.client_id)
+        if statement is None:
+            statement = statements[row.client_id] = {
+                "client_id": row.client_id,
+                "client": row.client_name,
+                "period_start": period_start,
+                "period_end": period_end,
+                "currency": currency,
+                "lines": [],
+                "totals": dict.fromkeys(_AMOUNT_FIELDS, 0.0),
+            }
+        line = {
+            "name": row.name,
+            "status": row.status,
+            "deadline": row.deadline,
+            "total_cost": row.total_cost,
+            "period_paid": row.period_paid,
+            "period_mods_cost": row.period_mods_cost,
+            "total_paid": row.total_paid,
+            "outstanding": row.total_cost - row.total_paid,
+        }
+        statement["lines"].append(line)
+        for field in _AMOUNT_FIELDS:
+            statement["totals"][field] += line[field]
+    return list(statements.values())
+
+
+def _last_day(statement: Dict[str, Any]) -> datetime:
+    """Последний день периода (конец периода в выборку не входит)"""
+    return datetime.fromordinal(statement["period_end"].toordinal() - 1)
+
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> Template:
+    """Загруженный шаблон (один раз на процесс)"""
+    return Template((TEMPLATES_DIR / name).read_text(encoding="utf-8"))
+
+
+def _amounts(values: Dict[str, Any]) -> Dict[str, str]:
+    """Форматирование денежных полей для шаблона"""
+    formatted = {field: f"{values[field]:,.2f}" for field in _AMOUNT_FIELDS}
+    formatted["outstanding_class"] = "debt" if values["outstanding"] > 0 else ""
+    return formatted
+
+
+def render_html(statement: Dict[str, Any]) -> str:
+    """Выписка в HTML"""
+    row_template = _template("statement_row.html")
+    rows = "\n".join(
+        row_template.substitute(
+            name=html.escape(line["name"]),
+            status=html.escape(line["status"] or ""),
+            deadline=line["deadline"].strftime("%d.%m.%Y"),
+            **_amounts(line),
+        )
+        for line in statement["lines"]
+    )
+    return _template("statement.html").substitute(
+        client=html.escape(statement["client"]),
+        period_start=statement["period_start"].strftime("%d.%m.%Y"),
+        period_end=_last_day(statement).strftime("%d.%m.%Y"),
+        currency=statement["currency"],
+        rows=rows,
+        generated_at=datetime.now().strftime("%d.%m.%Y %H:%M"),
+        **_amounts(statement["totals"]),
+    )
+
+
+def render_pdf(statement: Dict[str, Any]) -> bytes:
+    """Выписка в PDF средствами matplotlib"""
+    # matplotlib импортируется только в процессах, которые строят PDF
+    from matplotlib.backends.backend_pdf import FigureCanvasPdf
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(11.69, 8.27))  # A4, альбомная
+    FigureCanvasPdf(figure)
+    last_day = _last_day(statement)
+    figure.suptitle(
+        f"Выписка для клиента {statement['client']}\n"
+        f"Период: {statement['period_start']:%d.%m.%Y} — {last_day:%d.%m.%Y}, "
+        f"суммы в {statement['currency']}",
+        fontsize=12,
+    )
+
+    header = [
+        "Проект",
+        "Статус",
+        "Дедлайн",
+        "Стоимость",
+        "Оплачено\nза период",
+        "Доработки\nза период",
+        "Оплачено\nвсего",
+        "Остаток",
+    ]
+    cells = []
+    for values in statement["lines"] + [statement["totals"]]:
+        amounts = _amounts(values)
+        name = values.get("name", "Итого")
+        cells.append(
+            [
+                name if len(name) <= 30 else name[:30] + "...",
+                values.get("status", ""),
+                values["deadline"].strftime("%d.%m.%Y") if "deadline" in values else "",
+            ]
+            + [amounts[field] for field in _AMOUNT_FIELDS]
+        )
+
+    # Таблица размечается вручную: Axes.table в несколько раз медленнее
+    rows = [header] + cells
+    top = 0.86
+    row_height = min(0.04, 0.8 / len(rows))
+    for i, row in enumerate(rows):
+        y = top - (i + 0.5) * row_height
+        weight = "bold" if i in (0, len(rows) - 1) else "normal"
+        for value, x, align in zip(row, PDF_COLUMNS, PDF_ALIGN):
+            figure.text(x, y, value, ha=align, va="center", fontsize=7, weight=weight)
+    lines = [
+        [(0.03, top - i * row_height), (0.97, top - i * row_height)]
+        for i in range(len(rows) + 1)
+    ]
+    figure.add_artist(LineCollection(lines, colors="gray", linewidths=0.5))
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format="pdf")
+    return buffer.getvalue()
+
+
+def _file_stem(statement: Dict[str, Any]) -> str:
+    """Имя файла выписки"""
+    slug = re.sub(r"[^\w.-]+", "_", statement["client"]).strip("_") or "client"
+    # id различает клиентов с одинаковыми именами
+    return f"{statement['period_start']:%Y-%m}_{slug[:60]}_{statement['client_id']}"
+
+
+def render_statement(
+    statement: Dict[str, Any], output_dir: str, formats: Sequence[str] = FORMATS
+) -> List[str]:
+    """Сохранение выписки в заданных форматах (выполняется в процессе пула)"""
+    stem = Path(output_dir) / _file_stem(statement)
+    paths = []
+    if "html" in formats:
+        path = stem.with_suffix(".html")
+        path.write_text(render_html(statement), encoding="utf-8")
+        paths.append(str(path))
+    if "pdf" in formats:
+        path = stem.with_suffix(".pdf")
+        path.write_bytes(render_pdf(statement))
+        paths.append(str(path))
+    return paths
+
+
+def generate_statements(
+    report_manager: ReportManager,
+    period_start: datetime,
+    period_end: datetime,
+    output_dir: str,
+    formats: Sequence[str] = FORMATS,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """Формирование выписок всем клиентам за период
+
+    Данные выбираются одним запросом, отрисовка распределяется по процессам.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    statements = build_statements(
+        report_manager.get_statement_rows(period_start, period_end),
+        period_start,
+        period_end,
+        report_manager.currency,
+    )
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(statements) < MIN_PARALLEL_STATEMENTS:
+        results = [render_statement(s, output_dir, formats) for s in statements]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    render_statement,
+                    statements,
+                    [output_dir] * len(statements),
+                    [tuple(formats)] * len(statements),
+                    chunksize=max(1, len(statements) // (workers * 4)),
+                )
+            )
+    return [path for paths in results for path in paths]
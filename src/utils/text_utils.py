@@ -0,0 +1,30 @@
+import re
+from typing import List, Optional
+
+# Разделители технологий в свободном тексте
+_TECH_SEPARATORS = re.compile(r"[,;\n/|]+")
+# Адрес электронной почты в контактах
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def parse_tech_stack(text: Optional[str]) -> List[str]:
+    """Разбор технологического стека на отдельные названия"""
+    if not text:
+        return []
+    names = []
+    for part in _TECH_SEPARATORS.split(text):
+        name = " ".join(part.split()).lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def client_name(contacts: Optional[str]) -> str:
+    """Имя клиента: первая строка контактов"""
+    return (contacts or "").strip().split("\n", 1)[0].strip()
+
+
+def client_email(contacts: Optional[str]) -> Optional[str]:
+    """Первый адрес электронной почты в контактах (в нижнем регистре)"""
+    match = _EMAIL.search(contacts or "")
+    return match.group(0).lower() if match else None
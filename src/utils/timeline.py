@@ -0,0 +1,117 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# (вид, id, id проекта, название, начало, дедлайн, статус) — строка из get_timeline_spans
+SpanRow = Tuple[str, int, int, str, datetime, datetime, str]
+
+EPOCH = datetime(1970, 1, 1)
+DAY = timedelta(days=1)
+
+
+def to_days(moment: datetime) -> float:
+    """Дата в днях от эпохи (координата шкалы времени)"""
+    return (moment - EPOCH) / DAY
+
+
+def from_days(days: float) -> datetime:
+    return EPOCH + days * DAY
+
+
+def assign_lanes(extents: List[Tuple[float, float]]) -> List[int]:
+    """Раскладка отрезков по дорожкам без пересечений (жадно, O(n log n))
+
+    Отрезок занимает дорожку, освободившуюся раньше всех, если она
+    освободилась до его начала, иначе открывает новую.
+    """
+    lanes = [0] * len(extents)
+    free: List[Tuple[float, int]] = []
+    count = 0
+    for index in sorted(range(len(extents)), key=lambda i: extents[i]):
+        start, end = extents[index]
+        if free and free[0][0] < start:
+            _, lane = heapq.heappop(free)
+        else:
+            lane, count = count, count + 1
+        lanes[index] = lane
+        heapq.heappush(free, (end, lane))
+    return lanes
+
+
+class TimelineModel:
+    """Отрезки проектов и доработок в массивах для быстрой выборки
+
+    Проект и его доработки занимают одну дорожку; видимые отрезки и
+    полосы плотности считаются векторно по массивам начал и концов.
+    """
+
+    def __init__(self, rows: List[SpanRow]):
+        self.rows = rows
+        self.starts = np.array([to_days(row[4]) for row in rows], dtype=np.float64)
+        # Отрезок не короче дня, чтобы его было видно
+        self.ends = np.maximum(
+            np.array([to_days(row[5]) for row in rows], dtype=np.float64),
+            self.starts + 1,
+        )
+        self.is_project = np.array([row[0] == "project" for row in rows], dtype=bool)
+
+        # Дорожка проекта охватывает и его доработки
+        extents: Dict[int, List[float]] = {}
+        for row, start, end in zip(rows, self.starts, self.ends):
+            extent = extents.setdefault(row[2], [start, end])
+            extent[0], extent[1] = min(extent[0], start), max(extent[1], end)
+        project_ids = list(extents)
+        project_lanes = dict(
+            zip(
+                project_ids,
+                assign_lanes([(extents[i][0], extents[i][1]) for i in project_ids]),
+            )
+        )
+        self.lanes = np.array([project_lanes[row[2]] for row in rows], dtype=np.int64)
+        self.lane_count = int(self.lanes.max(initial=-1)) + 1
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def visible(self, t0: float, t1: float, lane0: float, lane1: float) -> np.ndarray:
+        """Номера отрезков, пересекающих окно времени и дорожек"""
+        mask = (
+            (self.starts <= t1)
+            & (self.ends >= t0)
+            & (self.lanes >= np.floor(lane0))
+            & (self.lanes <= lane1)
+        )
+        return np.flatnonzero(mask)
+
+    def density(
+        self,
+        t0: float,
+        t1: float,
+        bins: int,
+        lane0: int,
+        lane1: int,
+        lanes_per_band: int,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Полосы плотности: границы интервалов, номера полос и число проектов
+
+        Возвращает (edges, bands, counts), где counts[i, j] — сколько
+        проектов полосы bands[i] идут в интервале [edges[j], edges[j + 1]).
+        """
+        edges = np.linspace(t0, t1, bins + 1)
+        first = max(lane0, 0) // lanes_per_band
+        last = max(lane1, 0) // lanes_per_band
+        bands = np.arange(first, last + 1)
+        counts = np.zeros((len(bands), bins), dtype=np.int64)
+
+        band_of = self.lanes // lanes_per_band
+        for position, band in enumerate(bands):
+            mask = self.is_project & (band_of == band)
+            starts = np.sort(self.starts[mask])
+            ends = np.sort(self.ends[mask])
+            # Идут в интервале: начались до его конца минус закончились к его началу
+            started = np.searchsorted(starts, edges[1:], side="left")
+            finished = np.searchsorted(ends, edges[:-1], side="right")
+            counts[position] = started - finished
+        return edges, bands, counts
@@ -0,0 +1,155 @@
+"""Общие фикстуры: заполненная база и перехват SQL-запросов"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.db.clients import fill_clients
+from src.db.models import (
+    Modification,
+    Payment,
+    Project,
+    TimeEntry,
+    create_db_engine,
+)
+from src.db.tags import fill_project_tags
+
+# Объем тестовых данных
+SEED_PROJECTS = 300
+SEED_CLIENTS = 60
+PAYMENTS_PER_PROJECT = 6
+MODIFICATIONS_PER_PROJECT = 3
+
+STATUSES = ["active", "completed", "overdue"]
+TECH_STACKS = [
+    "Python, Django, PostgreSQL",
+    "Python, FastAPI",
+    "React, TypeScript",
+    "Vue, Go",
+    "Django, React",
+]
+
+
+def seed_database(session: Session) -> None:
+    """Заполнение базы детерминированными проектами, платежами и доработками"""
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+    for number in range(SEED_PROJECTS):
+        client = number % SEED_CLIENTS
+        project_start = start + timedelta(days=rng.randrange(700))
+        project = Project(
+            name=f"Проект {number}",
+            start_date=project_start,
+            deadline=project_start + timedelta(days=rng.randrange(30, 200)),
+            status=STATUSES[number % len(STATUSES)],
+            total_cost=float(rng.randrange(10, 200) * 1000),
+            currency="USD" if number % 10 == 0 else "RUB",
+            tech_stack=TECH_STACKS[number % len(TECH_STACKS)],
+            description=f"Описание проекта {number}",
+            client_contacts=f"Клиент {client}\nclient{client}@example.com",
+        )
+        for index in range(PAYMENTS_PER_PROJECT):
+            project.payments.append(
+                Payment(
+                    amount=float(rng.randrange(1, 20) * 1000),
+                    payment_date=project_start + timedelta(days=15 * index),
+                    status="completed" if index % 4 else "pending",
+                )
+            )
+        for index in range(MODIFICATIONS_PER_PROJECT):
+            modification = Modification(
+                description=f"Доработка {index}",
+                start_date=project_start + timedelta(days=20 * index),
+                deadline=project_start + timedelta(days=20 * index + 10),
+                cost=float(rng.randrange(1, 10) * 500),
+                status="pending",
+            )
+            modification.time_entries.append(
+                TimeEntry(
+                    start_time=modification.start_date,
+                    end_time=modification.start_date + timedelta(hours=2),
+                    minutes=120.0,
+                    rate=1500.0,
+                )
+            )
+            project.modifications.append(modification)
+        session.add(project)
+    session.commit()
+
+    connection = session.connection()
+    fill_project_tags(connection)
+    fill_clients(connection)
+    connection.exec_driver_sql(
+        "INSERT INTO exchange_rates (currency, rate_date, rate) "
+        "VALUES ('USD', '2023-01-01', 70.0), ('USD', '2024-01-01', 90.0)"
+    )
+    session.commit()
+
+
+@pytest.fixture(scope="session")
+def engine(tmp_path_factory) -> Engine:
+    """Движок заполненной тестовой базы (одна на все тесты)"""
+    engine = create_db_engine(str(tmp_path_factory.mktemp("db") / "flc.db"))
+    with Session(engine) as session:
+        seed_database(session)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def own_engine(tmp_path) -> Engine:
+    """Отдельная заполненная база для тестов, которые фиксируют изменения"""
+    engine = create_db_engine(str(tmp_path / "flc.db"))
+    with Session(engine) as session:
+        seed_database(session)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine) -> Iterator[Session]:
+    """Сессия тестовой базы; изменения теста откатываются"""
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+class QueryCapture:
+    """Запись SQL-запросов, выполненных через движок"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[Tuple[str, tuple]] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            self.statements.append((statement, tuple(parameters or ())))
+
+    def __enter__(self) -> "QueryCapture":
+        self.statements.clear()
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def selects(self) -> List[Tuple[str, tuple]]:
+        """Только запросы на чтение"""
+        return [
+            (sql, params)
+            for sql, params in self.statements
+            if sql.lstrip().upper().startswith(("SELECT", "WITH"))
+        ]
+
+
+@pytest.fixture
+def capture(engine) -> QueryCapture:
+    """Перехватчик запросов тестовой базы"""
+    return QueryCapture(engine)
@@ -0,0 +1,52 @@
+"""Координаты точек графиков проекта"""
+
+from datetime import datetime
+
+import numpy as np
+
+from src.utils.plot_utils import (
+    PADDING,
+    modifications_series,
+    payments_series,
+    scale_x,
+    scale_y,
+    to_days,
+)
+
+
+def test_series_are_sorted_by_date():
+    dates, amounts = payments_series(
+        [(datetime(2024, 3, 1), 30.0), (datetime(2024, 1, 1), 10.0)]
+    )
+    assert amounts.tolist() == [10.0, 30.0]
+    assert dates[0] == np.datetime64("2024-01-01T00:00:00")
+
+    _, costs, descriptions = modifications_series(
+        [(datetime(2024, 2, 1), None, "Б"), (datetime(2024, 1, 1), 5.0, "А")]
+    )
+    assert costs.tolist() == [5.0, 0.0]
+    assert descriptions.tolist() == ["А", "Б"]
+
+
+def test_dates_fill_width_between_paddings():
+    dates = np.array(
+        ["2024-01-01T00", "2024-01-01T12", "2024-01-03T00"], dtype="datetime64[s]"
+    )
+
+    days = to_days(dates)
+    xs = scale_x(days, 400)
+
+    assert days.tolist() == [0.0, 0.5, 2.0]
+    assert xs.tolist() == [PADDING, PADDING + 90.0, 400 - PADDING]
+
+
+def test_single_date_is_centered():
+    assert scale_x(np.zeros(3), 400).tolist() == [200.0] * 3
+    assert scale_x(np.zeros(0), 400).tolist() == []
+
+
+def test_values_grow_upwards():
+    ys = scale_y(np.array([0.0, 50.0, 100.0]), 100.0, 240)
+
+    assert ys.tolist() == [240 - PADDING, 120.0, PADDING]
+    assert scale_y(np.zeros(2), 0.0, 240).tolist() == [240 - PADDING] * 2
@@ -0,0 +1,73 @@
+"""Клиенты проектов и сводки по ним"""
+
+import pytest
+
+from src.db.clients import assign_clients, resolve_client
+from src.db.crud import ClientManager, ProjectManager
+from src.db.models import Client, Project
+
+
+@pytest.fixture
+def connection(session):
+    return session.connection()
+
+
+def test_client_is_found_by_email_first(connection):
+    known = resolve_client(connection, "Клиент 3\nclient3@example.com")
+
+    assert resolve_client(connection, "ИП Другой\nCLIENT3@example.com") == known
+    assert resolve_client(connection, "  Клиент   3 ") == known
+    assert resolve_client(connection, "Клиент 3\nother@example.com") != known
+
+
+def test_client_without_name_is_named_by_email(session, connection):
+    client_id = resolve_client(connection, "\nnew@example.com")
+
+    client = session.get(Client, client_id)
+    assert (client.name, client.email) == ("new@example.com", "new@example.com")
+    assert resolve_client(connection, "") is None
+    assert resolve_client(connection, None) is None
+
+
+def test_email_is_added_to_client_known_by_name(session, connection):
+    client_id = resolve_client(connection, "Иван Петров")
+    assert resolve_client(connection, "Иван Петров\nivan@example.com") == client_id
+
+    assert session.get(Client, client_id).email == "ivan@example.com"
+    assert resolve_client(connection, "Иван Петров\nvanya@example.com") != client_id
+
+
+def test_assign_clients_links_projects(session, connection):
+    assign_clients(connection, [(1, "Новый клиент"), (2, " Новый клиент ")])
+    session.expire_all()
+
+    first, second = session.get(Project, 1), session.get(Project, 2)
+    assert first.client_id == second.client_id
+    assert first.client.name == "Новый клиент"
+
+
+def test_client_summary_matches_project_balances(session):
+    clients = ClientManager(session)
+    projects = ProjectManager(session)
+    client_id = resolve_client(session.connection(), "client1@example.com")
+    balances = [
+        projects.get_project_balance(project.id)
+        for project in clients.get_client_projects(client_id)
+    ]
+
+    summary = clients.get_client_summary(client_id)
+
+    assert summary["projects"] == len(balances) == 5
+    assert summary["billed"] == pytest.approx(sum(b["total_cost"] for b in balances))
+    assert summary["lifetime_value"] == pytest.approx(
+        sum(b["total_paid"] for b in balances)
+    )
+    assert clients.get_client_summary(-1) is None
+
+
+def test_client_summaries_sorted_by_field(session):
+    summaries = ClientManager(session).get_client_summaries("billed", limit=10)
+
+    billed = [summary["billed"] for summary in summaries]
+    assert len(summaries) == 10
+    assert billed == sorted(billed, reverse=True)
@@ -0,0 +1,130 @@
+"""Курсы валют: пересчет в NumPy и в SQL"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import literal, select
+from sqlalchemy.orm import Session
+
+from src.db.currency import (
+    RateTable,
+    convert_expr,
+    import_rates,
+    latest_rates,
+    reporting_rate,
+)
+from src.db.models import ExchangeRate, Payment, Project
+
+
+@pytest.fixture
+def rates(session):
+    """Курсы USD из тестовой базы и два курса EUR"""
+    session.add_all(
+        [
+            ExchangeRate(currency="EUR", rate_date=date(2023, 6, 1), rate=80.0),
+            ExchangeRate(currency="EUR", rate_date=date(2024, 6, 1), rate=100.0),
+        ]
+    )
+    session.flush()
+    return RateTable.load(session)
+
+
+def test_rate_on_date_uses_latest_known_rate(rates):
+    assert rates.currencies == ["EUR", "USD"]
+    # До первого курса берется самый ранний
+    assert rates.rate_on("USD", date(2022, 5, 1)) == 70.0
+    assert rates.rate_on("USD", date(2023, 12, 31)) == 70.0
+    assert rates.rate_on("USD", date(2024, 1, 1)) == 90.0
+    assert rates.rate_on("RUB", date(2024, 1, 1)) == 1.0
+
+
+def test_convert_amount_between_currencies(rates):
+    on = datetime(2024, 7, 1, 15, 30)
+    assert rates.convert_amount(10.0, "USD", "USD", on) == 10.0
+    assert rates.convert_amount(10.0, "USD", "RUB", on) == 900.0
+    assert rates.convert_amount(900.0, "RUB", "USD", on) == 10.0
+    assert rates.convert_amount(10.0, "EUR", "USD", on) == pytest.approx(100 / 9)
+
+
+def test_convert_array_matches_single_amounts(rates):
+    amounts = np.array([100.0, 200.0, 300.0, 400.0])
+    currencies = np.array(["USD", "EUR", "RUB", "USD"], dtype=object)
+    dates = np.array(
+        ["2023-03-01", "2024-07-01", "2024-07-01", "2024-02-01"],
+        dtype="datetime64[D]",
+    )
+
+    for target in ("RUB", "USD", "EUR"):
+        expected = [
+            rates.convert_amount(amount, currency, target, day)
+            for amount, currency, day in zip(amounts, currencies, dates)
+        ]
+        assert rates.convert(amounts, currencies, dates, target) == pytest.approx(
+            expected
+        )
+
+
+def test_sql_conversion_matches_rate_table(session, rates):
+    on = datetime(2023, 9, 1)
+    for currency, target in [("USD", "RUB"), ("RUB", "EUR"), ("USD", "EUR")]:
+        converted = session.execute(
+            select(convert_expr(literal(50.0), literal(currency), target, literal(on)))
+        ).scalar_one()
+        assert converted == pytest.approx(
+            rates.convert_amount(50.0, currency, target, on)
+        )
+
+
+def test_latest_rates_subquery(session, rates):
+    subquery = latest_rates(date(2024, 3, 1))
+    result = dict(session.execute(select(subquery.c.currency, subquery.c.rate)).all())
+    # EUR на эту дату — последний известный курс 2023 года
+    assert result == {"EUR": 80.0, "USD": 90.0}
+
+
+def test_reporting_rate(session):
+    assert reporting_rate(session, "RUB", date(2020, 1, 1)) == 1.0
+    assert reporting_rate(session, "USD", date(2023, 6, 1)) == 70.0
+    assert reporting_rate(session, "USD") == 90.0
+
+
+def test_import_rates_recalculates_rollups(own_engine, tmp_path):
+    with Session(own_engine) as session:
+        project = Project(
+            name="Экспорт",
+            start_date=datetime(2024, 5, 1),
+            deadline=datetime(2024, 9, 1),
+            total_cost=1000.0,
+            currency="USD",
+        )
+        project.payments.append(
+            Payment(
+                amount=9000.0,
+                currency="RUB",
+                payment_date=datetime(2024, 6, 1),
+                status="completed",
+            )
+        )
+        session.add(project)
+        session.commit()
+        project_id = project.id
+
+    path = tmp_path / "rates.csv"
+    path.write_text(
+        "date;currency;rate\n2024-05-01; usd ;100,0\n2023-01-01;USD;75\n",
+        encoding="utf-8",
+    )
+    assert import_rates(own_engine, str(path), delimiter=";") == 2
+
+    with own_engine.connect() as connection:
+        paid = connection.exec_driver_sql(
+            "SELECT total_paid FROM project_rollups WHERE project_id = ?",
+            (project_id,),
+        ).scalar_one()
+        usd = connection.exec_driver_sql(
+            "SELECT rate FROM exchange_rates WHERE currency = 'USD' "
+            "ORDER BY rate_date"
+        ).scalars()
+        assert list(usd) == [75.0, 90.0, 100.0]
+    assert paid == 90.0
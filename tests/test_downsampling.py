@@ -0,0 +1,58 @@
+"""Прореживание рядов для графиков"""
+
+import numpy as np
+import pytest
+
+from src.utils.downsampling import label_indices, lttb
+
+
+@pytest.mark.parametrize("threshold", [2, 10, 20])
+def test_short_series_is_kept(threshold):
+    x = np.arange(10, dtype=np.float64)
+
+    assert lttb(x, x**2, threshold).tolist() == list(range(10))
+
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[[137, 512, 901]] = [50.0, -80.0, 30.0]
+
+    indices = lttb(x, y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    assert {137, 512, 901} <= set(indices.tolist())
+
+
+def test_lttb_on_uneven_buckets():
+    rng = np.random.default_rng(7)
+    x = np.cumsum(rng.uniform(0.1, 5.0, 101))
+    y = rng.normal(size=101)
+
+    indices = lttb(x, y, 7)
+
+    assert len(indices) == 7
+    assert np.all(np.diff(indices) > 0)
+    assert indices[-1] == 100
+
+
+@pytest.mark.parametrize(
+    "count, expected",
+    [
+        (0, []),
+        (4, [0, 1, 2, 3]),
+        (10, list(range(10))),
+        (19, [0, 2, 4, 6, 8, 10, 12, 14, 16, 18]),
+    ],
+)
+def test_label_indices(count, expected):
+    assert label_indices(count).tolist() == expected
+
+
+def test_label_indices_are_spread_evenly():
+    indices = label_indices(1000, max_labels=5)
+
+    assert indices.tolist() == [0, 250, 500, 749, 999]
@@ -0,0 +1,91 @@
+"""Публикация изменений сессии в шину после commit"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.db.events import (
+    MODIFICATIONS,
+    PAYMENTS,
+    PROJECT,
+    TIME_ENTRIES,
+    ChangeEvent,
+    bind_change_events,
+)
+from src.db.models import Modification, Payment, Project, TimeEntry
+from src.utils.event_bus import EventBus
+
+
+@pytest.fixture
+def bound(own_engine):
+    """Сессия, изменения которой попадают в список events"""
+    session = Session(own_engine)
+    bus = EventBus()
+    events = []
+    bus.subscribe(events.append)
+    bind_change_events(session, bus)
+    yield session, events
+    session.close()
+
+
+def test_events_are_published_after_commit(bound):
+    session, events = bound
+    session.add(Payment(project_id=5, amount=100.0, payment_date=datetime(2025, 1, 1)))
+    session.flush()
+
+    assert events == []
+    session.commit()
+    assert events == [ChangeEvent(5, PAYMENTS)]
+
+
+def test_rollback_drops_collected_changes(bound):
+    session, events = bound
+    session.get(Project, 5).name = "Отмененное название"
+    session.flush()
+    session.rollback()
+    session.get(Project, 6).name = "Новое название"
+    session.commit()
+
+    assert events == [ChangeEvent(6, PROJECT)]
+
+
+def test_child_rows_resolve_their_project(bound):
+    session, events = bound
+    modification = session.query(Modification).filter_by(project_id=7).first()
+    session.expunge_all()
+    # Доработка не загружена в сессию: проект ищется запросом
+    session.add(
+        TimeEntry(
+            modification_id=modification.id,
+            start_time=datetime(2025, 1, 1, 10),
+            minutes=30.0,
+            rate=1000.0,
+        )
+    )
+    session.get(Modification, modification.id).cost += 100
+    session.commit()
+
+    assert sorted(events, key=lambda e: e.topic) == [
+        ChangeEvent(7, MODIFICATIONS),
+        ChangeEvent(7, TIME_ENTRIES),
+    ]
+
+
+def test_project_deletion_hides_cascaded_changes(bound):
+    session, events = bound
+    project = session.get(Project, 8)
+    project.payments[0].amount += 1
+    session.delete(project)
+    session.commit()
+
+    assert events == [ChangeEvent(8, PROJECT, deleted=True)]
+
+
+def test_unmodified_dirty_objects_are_ignored(bound):
+    session, events = bound
+    project = session.get(Project, 9)
+    project.name = project.name
+    session.commit()
+
+    assert events == []
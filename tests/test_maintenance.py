@@ -0,0 +1,59 @@
+"""Обслуживание файла базы"""
+
+import sqlite3
+
+from sqlalchemy import create_engine
+
+from src.db.maintenance import (
+    AUTO_VACUUM_INCREMENTAL,
+    collect_stats,
+    convert_to_incremental,
+    format_report,
+    incremental_vacuum,
+    run_maintenance,
+)
+
+
+def test_maintenance_returns_free_pages(own_engine):
+    with own_engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM projects WHERE id > 50")
+    stats = collect_stats(own_engine)
+    assert stats["auto_vacuum"] == AUTO_VACUUM_INCREMENTAL
+    assert stats["freelist_pages"] > 0
+    assert not stats["analyzed"]
+
+    result = run_maintenance(own_engine)
+
+    before, after = result["before"], result["after"]
+    assert after["freelist_pages"] == 0
+    assert after["file_size"] < before["file_size"]
+    assert after["analyzed"]
+    assert after["rows"]["projects"] == 50
+    assert not result["converted"]
+    report = format_report(result)
+    assert "INCREMENTAL" in report
+    assert "База переведена" not in report
+
+
+def test_vacuum_is_limited_by_pages(own_engine):
+    with own_engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM payments")
+    free = collect_stats(own_engine)["freelist_pages"]
+
+    assert incremental_vacuum(own_engine, pages=2) == free - 2
+    assert incremental_vacuum(own_engine) == 0
+
+
+def test_old_database_is_converted_once(tmp_path):
+    path = tmp_path / "old.db"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE notes (text TEXT)")
+    connection.close()
+    engine = create_engine(f"sqlite:///{path}")
+
+    assert convert_to_incremental(engine)
+    assert not convert_to_incremental(engine)
+    with engine.connect() as connection:
+        mode = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+    assert mode == AUTO_VACUUM_INCREMENTAL
+    engine.dispose()
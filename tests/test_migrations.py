@@ -0,0 +1,157 @@
+"""Обновление базы, созданной первой версией приложения"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.db.crud import ReportManager
+from src.db.migrations import SCHEMA_VERSION
+from src.db.models import Project, create_db_engine
+
+# Схема первой версии: без валют, журнала синхронизации и сводных сумм
+BASELINE_SCHEMA = """
+CREATE TABLE projects (
+    id INTEGER NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    start_date DATETIME NOT NULL,
+    deadline DATETIME NOT NULL,
+    status VARCHAR(50),
+    total_cost FLOAT NOT NULL,
+    tech_stack TEXT,
+    description TEXT,
+    client_contacts TEXT,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE payments (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    amount FLOAT NOT NULL,
+    payment_date DATETIME NOT NULL,
+    payment_type VARCHAR(50),
+    description TEXT,
+    status VARCHAR(50),
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+CREATE TABLE modifications (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    cost FLOAT,
+    start_date DATETIME NOT NULL,
+    deadline DATETIME NOT NULL,
+    status VARCHAR(50),
+    is_paid BOOLEAN,
+    PRIMARY KEY (id),
+    FOREIGN KEY(project_id) REFERENCES projects (id)
+);
+CREATE TABLE modification_payments (
+    id INTEGER NOT NULL,
+    modification_id INTEGER NOT NULL,
+    amount FLOAT NOT NULL,
+    payment_date DATETIME NOT NULL,
+    status VARCHAR(50),
+    PRIMARY KEY (id),
+    FOREIGN KEY(modification_id) REFERENCES modifications (id)
+);
+INSERT INTO projects (id, name, start_date, deadline, status, total_cost,
+                      tech_stack, client_contacts)
+VALUES
+    (1, 'Магазин', '2024-01-01', '2024-03-01', 'active', 1000,
+     'Python, Django', 'ООО Ромашка'),
+    (2, 'Лендинг', '2024-02-01', '2024-04-01', 'active', 500,
+     'React', 'ООО Ромашка');
+INSERT INTO payments (project_id, amount, payment_date, status)
+VALUES
+    (1, 300, '2024-01-10', 'completed'),
+    (1, 400, '2024-02-10', 'pending'),
+    (2, 50, '2024-02-10', 'pending');
+INSERT INTO modifications (project_id, description, cost, start_date, deadline,
+                           status, is_paid)
+VALUES
+    (1, 'Оплачиваемая доработка', 200, '2024-01-15', '2024-01-20', 'pending', 1),
+    (2, 'Бесплатная правка', 999, '2024-02-15', '2024-02-20', 'pending', 0);
+"""
+
+
+@pytest.fixture
+def baseline_path(tmp_path) -> str:
+    """Файл базы первой версии с двумя проектами"""
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.executescript(BASELINE_SCHEMA)
+    connection.close()
+    return path
+
+
+def test_upgrade_backfills_rollups_per_project(baseline_path):
+    engine = create_db_engine(baseline_path)
+    with engine.connect() as connection:
+        rollups = connection.exec_driver_sql(
+            "SELECT project_id, total_paid, mods_cost FROM project_rollups "
+            "ORDER BY project_id"
+        ).all()
+        version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+    assert rollups == [(1, 300.0, 200.0), (2, 0.0, 0.0)]
+    assert version == SCHEMA_VERSION
+    with Session(engine) as session:
+        totals = ReportManager(session).get_totals()
+    assert totals["total_paid"] == 300.0
+    assert totals["total_cost"] == 1700.0
+    engine.dispose()
+
+
+def test_upgrade_is_idempotent(baseline_path):
+    create_db_engine(baseline_path).dispose()
+    engine = create_db_engine(baseline_path)
+    with engine.connect() as connection:
+        rollups = connection.exec_driver_sql(
+            "SELECT project_id, total_paid, mods_cost FROM project_rollups "
+            "ORDER BY project_id"
+        ).all()
+        clients = connection.exec_driver_sql("SELECT name FROM clients").scalars()
+
+    assert rollups == [(1, 300.0, 200.0), (2, 0.0, 0.0)]
+    assert list(clients) == ["ООО Ромашка"]
+    engine.dispose()
+
+
+def test_upgrade_replaces_triggers_of_older_versions(tmp_path):
+    path = str(tmp_path / "v2.db")
+    engine = create_db_engine(path)
+    with Session(engine) as session:
+        session.add(
+            Project(
+                name="Магазин",
+                start_date=datetime(2024, 1, 1),
+                deadline=datetime(2024, 3, 1),
+                total_cost=1000.0,
+                tech_stack="Python, Django",
+            )
+        )
+        session.commit()
+    # Триггер версии 2 еще не удалял связи с тегами
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TRIGGER trg_rollup_project_delete")
+        connection.exec_driver_sql(
+            "CREATE TRIGGER trg_rollup_project_delete AFTER DELETE ON projects "
+            "BEGIN DELETE FROM project_rollups WHERE project_id = OLD.id; END"
+        )
+        connection.exec_driver_sql("PRAGMA user_version = 2")
+    engine.dispose()
+
+    engine = create_db_engine(path)
+    with engine.begin() as connection:
+        links = "SELECT COUNT(*) FROM project_tags"
+        # Связи с тегами заполняются при переходе на версию 3
+        assert connection.exec_driver_sql(links).scalar() == 2
+        connection.exec_driver_sql("DELETE FROM projects")
+        assert connection.exec_driver_sql(links).scalar() == 0
+        version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+        assert version == SCHEMA_VERSION
+    engine.dispose()
@@ -0,0 +1,25 @@
+"""Постраничная загрузка платежей и доработок проекта"""
+
+import pytest
+
+from src.db.crud import ModificationManager, PaymentManager
+
+
+@pytest.mark.parametrize(
+    "manager, fetch, date_field",
+    [
+        (PaymentManager, "get_project_payments", "payment_date"),
+        (ModificationManager, "get_project_modifications", "start_date"),
+    ],
+)
+def test_pages_add_up_to_full_list(session, manager, fetch, date_field):
+    get_page = getattr(manager(session), fetch)
+    full = get_page(5)
+
+    pages = [get_page(5, offset, 2) for offset in range(0, len(full) + 2, 2)]
+
+    assert pages[-1] == []
+    assert [item.id for page in pages for item in page] == [item.id for item in full]
+    assert all(item.project_id == 5 for item in full)
+    dates = [getattr(item, date_field) for item in full]
+    assert dates == sorted(dates)
@@ -0,0 +1,30 @@
+"""Счетчик SQL-запросов для панели производительности"""
+
+from sqlalchemy import text
+
+from src.db.models import create_db_engine
+from src.utils.perf import QueryStats
+
+
+def run_queries(engine, count):
+    with engine.connect() as connection:
+        for _ in range(count):
+            connection.execute(text("SELECT 1"))
+
+
+def test_queries_are_counted_for_bound_engine(tmp_path):
+    first = create_db_engine(str(tmp_path / "a.db"))
+    second = create_db_engine(str(tmp_path / "b.db"))
+    stats = QueryStats(first)
+
+    run_queries(first, 3)
+    assert stats.snapshot()[0] == 3
+
+    stats.bind(second)
+    run_queries(first, 2)
+    run_queries(second, 4)
+    count, seconds = stats.snapshot()
+    assert count == 7
+    assert seconds > 0
+    first.dispose()
+    second.dispose()
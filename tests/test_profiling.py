@@ -0,0 +1,68 @@
+"""Профилирование: трасса Chrome и профили медленных действий"""
+
+import json
+import threading
+
+from src.utils import profiling
+from src.utils.profiling import Profiler
+
+
+class Calculator:
+    def add(self, a, b):
+        return self._check(a) + b
+
+    def _check(self, value):
+        return value
+
+
+def test_nested_spans_are_recorded_as_trace_events(tmp_path):
+    profiler = Profiler(str(tmp_path / "trace"))
+
+    with profiler.span("Открытие проекта", "ui"):
+        with profiler.span("SELECT", "sql"):
+            pass
+
+    inner, outer = profiler.events
+    assert (outer["name"], outer["cat"], inner["cat"]) == (
+        "Открытие проекта",
+        "ui",
+        "sql",
+    )
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    path = profiler.write()
+    assert json.loads(path.read_text(encoding="utf-8"))["traceEvents"] == [inner, outer]
+
+
+def test_instrument_class_wraps_public_methods(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    cls = type("Calculator", (Calculator,), dict(vars(Calculator)))
+    profiler.instrument_class(cls, "db")
+
+    assert cls().add(2, 3) == 5
+    assert [event["name"] for event in profiler.events] == ["Calculator.add"]
+    assert cls.add.__name__ == "add"
+
+
+def test_pstats_only_for_slow_actions_of_ui_thread(tmp_path, monkeypatch):
+    profiler = Profiler(str(tmp_path), pstats=True)
+    with profiler.span("быстрое", "ui"):
+        pass
+    assert list(tmp_path.glob("*.pstats")) == []
+
+    monkeypatch.setattr(profiling, "PSTATS_MIN_MS", 0)
+    with profiler.span("Сохранение: проект", "ui"):
+        with profiler.span("вложенное", "db"):
+            pass
+
+    def background():
+        with profiler.span("фон", "ui"):
+            pass
+
+    worker = threading.Thread(target=background)
+    worker.start()
+    worker.join()
+
+    assert [path.name for path in tmp_path.glob("*.pstats")] == [
+        "0001-Сохранение_проект.pstats"
+    ]
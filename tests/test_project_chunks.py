@@ -0,0 +1,34 @@
+"""Загрузка списка проектов порциями"""
+
+from sqlalchemy.orm import Session
+
+from src.db.crud import ProjectManager
+
+
+def test_chunks_cover_search_results_with_balances(session):
+    manager = ProjectManager(session)
+
+    chunks = list(manager.iter_projects("проект 1", status="active", chunk_size=7))
+
+    assert [len(chunk) for chunk in chunks[:-1]] == [7] * (len(chunks) - 1)
+    projects = [project for chunk in chunks for project, _ in chunk]
+    assert projects == manager.search_projects("проект 1", status="active")
+    for project, balance in chunks[0]:
+        assert balance == manager.get_project_balance(project.id)
+
+
+def test_changes_between_chunks_are_picked_up(own_engine):
+    with Session(own_engine) as session:
+        manager = ProjectManager(session)
+        chunks = manager.iter_projects(chunk_size=100)
+
+        first = next(chunks)
+        # Между порциями интерфейс может сохранить изменения
+        manager.delete_project(150)
+        manager.update_project(250, name="Переименован")
+        rest = [project for chunk in chunks for project, _ in chunk]
+
+        assert [project.id for project, _ in first] == list(range(1, 101))
+        ids = [project.id for project in rest]
+        assert ids == [n for n in range(101, 301) if n != 150]
+        assert rest[ids.index(250)].name == "Переименован"
@@ -0,0 +1,129 @@
+"""Фильтры и сортировка списка проектов в SQL"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from src.db.crud import PROJECT_SORTS, ProjectManager, ProjectQuery
+from src.db.models import Payment, Project
+
+CHUNK_SIZE = 40
+
+
+def listed(manager: ProjectManager, query: ProjectQuery):
+    return [row for chunk in manager.query_projects(query, CHUNK_SIZE) for row in chunk]
+
+
+@pytest.mark.parametrize("sort", PROJECT_SORTS)
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorts_keep_every_project_once(session, sort, descending):
+    manager = ProjectManager(session)
+    query = ProjectQuery(
+        statuses=("active", "overdue"), sort=sort, descending=descending
+    )
+    ids = [project.id for project, _ in listed(manager, query)]
+
+    expected = {
+        project.id
+        for project in manager.get_all_projects()
+        if project.status != "completed"
+    }
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+
+
+def test_balance_sort_and_threshold(session):
+    manager = ProjectManager(session)
+    # В рублевых проектах баланс в базовой валюте совпадает с карточкой
+    rows = [
+        (project, balance)
+        for project, balance in listed(
+            manager, ProjectQuery(max_balance=-20000.0, sort="balance")
+        )
+        if project.currency == "RUB"
+    ]
+    balances = [balance["balance"] for _, balance in rows]
+
+    assert rows
+    assert balances == sorted(balances)
+    assert all(value <= -20000.0 for value in balances)
+
+
+def test_deadline_range_and_sort(session):
+    low, high = datetime(2024, 1, 1), datetime(2024, 6, 30)
+    rows = listed(
+        ProjectManager(session),
+        ProjectQuery(deadline_after=low, deadline_before=high, sort="deadline"),
+    )
+    deadlines = [project.deadline for project, _ in rows]
+
+    assert deadlines == sorted(deadlines)
+    assert all(low <= deadline <= high for deadline in deadlines)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_last_payment_sort_puts_projects_without_payments_last(session, descending):
+    # В заполненной базе у всех проектов есть оплаты
+    unpaid = Project(
+        name="Без оплат",
+        start_date=datetime(2024, 1, 1),
+        deadline=datetime(2024, 2, 1),
+        total_cost=1000.0,
+    )
+    unpaid.payments.append(
+        Payment(amount=500.0, payment_date=datetime(2024, 1, 5), status="pending")
+    )
+    session.add(unpaid)
+    session.flush()
+
+    rows = listed(
+        ProjectManager(session),
+        ProjectQuery(sort="last_payment", descending=descending),
+    )
+    last_payments = [
+        session.scalar(
+            select(func.max(Payment.payment_date)).where(
+                Payment.project_id == project.id, Payment.status == "completed"
+            )
+        )
+        for project, _ in rows
+    ]
+    known = [moment for moment in last_payments if moment is not None]
+
+    assert rows[-1][0].id == unpaid.id
+    assert last_payments[-1] is None
+    assert known == sorted(known, reverse=descending)
+    assert last_payments[: len(known)] == known
+
+
+def test_cost_sort_with_balance_filter(session):
+    # Курсы нужны и сортировке, и фильтру баланса — соединяются один раз
+    rows = [
+        (project, balance)
+        for project, balance in listed(
+            ProjectManager(session),
+            ProjectQuery(sort="total_cost", min_balance=-100000.0, max_balance=0.0),
+        )
+        if project.currency == "RUB"
+    ]
+    costs = [project.total_cost for project, _ in rows]
+
+    assert rows
+    assert costs == sorted(costs)
+    assert all(-100000.0 <= balance["balance"] <= 0.0 for _, balance in rows)
+
+
+def test_matches_query_agrees_with_listing(session):
+    manager = ProjectManager(session)
+    query = ProjectQuery(text="проект 1", statuses=("active",), min_balance=-60000.0)
+    listed_ids = {project.id for project, _ in listed(manager, query)}
+
+    assert listed_ids
+    for project in manager.get_all_projects():
+        assert manager.matches_query(query, project.id) == (project.id in listed_ids)
+
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(ValueError):
+        ProjectQuery(sort="name")
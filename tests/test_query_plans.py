@@ -0,0 +1,186 @@
+"""Планы и число запросов менеджеров и отчетов
+
+Каждая операция выполняется на заполненной базе с перехватом SQL.
+Для частых запросов (выборки по проекту, статусу, дедлайну, тегам и
+клиенту) EXPLAIN QUERY PLAN не должен содержать полного просмотра таблицы.
+Для операций высокого уровня ограничено число запросов.
+"""
+
+import math
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+from src.db.crud import (
+    ClientManager,
+    ModificationManager,
+    PaymentManager,
+    ProjectManager,
+    ProjectQuery,
+    ReportManager,
+)
+from src.db.rollups import SECTIONS, DashboardRollups
+from src.utils.event_bus import EventBus
+from tests.conftest import SEED_PROJECTS
+
+PROJECT_ID = 7
+CLIENT_ID = 3
+MODIFICATION_IDS = [1, 2, 3]
+SINCE = datetime(2024, 6, 1)
+PAGE_SIZE = 20
+CHUNK_SIZE = 50
+
+Operation = Callable[[SimpleNamespace], object]
+
+# Частые запросы: ни одного SCAN в плане
+HOT_OPERATIONS: Dict[str, Operation] = {
+    "payments_by_project": lambda m: m.payments.get_project_payments(
+        PROJECT_ID, 0, PAGE_SIZE
+    ),
+    "payment_series": lambda m: m.payments.get_payment_series(PROJECT_ID),
+    "modifications_by_project": lambda m: m.modifications.get_project_modifications(
+        PROJECT_ID, 0, PAGE_SIZE
+    ),
+    "modification_series": lambda m: m.modifications.get_modification_series(
+        PROJECT_ID
+    ),
+    "time_totals": lambda m: m.modifications.get_time_totals(MODIFICATION_IDS),
+    "project_balance": lambda m: m.projects.get_project_balance(PROJECT_ID),
+    "projects_by_status": lambda m: next(
+        m.projects.iter_projects("", "active", CHUNK_SIZE)
+    ),
+    "projects_by_deadline": lambda m: m.projects.get_open_deadlines(SINCE),
+    "project_deadlines": lambda m: m.projects.get_open_deadlines(SINCE, PROJECT_ID),
+    "timeline_spans": lambda m: m.projects.get_timeline_spans(
+        SINCE, SINCE + timedelta(days=90)
+    ),
+    "projects_by_all_tags": lambda m: m.projects.get_projects_by_tags(
+        ["python", "django"]
+    ),
+    "projects_by_any_tag": lambda m: m.projects.get_projects_by_tags(
+        ["react", "go"], match_all=False
+    ),
+    "client_projects": lambda m: m.clients.get_client_projects(CLIENT_ID),
+    "client_summary": lambda m: m.clients.get_client_summary(CLIENT_ID),
+}
+
+# Операции высокого уровня и наибольшее допустимое число запросов
+QUERY_BUDGETS: Dict[str, Tuple[Operation, int]] = {
+    "list_projects": (
+        lambda m: list(m.projects.iter_projects(chunk_size=CHUNK_SIZE)),
+        math.ceil(SEED_PROJECTS / CHUNK_SIZE) + 1,
+    ),
+    "first_chunk": (
+        lambda m: next(m.projects.iter_projects(chunk_size=CHUNK_SIZE)),
+        1,
+    ),
+    "open_project": (
+        lambda m: (
+            m.projects.get_project_balance(PROJECT_ID),
+            m.payments.get_project_payments(PROJECT_ID, 0, PAGE_SIZE),
+            m.modifications.get_project_modifications(PROJECT_ID, 0, PAGE_SIZE),
+            m.modifications.get_time_totals(MODIFICATION_IDS),
+            m.payments.get_payment_series(PROJECT_ID),
+            m.modifications.get_modification_series(PROJECT_ID),
+        ),
+        7,
+    ),
+    # Сортировка не по id: запрос упорядоченных id и по запросу на порцию
+    "list_projects_by_balance": (
+        lambda m: list(
+            m.projects.query_projects(ProjectQuery(sort="balance"), CHUNK_SIZE)
+        ),
+        math.ceil(SEED_PROJECTS / CHUNK_SIZE) + 1,
+    ),
+    "first_chunk_by_last_payment": (
+        lambda m: next(
+            m.projects.query_projects(
+                ProjectQuery(sort="last_payment", descending=True), CHUNK_SIZE
+            )
+        ),
+        2,
+    ),
+    "dashboard": (
+        lambda m: [
+            DashboardRollups(m.reports, EventBus()).get(section) for section in SECTIONS
+        ],
+        len(SECTIONS) + 2,
+    ),
+    "client_summaries": (lambda m: m.clients.get_client_summaries(), 1),
+    "tag_counts": (lambda m: m.projects.get_tag_counts(), 1),
+    "statement_rows": (
+        lambda m: m.reports.get_statement_rows(
+            datetime(2024, 3, 1), datetime(2024, 4, 1)
+        ),
+        1,
+    ),
+    "statement_rows_usd": (
+        lambda m: ReportManager(m.session, "USD").get_statement_rows(
+            datetime(2024, 3, 1), datetime(2024, 4, 1)
+        ),
+        2,
+    ),
+}
+
+
+@pytest.fixture
+def managers(session) -> SimpleNamespace:
+    return SimpleNamespace(
+        session=session,
+        projects=ProjectManager(session),
+        payments=PaymentManager(session),
+        modifications=ModificationManager(session),
+        reports=ReportManager(session),
+        clients=ClientManager(session),
+    )
+
+
+def query_plan(engine, statement: str, parameters: tuple) -> List[str]:
+    """Строки EXPLAIN QUERY PLAN для запроса"""
+    with engine.connect() as connection:
+        return [
+            row[3]
+            for row in connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        ]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    """Шаги плана с полным просмотром таблицы или индекса"""
+    return [
+        step
+        for step in plan
+        if step.startswith("SCAN ") and not step.startswith("SCAN CONSTANT ROW")
+    ]
+
+
+@pytest.mark.parametrize("name", HOT_OPERATIONS)
+def test_hot_queries_use_indexes(name, managers, capture, engine):
+    with capture:
+        HOT_OPERATIONS[name](managers)
+
+    assert capture.selects, "операция не выполнила ни одного запроса"
+    for statement, parameters in capture.selects:
+        plan = query_plan(engine, statement, parameters)
+        assert not full_scans(plan), (
+            f"{name}: полный просмотр вместо поиска по индексу\n"
+            f"{statement}\n" + "\n".join(plan)
+        )
+
+
+@pytest.mark.parametrize("name", QUERY_BUDGETS)
+def test_query_budget(name, managers, capture, engine):
+    operation, budget = QUERY_BUDGETS[name]
+    with capture:
+        operation(managers)
+
+    assert len(capture.statements) <= budget, (
+        f"{name}: {len(capture.statements)} запросов при допустимых {budget}\n"
+        + "\n\n".join(statement for statement, _ in capture.statements)
+    )
+    # Каждый перехваченный запрос должен иметь корректный план
+    for statement, parameters in capture.selects:
+        assert query_plan(engine, statement, parameters)
@@ -0,0 +1,102 @@
+"""Сверка выписки банка с ожидающими платежами"""
+
+from datetime import date, datetime
+
+import pytest
+
+from src.db.models import Payment
+from src.db.reconcile import (
+    MODIFICATION_PAYMENT,
+    PAYMENT,
+    BankTransaction,
+    PendingPayment,
+    apply_matches,
+    read_statement,
+    reconcile,
+)
+
+
+def pending(item_id: int, amount: float, day: date, kind: str = PAYMENT):
+    return PendingPayment(
+        kind=kind,
+        item_id=item_id,
+        project_id=1,
+        project_name="Проект",
+        amount=amount,
+        currency="RUB",
+        payment_date=datetime.combine(day, datetime.min.time()),
+    )
+
+
+def transaction(line: int, amount: float, day: date, currency: str = "RUB"):
+    return BankTransaction(line=line, date=day, amount=amount, currency=currency)
+
+
+def test_reconcile_splits_matched_ambiguous_and_unmatched():
+    payments = [
+        pending(1, 1000.0, date(2024, 3, 1)),
+        # Две одинаковые суммы рядом по датам — на проверку
+        pending(2, 500.0, date(2024, 3, 5)),
+        pending(3, 500.0, date(2024, 3, 7)),
+        pending(4, 250.0, date(2024, 3, 1), MODIFICATION_PAYMENT),
+    ]
+    result = reconcile(
+        [
+            transaction(2, 1000.0, date(2024, 3, 3)),
+            transaction(3, 500.0, date(2024, 3, 6)),
+            transaction(4, 250.0, date(2024, 3, 2)),
+            # Вне окна дат, другая валюта и другая сумма
+            transaction(5, 1000.0, date(2024, 5, 1)),
+            transaction(6, 1000.0, date(2024, 3, 1), "USD"),
+            transaction(7, 999.99, date(2024, 3, 1)),
+        ],
+        payments,
+    )
+
+    assert [(t.line, p.item_id) for t, p in result.matched] == [(2, 1), (4, 4)]
+    assert [(t.line, [p.item_id for p in c]) for t, c in result.ambiguous] == [
+        (3, [2, 3])
+    ]
+    assert [t.line for t in result.unmatched] == [5, 6, 7]
+
+
+def test_payment_claimed_by_two_transactions_needs_review():
+    result = reconcile(
+        [
+            transaction(2, 1000.0, date(2024, 3, 1)),
+            transaction(3, 1000.0, date(2024, 3, 2)),
+        ],
+        [pending(1, 1000.0, date(2024, 3, 1))],
+    )
+
+    assert not result.matched
+    assert len(result.ambiguous) == 2
+
+
+def test_read_statement_detects_delimiter_and_number_format(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(
+        "date;amount;currency;description\n"
+        "01.03.2024;12 345,50;usd;Оплата по счету\n"
+        "02.03.2024;-100;RUB;Комиссия\n"
+        "2024-03-03;700;;\n",
+        encoding="utf-8",
+    )
+
+    assert read_statement(str(path)) == [
+        BankTransaction(2, date(2024, 3, 1), 12345.5, "USD", "Оплата по счету"),
+        BankTransaction(4, date(2024, 3, 3), 700.0, "RUB", ""),
+    ]
+
+
+def test_payment_chosen_for_two_transactions_is_rejected(session):
+    payment = pending(1, 1000.0, date(2024, 3, 1))
+    matches = [
+        (transaction(2, 1000.0, date(2024, 3, 1)), payment),
+        (transaction(3, 1000.0, date(2024, 3, 2)), payment),
+    ]
+
+    with pytest.raises(ValueError):
+        apply_matches(session, matches)
+
+    assert session.get(Payment, 1).status == "pending"
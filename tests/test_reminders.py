@@ -0,0 +1,107 @@
+"""Очередь напоминаний о дедлайнах"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.reminders import ReminderScheduler
+
+NOW = datetime(2025, 3, 1, 12, 0)
+
+
+class Clock:
+    """Подменяемое текущее время"""
+
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock(NOW)
+
+
+@pytest.fixture
+def scheduler(clock):
+    return ReminderScheduler(lead=timedelta(days=1), clock=clock)
+
+
+def messages(reminders):
+    return [(r.kind, r.item_id, r.due) for r in reminders]
+
+
+def test_lead_and_due_reminders_in_order(scheduler, clock):
+    scheduler.load(
+        [
+            ("project", 1, 1, "Магазин", NOW + timedelta(days=3)),
+            ("modification", 5, 1, "Доработка", NOW + timedelta(days=2)),
+        ]
+    )
+
+    assert scheduler.pop_due() == []
+    assert scheduler.seconds_until_next() == timedelta(days=1).total_seconds()
+    clock.now = NOW + timedelta(days=2, hours=1)
+    assert messages(scheduler.pop_due()) == [
+        ("modification", 5, False),
+        ("project", 1, False),
+        ("modification", 5, True),
+    ]
+    clock.now = NOW + timedelta(days=3)
+    assert messages(scheduler.pop_due()) == [("project", 1, True)]
+    assert scheduler.next_due() is None
+
+
+def test_missed_lead_is_given_at_once_and_past_deadlines_skipped(scheduler):
+    scheduler.load(
+        [
+            ("project", 1, 1, "Скоро", NOW + timedelta(hours=3)),
+            ("project", 2, 2, "Прошел", NOW - timedelta(hours=1)),
+        ]
+    )
+
+    assert messages(scheduler.pop_due()) == [("project", 1, False)]
+    assert scheduler.next_due() == NOW + timedelta(hours=3)
+
+
+def test_changed_deadline_replaces_stale_entries(scheduler, clock):
+    scheduler.load(
+        [
+            ("project", 1, 1, "Магазин", NOW + timedelta(days=2)),
+            ("modification", 5, 1, "Доработка", NOW + timedelta(days=2)),
+            ("project", 2, 2, "Лендинг", NOW + timedelta(days=2)),
+        ]
+    )
+    # Доработка закрыта, дедлайн проекта перенесен
+    scheduler.update_project(
+        1, [("project", 1, 1, "Магазин", NOW + timedelta(days=10))]
+    )
+
+    clock.now = NOW + timedelta(days=5)
+    assert messages(scheduler.pop_due()) == [
+        ("project", 2, False),
+        ("project", 2, True),
+    ]
+    assert scheduler.next_due() == NOW + timedelta(days=9)
+
+
+def test_delivered_reminders_are_not_repeated_after_reload(scheduler, clock):
+    rows = [("project", 1, 1, "Магазин", NOW + timedelta(hours=3))]
+    scheduler.load(rows)
+    assert len(scheduler.pop_due()) == 1
+
+    scheduler.load(rows)
+    assert scheduler.pop_due() == []
+    clock.now = NOW + timedelta(hours=3)
+    assert messages(scheduler.pop_due()) == [("project", 1, True)]
+
+
+def test_reminder_messages():
+    scheduler = ReminderScheduler(clock=lambda: NOW)
+    scheduler.load([("modification", 5, 1, "Правка", NOW)])
+
+    lead, due = scheduler.pop_due()
+    assert lead.message == "Доработка «Правка»: дедлайн 01.03.2025"
+    assert due.message == "Доработка «Правка»: дедлайн наступил (01.03.2025)"
@@ -0,0 +1,96 @@
+"""Сводные отчеты панели показателей"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from src.db.crud import ProjectManager, ReportManager
+from src.db.currency import RateTable
+from src.db.models import Payment, Project
+
+TODAY = datetime(2024, 6, 1)
+
+
+@pytest.fixture
+def balances(session):
+    """Балансы всех проектов в рублях, посчитанные по одному"""
+    rates = RateTable.load(session)
+    projects = ProjectManager(session)
+    result = []
+    for project in session.scalars(select(Project).order_by(Project.id)):
+        factor = rates.convert_amount(1.0, project.currency, "RUB", datetime.now())
+        balance = projects.get_project_balance(project.id)
+        result.append(
+            (
+                project,
+                balance["total_cost"] * factor,
+                balance["total_paid"] * factor,
+            )
+        )
+    return result
+
+
+def test_totals_match_project_balances(session, balances):
+    totals = ReportManager(session).get_totals()
+
+    assert totals["projects"] == len(balances) == 300
+    assert totals["active_projects"] == 100
+    assert totals["total_cost"] == pytest.approx(sum(b[1] for b in balances))
+    assert totals["total_paid"] == pytest.approx(sum(b[2] for b in balances))
+    assert totals["outstanding"] == pytest.approx(
+        sum(max(cost - paid, 0.0) for _, cost, paid in balances)
+    )
+
+
+def test_receivables_aging_buckets(session, balances):
+    aging = ReportManager(session).get_receivables_aging(TODAY)
+
+    debts = [
+        ((TODAY - project.deadline).total_seconds() / 86400, cost - paid)
+        for project, cost, paid in balances
+        if cost > paid
+    ]
+    assert [bucket["bucket"] for bucket in aging] == [
+        "Срок не наступил",
+        "1–30 дней",
+        "31–60 дней",
+        "61–90 дней",
+        "Более 90 дней",
+    ]
+    assert aging[0]["projects"] == sum(1 for days, _ in debts if days <= 0)
+    assert aging[-1]["projects"] == sum(1 for days, _ in debts if days > 90)
+    assert sum(bucket["projects"] for bucket in aging) == len(debts)
+    assert sum(bucket["amount"] or 0.0 for bucket in aging) == pytest.approx(
+        sum(amount for _, amount in debts)
+    )
+
+
+def test_revenue_by_month_converts_each_payment(session):
+    rates = RateTable.load(session)
+    since = datetime(2024, 1, 1)
+    expected = {}
+    for payment in session.scalars(
+        select(Payment).where(
+            Payment.status == "completed", Payment.payment_date >= since
+        )
+    ):
+        month = payment.payment_date.strftime("%Y-%m")
+        expected[month] = expected.get(month, 0.0) + rates.convert_amount(
+            payment.amount, payment.currency, "USD", payment.payment_date
+        )
+
+    revenue = ReportManager(session, "USD").get_revenue_by_month(since)
+
+    assert [month for month, _ in revenue] == sorted(expected)
+    assert dict(revenue) == pytest.approx(expected)
+
+
+def test_top_clients_by_lifetime_value(session):
+    top = ReportManager(session).get_top_clients(limit=3)
+
+    assert len(top) == 3
+    assert [value for _, value, _ in top] == sorted(
+        (value for _, value, _ in top), reverse=True
+    )
+    assert all(projects == 5 for _, _, projects in top)
@@ -0,0 +1,94 @@
+"""Сводные суммы проектов, поддерживаемые триггерами"""
+
+from datetime import datetime
+
+from sqlalchemy import select, text
+
+from src.db.migrations import RECALC_ALL_ROLLUPS
+from src.db.models import Modification, Payment, Project, ProjectRollup, TimeEntry
+
+
+def rollups(session):
+    return session.execute(
+        text("SELECT project_id, total_paid, mods_cost FROM project_rollups")
+    ).all()
+
+
+def test_new_project_starts_with_zero_rollup(session):
+    project = Project(
+        name="Новый",
+        start_date=datetime(2025, 1, 1),
+        deadline=datetime(2025, 2, 1),
+        total_cost=1000.0,
+    )
+    session.add(project)
+    session.flush()
+
+    rollup = session.get(ProjectRollup, project.id)
+    assert (rollup.total_paid, rollup.mods_cost) == (0.0, 0.0)
+
+
+def test_rub_project_rollup_matches_its_rows(session):
+    # Проект 2 в рублях, как и его платежи и доработки
+    project = session.get(Project, 2)
+    paid = sum(p.amount for p in project.payments if p.status == "completed")
+    mods = sum(
+        m.cost + sum(t.minutes * t.rate / 60 for t in m.time_entries)
+        for m in project.modifications
+        if m.is_paid
+    )
+
+    rollup = session.get(ProjectRollup, 2)
+    assert rollup.total_paid == paid
+    assert rollup.mods_cost == mods
+
+
+def first_row(session, model, project_id):
+    return session.scalars(
+        select(model).where(model.project_id == project_id).order_by(model.id)
+    ).first()
+
+
+def test_triggers_match_full_recalculation(session):
+    # Курсы тестовой базы загружены в обход import_rates
+    session.execute(text(RECALC_ALL_ROLLUPS))
+
+    # Каждое изменение затрагивает свой проект, чтобы триггеры
+    # не пересчитывали суммы друг за друга
+    payment = first_row(session, Payment, 3)
+    payment.status = "completed" if payment.status == "pending" else "pending"
+    first_row(session, Payment, 13).project_id = 4
+    session.delete(first_row(session, Payment, 5).project.payments[1])
+    session.add(
+        Payment(
+            project_id=6,
+            amount=555.0,
+            payment_date=datetime(2024, 5, 1),
+            status="completed",
+        )
+    )
+    first_row(session, Modification, 7).is_paid = False
+    first_row(session, Modification, 8).cost += 250
+    session.delete(first_row(session, Modification, 9).time_entries[0])
+    session.add(
+        TimeEntry(
+            modification_id=first_row(session, Modification, 11).id,
+            start_time=datetime(2024, 6, 1),
+            minutes=90.0,
+            rate=2000.0,
+        )
+    )
+    # Смена валюты пересчитывает суммы долларового проекта по курсу
+    session.get(Project, 21).currency = "RUB"
+    session.flush()
+
+    incremental = rollups(session)
+    session.execute(text(RECALC_ALL_ROLLUPS))
+    assert rollups(session) == incremental
+
+
+def test_project_deletion_removes_rollup(session):
+    session.delete(session.get(Project, 12))
+    session.flush()
+
+    assert session.get(ProjectRollup, 12) is None
@@ -0,0 +1,80 @@
+"""Графики повторяющихся платежей"""
+
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.db.crud import ProjectManager, ScheduleManager
+from src.db.models import Payment, PaymentSchedule
+from src.utils.recurrence import occurrences
+
+NOW = datetime(2026, 1, 1)
+
+
+def test_monthly_dates_keep_day_of_month():
+    dates = list(occurrences(datetime(2024, 1, 31), "monthly", datetime(2024, 5, 1)))
+
+    assert dates == [
+        datetime(2024, 1, 31),
+        datetime(2024, 2, 29),
+        datetime(2024, 3, 31),
+        datetime(2024, 4, 30),
+    ]
+
+
+@pytest.mark.parametrize("cadence", ["weekly", "monthly", "quarterly", "yearly"])
+def test_occurrences_resume_after_date(cadence):
+    start = datetime(2024, 1, 31)
+    dates = list(itertools.islice(occurrences(start, cadence), 40))
+
+    for index, after in enumerate(dates[:-1]):
+        assert next(occurrences(start, cadence, after=after)) == dates[index + 1]
+
+
+def test_unknown_cadence_is_rejected():
+    with pytest.raises(ValueError):
+        next(occurrences(NOW, "daily"))
+
+
+def scheduled_dates(session: Session, schedule_id: int):
+    return list(
+        session.scalars(
+            select(Payment.payment_date)
+            .where(Payment.schedule_id == schedule_id)
+            .order_by(Payment.payment_date)
+        )
+    )
+
+
+def test_only_horizon_is_materialized(own_engine):
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=5 * 365)
+    with Session(own_engine) as session:
+        manager = ScheduleManager(session)
+        # Пятилетний график: в базе только платежи до горизонта
+        schedule = manager.create_schedule(1, 1000.0, "monthly", start, end)
+        materialized = scheduled_dates(session, schedule.id)
+        horizon = schedule.materialized_until
+        assert materialized == list(occurrences(start, "monthly", horizon))
+        assert len(materialized) < 12
+
+        # Остальные платежи вычисляются лениво и продолжают созданные
+        expected = [moment for moment, _ in manager.iter_expected_payments()]
+        assert materialized + expected == list(occurrences(start, "monthly", end))
+
+        # Повторный запуск не создает дублей
+        assert manager.materialize(horizon) == []
+        assert manager.materialize(horizon + timedelta(days=365)) == [1]
+        dates = scheduled_dates(session, schedule.id)
+        assert len(dates) == len(set(dates)) == len(materialized) + 12
+
+
+def test_deleting_project_removes_schedules(own_engine):
+    with Session(own_engine) as session:
+        ScheduleManager(session).create_schedule(1, 500.0, "yearly", NOW)
+        ProjectManager(session).delete_project(1)
+
+        assert not session.scalar(select(func.count()).select_from(PaymentSchedule))
@@ -0,0 +1,33 @@
+"""Поиск проектов по тексту и статусу"""
+
+from src.db.crud import ProjectManager
+
+
+def numbers(projects):
+    return sorted(int(project.name.split()[-1]) for project in projects)
+
+
+def test_search_ignores_case_of_cyrillic(session):
+    manager = ProjectManager(session)
+
+    found = manager.search_projects("ПРОЕКТ 12")
+
+    assert numbers(found) == [12] + list(range(120, 130))
+    assert numbers(manager.search_projects("проект 12")) == numbers(found)
+
+
+def test_search_matches_description_and_status(session):
+    manager = ProjectManager(session)
+
+    found = manager.search_projects("описание проекта 7", status="overdue")
+
+    # Статус проекта чередуется по номеру: active, completed, overdue
+    assert numbers(found) == [n for n in [7] + list(range(70, 80)) if n % 3 == 2]
+    assert all(project.status == "overdue" for project in found)
+
+
+def test_wildcards_are_searched_literally(session):
+    manager = ProjectManager(session)
+
+    assert manager.search_projects("%") == []
+    assert manager.search_projects("проект_1") == []
@@ -0,0 +1,101 @@
+"""Колоночный снимок: частичное обновление совпадает с базой"""
+
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.db import snapshot
+from src.db.models import Payment
+from src.db.snapshot import Snapshot, build_snapshot
+from src.utils.analytics import monthly_revenue
+
+
+def payment_rows(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT id, amount, status FROM payments ORDER BY id")
+        ).all()
+
+
+def test_incremental_refresh_matches_database(own_engine, tmp_path):
+    directory = str(tmp_path / "snapshot")
+    build_snapshot(own_engine, directory)
+
+    with Session(own_engine) as session:
+        first, second = session.query(Payment).order_by(Payment.id).limit(2).all()
+        first.amount += 100
+        session.delete(second)
+        session.add(
+            Payment(
+                project_id=1,
+                amount=777.0,
+                payment_date=datetime(2025, 1, 15),
+                status="completed",
+            )
+        )
+        session.commit()
+
+    manifest = build_snapshot(own_engine, directory)
+    payments = Snapshot(directory)["payments"]
+    rows = payment_rows(own_engine)
+
+    assert manifest["tables"]["payments"]["rows"] == len(rows)
+    assert payments["id"].tolist() == [row.id for row in rows]
+    assert np.allclose(payments["amount"], [row.amount for row in rows])
+    assert payments["status"].tolist() == [row.status for row in rows]
+
+
+def test_monthly_revenue_in_base_currency(engine, tmp_path):
+    directory = str(tmp_path / "snapshot")
+    build_snapshot(engine, directory)
+    _, totals = monthly_revenue(Snapshot(directory))
+
+    with engine.connect() as connection:
+        expected = connection.execute(
+            text(
+                "SELECT SUM(amount) FROM payments "
+                "WHERE status = 'completed' AND currency = 'RUB'"
+            )
+        ).scalar()
+    # В тестовой базе платежи заведены в рублях
+    assert totals.sum() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("change_existing", [False, True])
+def test_memory_maps_are_closed_before_files_are_replaced(
+    own_engine, tmp_path, monkeypatch, change_existing
+):
+    directory = str(tmp_path / "snapshot")
+    build_snapshot(own_engine, directory)
+    with Session(own_engine) as session:
+        if change_existing:
+            session.query(Payment).order_by(Payment.id).first().amount += 1
+        else:
+            session.add(
+                Payment(project_id=1, amount=1.0, payment_date=datetime(2025, 1, 1))
+            )
+        session.commit()
+
+    # В Windows файл с открытым memory map заменить нельзя
+    opened = []
+    read_columns = snapshot._read_columns
+    replace = snapshot.os.replace
+
+    def tracked_read(*args, **kwargs):
+        columns = read_columns(*args, **kwargs)
+        opened.extend(weakref.ref(array) for array in columns.values())
+        return columns
+
+    def checked_replace(source, target):
+        assert all(ref() is None for ref in opened)
+        replace(source, target)
+
+    monkeypatch.setattr(snapshot, "_read_columns", tracked_read)
+    monkeypatch.setattr(snapshot.os, "replace", checked_replace)
+    build_snapshot(own_engine, directory)
+
+    assert opened
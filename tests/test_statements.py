@@ -0,0 +1,127 @@
+"""Выписки клиентам за месяц"""
+
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.crud import ReportManager
+from src.db.models import Modification, Project, TimeEntry
+from src.utils.statements import (
+    build_statements,
+    generate_statements,
+    month_period,
+    render_html,
+    render_pdf,
+)
+
+START, END = datetime(2024, 2, 1), datetime(2024, 3, 1)
+
+
+def row(client_id, name, total_cost, total_paid, period_paid=0.0):
+    return SimpleNamespace(
+        client_id=client_id,
+        client_name=f"Клиент <{client_id}>",
+        name=name,
+        status="active",
+        deadline=datetime(2024, 4, 1),
+        total_cost=total_cost,
+        period_paid=period_paid,
+        period_mods_cost=0.0,
+        total_paid=total_paid,
+    )
+
+
+@pytest.fixture
+def statements():
+    rows = [
+        row(1, "Магазин", 1000.0, 300.0, period_paid=100.0),
+        row(2, "Лендинг", 500.0, 500.0),
+        row(1, "Бот & API", 200.0, 250.0),
+    ]
+    return build_statements(rows, START, END, "USD")
+
+
+def test_month_period():
+    assert month_period("2024-02") == (START, END)
+    assert month_period("2023-12") == (datetime(2023, 12, 1), datetime(2024, 1, 1))
+
+
+def test_rows_are_grouped_by_client(statements):
+    first, second = statements
+
+    assert [line["name"] for line in first["lines"]] == ["Магазин", "Бот & API"]
+    assert first["totals"]["total_cost"] == 1200.0
+    assert first["totals"]["period_paid"] == 100.0
+    assert first["totals"]["outstanding"] == 650.0
+    assert second["totals"]["outstanding"] == 0.0
+    assert first["currency"] == "USD"
+
+
+def test_html_statement(statements):
+    page = render_html(statements[0])
+
+    assert "Клиент &lt;1&gt;" in page
+    assert "Бот &amp; API" in page
+    # Конец периода в выборку не входит
+    assert "01.02.2024 — 29.02.2024" in page
+    assert 'class="num debt">700.00' in page
+    assert 'class="num ">-50.00' in page
+
+
+def test_pdf_statement(statements):
+    assert render_pdf(statements[1]).startswith(b"%PDF")
+
+
+def test_generate_statements_for_every_client(session, tmp_path):
+    reports = ReportManager(session)
+    rows = reports.get_statement_rows(START, END)
+    clients = {row.client_id for row in rows}
+
+    paths = generate_statements(
+        reports, START, END, str(tmp_path), formats=("html",), workers=1
+    )
+
+    assert len(paths) == len(clients) > 0
+    assert all(path.endswith(".html") for path in paths)
+    assert sorted(tmp_path.iterdir()) == sorted(Path(path) for path in paths)
+
+
+def test_period_modifications_include_billed_time(session):
+    client_id = session.get(Project, 1).client_id
+    modification = Modification(
+        description="Поддержка",
+        start_date=datetime(2024, 1, 20),
+        deadline=datetime(2024, 3, 20),
+        cost=1000.0,
+        currency="RUB",
+        is_paid=True,
+    )
+    modification.time_entries = [
+        TimeEntry(start_time=datetime(2024, 2, 10), minutes=90.0, rate=2000.0),
+        TimeEntry(start_time=datetime(2024, 1, 21), minutes=60.0, rate=2000.0),
+    ]
+    project = Project(
+        name="Почасовой",
+        start_date=datetime(2024, 1, 1),
+        deadline=datetime(2024, 6, 1),
+        total_cost=0.0,
+        currency="RUB",
+        status="completed",
+        client_id=client_id,
+        modifications=[modification],
+    )
+    session.add(project)
+    session.flush()
+
+    (row,) = [
+        row
+        for row in ReportManager(session).get_statement_rows(START, END)
+        if row.project_id == project.id
+    ]
+
+    # Фиксированная часть начата до периода, в период попадает только время
+    assert row.period_mods_cost == 3000.0
+    assert row.period_modifications == 1
+    assert row.total_cost == 6000.0
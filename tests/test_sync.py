@@ -0,0 +1,130 @@
+"""Обмен изменениями между двумя копиями базы"""
+
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.db.models import Payment, Project, create_db_engine
+from src.db.sync import clone_database, export_changes, import_changes
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Исходная база с одним проектом и ее копия"""
+    source_path = str(tmp_path / "a.db")
+    engine = create_db_engine(source_path)
+    with Session(engine) as session:
+        session.add(
+            Project(
+                name="Магазин",
+                start_date=datetime(2024, 1, 1),
+                deadline=datetime(2024, 3, 1),
+                total_cost=1000.0,
+                client_contacts="ООО Ромашка",
+            )
+        )
+        session.commit()
+    engine.dispose()
+
+    target_path = str(tmp_path / "b.db")
+    clone_database(source_path, target_path)
+    engines = create_db_engine(source_path), create_db_engine(target_path)
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def project_rows(engine):
+    with Session(engine) as session:
+        return [
+            (project.uuid, project.name, project.total_cost, len(project.payments))
+            for project in session.query(Project).order_by(Project.uuid)
+        ]
+
+
+def exchange(first, second, directory):
+    """Выгрузка изменений в обе стороны; статистика загрузки"""
+    first_file = str(directory / "first.jsonl.gz")
+    second_file = str(directory / "second.jsonl.gz")
+    export_changes(first, first_file)
+    export_changes(second, second_file)
+    return import_changes(second, first_file), import_changes(first, second_file)
+
+
+def test_clone_starts_in_sync(databases, tmp_path):
+    source, target = databases
+
+    assert project_rows(source) == project_rows(target)
+    stats = exchange(source, target, tmp_path)
+    assert [s["applied"] for s in stats] == [0, 0]
+
+
+def test_changes_travel_both_ways(databases, tmp_path):
+    source, target = databases
+    with Session(source) as session:
+        project = session.query(Project).one()
+        project.payments.append(
+            Payment(amount=300.0, payment_date=datetime(2024, 1, 10))
+        )
+        session.commit()
+    with Session(target) as session:
+        session.add(
+            Project(
+                name="Лендинг",
+                start_date=datetime(2024, 2, 1),
+                deadline=datetime(2024, 4, 1),
+                total_cost=500.0,
+            )
+        )
+        session.commit()
+
+    to_target, to_source = exchange(source, target, tmp_path)
+
+    assert to_target["applied"] == 1
+    assert to_source["applied"] == 1
+    rows = project_rows(source)
+    assert rows == project_rows(target)
+    assert sorted((name, payments) for _, name, _, payments in rows) == [
+        ("Лендинг", 0),
+        ("Магазин", 1),
+    ]
+
+
+def test_conflict_keeps_whole_later_row(databases, tmp_path):
+    source, target = databases
+    with Session(source) as session:
+        session.query(Project).one().name = "Интернет-магазин"
+        session.commit()
+    # Время изменения хранится с точностью до миллисекунды
+    time.sleep(0.01)
+    with Session(target) as session:
+        session.query(Project).one().total_cost = 1500.0
+        session.commit()
+
+    to_target, to_source = exchange(source, target, tmp_path)
+
+    assert to_target["conflicts"] == 1
+    assert to_source["applied"] == 1
+    # Строка заменяется целиком: переименование из первой базы потеряно
+    assert [row[1:] for row in project_rows(source)] == [("Магазин", 1500.0, 0)]
+    assert project_rows(source) == project_rows(target)
+
+
+def test_reimport_is_noop(databases, tmp_path):
+    source, target = databases
+    with Session(source) as session:
+        session.query(Project).one().total_cost = 2000.0
+        session.commit()
+    path = str(tmp_path / "delta.jsonl.gz")
+    export_changes(source, path)
+
+    first = import_changes(target, path)
+    rows = project_rows(target)
+    second = import_changes(target, path)
+
+    assert first["applied"] == 1
+    assert second["applied"] == 0
+    assert second["skipped"] == 1
+    assert project_rows(target) == rows
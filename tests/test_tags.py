@@ -0,0 +1,55 @@
+"""Теги проектов из технологического стека"""
+
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.db.crud import ProjectManager
+
+
+def project_numbers(projects):
+    return {project.id - 1 for project in projects}
+
+
+def test_projects_with_all_or_any_tags(session):
+    manager = ProjectManager(session)
+
+    both = manager.get_projects_by_tags([" Python ", "DJANGO"])
+    either = manager.get_projects_by_tags(["python", "react"], match_all=False)
+
+    # Стеки в тестовой базе чередуются по номеру проекта
+    assert project_numbers(both) == {n for n in range(300) if n % 5 == 0}
+    assert project_numbers(either) == {n for n in range(300) if n % 5 != 3}
+    assert manager.get_projects_by_tags(["python", "cobol"]) == []
+
+
+def test_tag_counts(session):
+    manager = ProjectManager(session)
+
+    assert manager.get_tag_counts(limit=3) == [
+        ("django", 120),
+        ("python", 120),
+        ("react", 120),
+    ]
+    assert len(manager.get_tag_counts()) == 8
+
+
+def test_changed_stack_refreshes_and_prunes_tags(own_engine):
+    with Session(own_engine) as session:
+        manager = ProjectManager(session)
+        project = manager.create_project(
+            name="Сервис",
+            start_date=datetime(2024, 1, 1),
+            deadline=datetime(2024, 3, 1),
+            total_cost=1000.0,
+            tech_stack="Rust; Python",
+        )
+        assert sorted(tag.name for tag in project.tags) == ["python", "rust"]
+        assert ("rust", 1) in manager.get_tag_counts()
+
+        manager.update_project(project.id, tech_stack="Python, Go")
+
+        assert sorted(tag.name for tag in project.tags) == ["go", "python"]
+        counts = dict(manager.get_tag_counts())
+        assert "rust" not in counts
+        assert counts["go"] == 61
@@ -0,0 +1,64 @@
+"""Раскладка и выборка отрезков шкалы времени"""
+
+from datetime import datetime
+
+from src.utils.timeline import TimelineModel, assign_lanes, to_days
+
+
+def span(kind, item_id, project_id, start, end, status="active"):
+    return (kind, item_id, project_id, f"{kind} {item_id}", start, end, status)
+
+
+def test_assign_lanes_reuses_freed_lanes():
+    lanes = assign_lanes([(0, 10), (2, 3), (5, 15), (11, 20), (16, 30)])
+
+    assert lanes == [0, 1, 1, 0, 1]
+
+
+def test_project_and_modifications_share_a_lane():
+    model = TimelineModel(
+        [
+            span("project", 1, 1, datetime(2024, 1, 1), datetime(2024, 2, 1)),
+            span("modification", 7, 1, datetime(2024, 1, 20), datetime(2024, 3, 1)),
+            # Пересекается только с доработкой первого проекта
+            span("project", 2, 2, datetime(2024, 2, 15), datetime(2024, 4, 1)),
+            span("project", 3, 3, datetime(2024, 5, 1), datetime(2024, 5, 1)),
+        ]
+    )
+
+    assert model.lanes.tolist() == [0, 0, 1, 0]
+    assert model.lane_count == 2
+    # Однодневный отрезок остается видимым
+    assert model.ends[3] - model.starts[3] == 1
+
+
+def test_visible_culls_by_time_and_lane():
+    model = TimelineModel(
+        [
+            span("project", 1, 1, datetime(2024, 1, 1), datetime(2024, 2, 1)),
+            span("project", 2, 2, datetime(2024, 1, 10), datetime(2024, 3, 1)),
+            span("project", 3, 3, datetime(2024, 6, 1), datetime(2024, 7, 1)),
+        ]
+    )
+    t0, t1 = to_days(datetime(2024, 1, 20)), to_days(datetime(2024, 2, 20))
+
+    assert model.visible(t0, t1, 0, 5).tolist() == [0, 1]
+    assert model.visible(t0, t1, 0.5, 5).tolist() == [0, 1]
+    assert model.visible(t0, t1, 1, 5).tolist() == [1]
+
+
+def test_density_counts_running_projects_per_band():
+    rows = [
+        span("project", i, i, datetime(2024, 1, 1), datetime(2024, 1, 11))
+        for i in range(3)
+    ]
+    rows.append(span("modification", 9, 0, datetime(2024, 1, 2), datetime(2024, 1, 3)))
+    model = TimelineModel(rows)
+    t0 = to_days(datetime(2024, 1, 1))
+
+    edges, bands, counts = model.density(t0, t0 + 20, 2, 0, 2, 2)
+
+    assert edges.tolist() == [t0, t0 + 10, t0 + 20]
+    assert bands.tolist() == [0, 1]
+    # Доработки в плотности не учитываются
+    assert counts.tolist() == [[2, 0], [1, 0]]
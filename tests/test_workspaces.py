@@ -0,0 +1,114 @@
+"""Пул рабочих областей: вытеснение LRU и сводные отчеты"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.db import workspaces as workspace_module
+from src.db.models import Payment, Project, create_db_engine
+from src.db.workspaces import WorkspaceManager
+
+
+@pytest.fixture
+def workspaces():
+    manager = WorkspaceManager(max_open=2)
+    yield manager
+    manager.dispose()
+
+
+def add_project(manager, path, cost, paid):
+    with manager.session(path) as session:
+        project = Project(
+            name="Проект",
+            start_date=datetime(2024, 1, 1),
+            deadline=datetime(2024, 3, 1),
+            total_cost=cost,
+        )
+        project.payments.append(
+            Payment(amount=paid, payment_date=datetime(2024, 1, 10), status="completed")
+        )
+        session.add(project)
+        session.commit()
+
+
+def test_engine_is_reused_for_same_file(workspaces, tmp_path):
+    path = str(tmp_path / "a.db")
+
+    engine = workspaces.engine(path)
+    assert workspaces.engine(str(tmp_path / "." / "a.db")) is engine
+    assert workspaces.session(path).get_bind() is engine
+
+
+def test_least_recently_used_base_is_evicted(workspaces, tmp_path):
+    a, b, c = (str(tmp_path / name) for name in ("a.db", "b.db", "c.db"))
+    workspaces.engine(a)
+    workspaces.engine(b)
+    workspaces.engine(a)
+    workspaces.engine(c)
+
+    assert workspaces.open_paths() == [a, c]
+
+
+def test_acquired_base_is_not_evicted_until_release(workspaces, tmp_path):
+    a, b, c = (str(tmp_path / name) for name in ("a.db", "b.db", "c.db"))
+    workspaces.acquire(a).close()
+    workspaces.engine(b)
+    workspaces.engine(c)
+    assert workspaces.open_paths() == [a, c]
+
+    workspaces.release(a)
+    workspaces.engine(b)
+    assert workspaces.open_paths() == [c, b]
+
+
+def test_combined_totals_over_several_bases(workspaces, tmp_path):
+    a, b = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    add_project(workspaces, a, 1000.0, 300.0)
+    add_project(workspaces, b, 500.0, 100.0)
+
+    report = workspaces.get_combined_totals([a, b], workers=2)
+
+    assert report["workspaces"][a]["total_paid"] == 300.0
+    assert report["workspaces"][b]["total_cost"] == 500.0
+    assert report["combined"]["projects"] == 2
+    assert report["combined"]["total_cost"] == 1500.0
+    assert report["combined"]["outstanding"] == 1100.0
+
+
+def test_acquire_opens_base_without_holding_pool_lock(
+    workspaces, tmp_path, monkeypatch
+):
+    def lock_is_free():
+        result = []
+
+        def try_lock():
+            result.append(workspaces._lock.acquire(blocking=False))
+            if result[0]:
+                workspaces._lock.release()
+
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def checked_create(path):
+        assert lock_is_free()
+        return create_db_engine(path)
+
+    monkeypatch.setattr(workspace_module, "create_db_engine", checked_create)
+    path = str(tmp_path / "a.db")
+    workspaces.acquire(path).close()
+
+    assert workspaces.open_paths() == [path]
+
+
+def test_failed_open_unpins_base(workspaces, tmp_path, monkeypatch):
+    def broken_create(path):
+        raise OSError("диск недоступен")
+
+    monkeypatch.setattr(workspace_module, "create_db_engine", broken_create)
+    with pytest.raises(OSError):
+        workspaces.acquire(str(tmp_path / "a.db"))
+
+    assert workspaces._pinned == set()
@@ -0,0 +1,145 @@
+"""Отложенная запись изменений"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.db.crud import ModificationManager
+from src.db.models import Project, TimeEntry
+from src.db.write_behind import WriteBehindBuffer
+
+
+class FakeScheduler:
+    """Запоминает отложенные вызовы вместо Tk.after"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, delay_ms, callback):
+        self.calls.append((delay_ms, callback))
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for _, callback in calls:
+            callback()
+
+
+@pytest.fixture
+def own_session(own_engine):
+    with Session(own_engine) as session:
+        yield session
+
+
+def count_commits(session):
+    commits = []
+    event.listen(session, "after_commit", lambda _: commits.append(1))
+    return commits
+
+
+def test_changes_are_coalesced_until_timer(own_session):
+    session = own_session
+    project = session.get(Project, 1)
+    schedule = FakeScheduler()
+    buffer = WriteBehindBuffer(session, schedule, flush_interval_ms=500)
+    commits = count_commits(session)
+
+    for cost in (1.0, 2.0, 3.0):
+        project.total_cost = cost
+        buffer.stage(project)
+
+    assert [delay for delay, _ in schedule.calls] == [500]
+    assert buffer.pending == 1
+    assert commits == []
+    schedule.run()
+    assert buffer.pending == 0
+    assert commits == [1]
+    assert buffer.flushes == 1
+    session.expire_all()
+    assert session.get(Project, 1).total_cost == 3.0
+
+
+def test_flush_when_too_many_pending(own_session):
+    session = own_session
+    schedule = FakeScheduler()
+    buffer = WriteBehindBuffer(session, schedule, max_pending=3)
+    commits = count_commits(session)
+    projects = [session.get(Project, number) for number in (1, 2, 3)]
+    for project in projects:
+        project.deadline = datetime(2030, 1, 1)
+        buffer.stage(project)
+
+    assert commits == [1]
+    assert buffer.pending == 0
+    # Таймер, поставленный до сохранения, ничего не записывает
+    schedule.run()
+    assert commits == [1]
+
+
+def test_explicit_flush_and_empty_flush(own_session):
+    session = own_session
+    buffer = WriteBehindBuffer(session, FakeScheduler())
+    commits = count_commits(session)
+    buffer.flush()
+    assert commits == []
+
+    project = session.get(Project, 1)
+    project.name = "Переименован"
+    buffer.stage(project)
+    buffer.flush()
+    assert commits == [1]
+    assert buffer.flushes == 1
+
+
+def test_discarded_object_is_not_saved(own_session):
+    session = own_session
+    buffer = WriteBehindBuffer(session, FakeScheduler())
+    manager = ModificationManager(session)
+    modification_id = session.get(Project, 1).modifications[0].id
+    entry = TimeEntry(
+        modification_id=modification_id,
+        start_time=datetime(2024, 1, 1, 10),
+        minutes=5.0,
+        rate=1000.0,
+    )
+    buffer.stage(entry)
+    session.add(entry)
+
+    buffer.discard(entry)
+    buffer.flush()
+
+    assert buffer.pending == 0
+    assert entry not in session
+    assert manager.get_time_totals([modification_id])[modification_id][0] == 120.0
+
+
+def test_failed_flush_leaves_session_usable(own_session):
+    session = own_session
+    buffer = WriteBehindBuffer(session, FakeScheduler())
+    project = session.get(Project, 1)
+    project.name = None
+    buffer.stage(project)
+
+    with pytest.raises(IntegrityError):
+        buffer.flush()
+
+    assert buffer.pending == 0
+    assert session.get(Project, 1).name == "Проект 0"
+    project.name = "Переименован"
+    buffer.stage(project)
+    buffer.flush()
+    assert buffer.flushes == 1
+
+
+def test_modification_exists_ignores_session_cache(own_session):
+    session = own_session
+    manager = ModificationManager(session)
+    modification = session.get(Project, 1).modifications[0]
+
+    assert manager.modification_exists(modification.id)
+    session.connection().exec_driver_sql(
+        "DELETE FROM modifications WHERE id = ?", (modification.id,)
+    )
+    assert not manager.modification_exists(modification.id)